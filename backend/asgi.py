@@ -12,5 +12,10 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+# Under ASGI the sync parts of each request run on a thread created for that
+# request, so a persistent connection would outlive its thread and leak until
+# MySQL's wait_timeout closes it. Reconnect per request unless told otherwise
+# (e.g. when DB_CONN_MAX_AGE is set for a pooler such as RDS Proxy in front).
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
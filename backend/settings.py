@@ -45,8 +45,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'myapp.middleware.PerformanceMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'myapp.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -89,12 +91,15 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 
 # db creds start 
 import os
+import sys
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 # ENV flag to detect environment
 ENVIRONMENT = os.environ.get('DJANGO_ENV', 'development')
+# Running under `manage.py test`
+TESTING = sys.argv[1:2] == ['test']
 
 if ENVIRONMENT == 'production':
     # Use RDS (or any other) DB for production
@@ -108,6 +113,15 @@ if ENVIRONMENT == 'production':
             'PORT': '3306',
         }
     }
+elif os.environ.get('DB_ENGINE') == 'sqlite':
+    # Local without a MySQL server (e.g. for bench_api): DB_ENGINE=sqlite,
+    # the file at DB_SQLITE_PATH
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        }
+    }
 else:
     # Local: use SQLite
     # DATABASES = {
@@ -128,7 +142,23 @@ else:
     }
 }
 
-# db creds end 
+# Persistent connections: each worker thread keeps its connection open for up
+# to DB_CONN_MAX_AGE seconds (0 = reconnect per request, like before) instead
+# of paying the MySQL connect + auth handshake on every request. Keep it below
+# the server's wait_timeout. The MySQL backend has no built-in pool, so the
+# effective pool is one connection per worker thread; put RDS Proxy (via
+# RDS_DB_HOST) in front if workers x threads gets close to max_connections.
+# backend/asgi.py defaults this to 0, see there.
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+# Ping a reused connection before its first query of a request, so one the
+# server dropped (wait_timeout, failover) is replaced rather than failing it
+DB_CONN_HEALTH_CHECKS = os.environ.get('DB_CONN_HEALTH_CHECKS', 'true').lower() == 'true'
+
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+    database['CONN_HEALTH_CHECKS'] = DB_CONN_HEALTH_CHECKS
+
+# db creds end
 
 if ENVIRONMENT == 'production':
     # S3 Storage settings
@@ -196,6 +226,33 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Django's defaults, with a PBKDF2 hasher whose cost is configurable; a login
+# with a hash made at another cost (or by another hasher) upgrades it
+PASSWORD_HASHERS = [
+    'myapp.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_HASH_ITERATIONS = int(os.environ.get('PASSWORD_HASH_ITERATIONS', 1_000_000))
+# Processes hashing passwords for api/token/ and api/register/, per server
+# worker process (0 = a thread, no pool), and how many hashes may wait for
+# one before those endpoints answer 503
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE', 8))
+
+# Login attempts per client IP, per username from one IP and per username
+# from anywhere, and registrations per IP, in each LOGIN_RATE_WINDOW seconds
+# (0 = unlimited); over the limit is a 429. The per-username limit is the
+# one a botnet cannot spread out, so it is set high enough that failing
+# someone else's logins does not lock them out in normal use.
+LOGIN_RATE_PER_IP = int(os.environ.get('LOGIN_RATE_PER_IP', 30))
+LOGIN_RATE_PER_USER = int(os.environ.get('LOGIN_RATE_PER_USER', 10))
+LOGIN_RATE_PER_ACCOUNT = int(os.environ.get('LOGIN_RATE_PER_ACCOUNT', 100))
+REGISTER_RATE_PER_IP = int(os.environ.get('REGISTER_RATE_PER_IP', 10))
+LOGIN_RATE_WINDOW = int(os.environ.get('LOGIN_RATE_WINDOW', 60))
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -219,15 +276,44 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Reverse proxies in front of the app that append the client address to
+# X-Forwarded-For. 0 (the default) ignores the header and uses the socket
+# address, so clients cannot pick their own IP for the rate limits; set it to
+# the number of trusted hops (e.g. 1 behind a single load balancer).
+NUM_PROXIES = int(os.environ.get('NUM_PROXIES', 0))
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'myapp.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
-    )
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'myapp.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'NUM_PROXIES': NUM_PROXIES,
 }
 
+# Requests slower than this or running more queries than this are logged
+# with their SQL by PerformanceMiddleware (0 turns the check off; off by
+# default under tests, whose requests would only add noise)
+PERF_LATENCY_BUDGET_MS = int(os.environ.get('PERF_LATENCY_BUDGET_MS', 0 if TESTING else 500))
+PERF_QUERY_BUDGET = int(os.environ.get('PERF_QUERY_BUDGET', 0 if TESTING else 10))
+# Bearer token Prometheus scrapes metrics/ with; the endpoint 404s without one
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# CompressionMiddleware: encodings in order of preference (br and zstd are
+# used only if the brotli / zstandard packages are installed) and the
+# smallest body worth compressing
+COMPRESSION_ENCODINGS = os.environ.get('COMPRESSION_ENCODINGS', 'zstd,br,gzip').split(',')
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+
+# JSON encoder behind FastJSONRenderer: 'auto' (orjson if installed, else
+# the stdlib json module), 'orjson' or 'stdlib'
+JSON_RENDERER = os.environ.get('JSON_RENDERER', 'auto')
+
 
 
 from datetime import timedelta
@@ -239,8 +325,13 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": False,
     "AUTH_HEADER_TYPES": ("Bearer",),
     "AUTH_TOKEN_CLASSES": ("rest_framework_simplejwt.tokens.AccessToken",),
+    "TOKEN_OBTAIN_SERIALIZER": "myapp.serializers.ClaimsTokenObtainPairSerializer",
 }
 
+# ClaimsJWTAuthentication trusts the user claims in the token and only checks
+# that the account is still active, cached for this many seconds (0 = never check)
+JWT_USER_CHECK_TTL = int(os.environ.get('JWT_USER_CHECK_TTL', 60))
+
 
 
 
@@ -250,4 +341,84 @@ SIMPLE_JWT = {
 # MEDIA_ROOT = BASE_DIR / 'media'
 
 
-MAX_FILE_SIZE_MB = 2
\ No newline at end of file
+MAX_FILE_SIZE_MB = 2
+
+# Profile picture processing: uploads are spooled here and then decoded,
+# stripped of metadata, resized and pushed to STORAGES["default"] by a
+# background thread pool (0 workers = process inline, e.g. in tests)
+PROFILE_PICTURE_SPOOL_DIR = os.environ.get('PROFILE_PICTURE_SPOOL_DIR', os.path.join(BASE_DIR, 'spool'))
+PROFILE_PICTURE_WORKERS = int(os.environ.get('PROFILE_PICTURE_WORKERS', 2))
+PROFILE_PICTURE_FORMAT = os.environ.get('PROFILE_PICTURE_FORMAT', 'WEBP')  # WEBP or JPEG
+PROFILE_PICTURE_MAX_SIZE = 1024
+PROFILE_THUMBNAIL_SIZE = 128
+# How profile picture URLs are built: 'default' (bucket URL in production,
+# MEDIA_URL locally), 'cdn' (PROFILE_PICTURE_CDN_DOMAIN) or 'presigned'
+# (signed by the storage backend, valid for PROFILE_PICTURE_URL_EXPIRY seconds)
+PROFILE_PICTURE_URL_MODE = os.environ.get('PROFILE_PICTURE_URL_MODE', 'default')
+PROFILE_PICTURE_CDN_DOMAIN = os.environ.get('PROFILE_PICTURE_CDN_DOMAIN')
+PROFILE_PICTURE_URL_EXPIRY = int(os.environ.get('PROFILE_PICTURE_URL_EXPIRY', 3600))
+# Seconds after which recover_picture_jobs gives up on a picture still being
+# processed (its worker died) and removes its spool file
+PROFILE_PICTURE_JOB_TIMEOUT = int(os.environ.get('PROFILE_PICTURE_JOB_TIMEOUT', 15 * 60))
+# Unfinished resumable uploads are removed after this many seconds
+PROFILE_UPLOAD_SESSION_TTL = int(os.environ.get('PROFILE_UPLOAD_SESSION_TTL', 24 * 60 * 60))
+
+# Keyset pagination for the task list (?page_size= / ?cursor=)
+TASKS_PAGE_SIZE = int(os.environ.get('TASKS_PAGE_SIZE', 50))
+TASKS_MAX_PAGE_SIZE = int(os.environ.get('TASKS_MAX_PAGE_SIZE', 500))
+
+# Rows fetched per query while streaming tasks/export/<format>/
+TASKS_EXPORT_CHUNK_SIZE = int(os.environ.get('TASKS_EXPORT_CHUNK_SIZE', 2000))
+
+# Task change push (async/tasks/events/). The local broker only reaches
+# clients connected to the same process; with several workers use
+# 'myapp.events.RedisBroker' and TASK_EVENTS_REDIS_URL (needs `redis`).
+TASK_EVENTS_BACKEND = os.environ.get('TASK_EVENTS_BACKEND', 'myapp.events.LocalBroker')
+TASK_EVENTS_REDIS_URL = os.environ.get('TASK_EVENTS_REDIS_URL', 'redis://localhost:6379/0')
+TASK_EVENTS_KEEPALIVE = int(os.environ.get('TASK_EVENTS_KEEPALIVE', 15))
+TASK_EVENTS_QUEUE_SIZE = int(os.environ.get('TASK_EVENTS_QUEUE_SIZE', 100))
+
+# tasks/sync/: changes per response, how far behind the clock the returned
+# watermark stays (so rows from still-open transactions are not skipped) and
+# how long deletions are kept (older watermarks must sync from scratch)
+TASKS_SYNC_BATCH_SIZE = int(os.environ.get('TASKS_SYNC_BATCH_SIZE', 500))
+TASKS_SYNC_WINDOW = int(os.environ.get('TASKS_SYNC_WINDOW', 5))
+TASKS_SYNC_TOMBSTONE_DAYS = int(os.environ.get('TASKS_SYNC_TOMBSTONE_DAYS', 30))
+
+# Keep per-user TaskCounter rows up to date on task writes and serve
+# tasks/summary/ from them instead of aggregating the tasks. After turning
+# this on, backfill with `manage.py rebuild_task_counters`.
+TASK_COUNTERS_ENABLED = os.environ.get('TASK_COUNTERS_ENABLED', 'false').lower() == 'true'
+
+# Maximum number of items in one tasks/bulk/* request
+TASKS_BULK_MAX_ITEMS = int(os.environ.get('TASKS_BULK_MAX_ITEMS', 1000))
+
+# Account deletion: the user is deactivated at once and their tasks are
+# deleted this many per transaction by a background thread pool (0 workers =
+# inline, e.g. in tests); run purge_users to finish any that were interrupted
+USER_PURGE_WORKERS = int(os.environ.get('USER_PURGE_WORKERS', 1))
+USER_PURGE_BATCH_SIZE = int(os.environ.get('USER_PURGE_BATCH_SIZE', 500))
+
+# getUsers typeahead: default and maximum number of matches per request
+USER_SEARCH_LIMIT = int(os.environ.get('USER_SEARCH_LIMIT', 20))
+USER_SEARCH_MAX_LIMIT = int(os.environ.get('USER_SEARCH_MAX_LIMIT', 100))
+
+# Per-user task list cache. Local memory by default; local memory is per
+# process, so deployments running several workers should point this at a
+# shared backend (e.g. django.core.cache.backends.redis.RedisCache) so
+# invalidation reaches every worker.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'tasks': {
+        'BACKEND': os.environ.get('TASKS_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('TASKS_CACHE_LOCATION', 'tasks'),
+        'TIMEOUT': int(os.environ.get('TASKS_CACHE_TIMEOUT', 300)),
+    },
+    # Login rate limit counters; process-local, so the limits apply per server process
+    'ratelimit': {
+        'BACKEND': os.environ.get('RATELIMIT_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('RATELIMIT_CACHE_LOCATION', 'ratelimit'),
+    },
+}
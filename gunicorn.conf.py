@@ -0,0 +1,14 @@
+# Read by `gunicorn backend.wsgi` when run from this directory.
+#
+# Database connections are persistent (DB_CONN_MAX_AGE) and opened lazily, so
+# every worker process and thread gets its own the first time it queries;
+# max connections = workers x threads per host.
+
+
+def pre_fork(server, worker):
+    # With --preload the app is loaded in the master, which may have queried
+    # the database; a forked worker must never share that socket with it
+    if server.cfg.preload_app:
+        from django.db import connections
+
+        connections.close_all()
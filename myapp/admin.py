@@ -1,4 +1,14 @@
 from django.contrib import admin
 from .models import Task
+from . import bulk
 
-admin.site.register(Task)
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    # Task has no delete signal receivers; deletes here need the same
+    # cache/counter/tombstone bookkeeping as the API's
+    def delete_model(self, request, obj):
+        bulk.delete_tasks([obj.pk])
+
+    def delete_queryset(self, request, queryset):
+        bulk.delete_tasks(queryset.values_list('pk', flat=True))
@@ -0,0 +1,307 @@
+# === async_views.py ===
+# Async-native read endpoints for ASGI deployments. They return the same
+# payloads as their sync counterparts in views.py but use the async ORM, so
+# under ASGI a slow query does not tie up a worker thread. api/token/ and
+# api/register/ are served from here outright: they hash passwords in a
+# process pool (hashing.py), so a burst of logins does not stall the event
+# loop serving task reads.
+
+import functools
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User, update_last_login
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError
+from django.http import HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework.exceptions import (
+    APIException, AuthenticationFailed, NotAuthenticated, ParseError, Throttled, ValidationError,
+)
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from . import cache as task_cache
+from . import events
+from . import hashing
+from . import ratelimit
+from .authentication import ais_user_active, has_user_claims
+from .etags import atask_list_etag, is_not_modified, payload_etag
+from .filters import InvalidFilter, is_filtered
+from .pagination import InvalidCursor, akeyset_page, get_page_size, union_ordered
+from .renderers import json_response
+from .serializers import ClaimsTokenObtainPairSerializer
+from .views import (
+    PROFILE_FIELDS, RegisterSerializer, _filtered_task_branches, _profile_payload, _task_rows_to_dicts,
+    _task_values, _user_search_queryset,
+)
+
+
+async def _authenticate(request):
+    """
+    Async twin of ClaimsJWTAuthentication.authenticate(): token parsing and
+    validation are reused as-is, the user comes from the token claims when
+    present and otherwise from aget().
+    """
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = auth.get_raw_token(header) if header is not None else None
+    if raw_token is None:
+        raise NotAuthenticated()
+    validated_token = auth.get_validated_token(raw_token)
+
+    try:
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+    except KeyError:
+        raise InvalidToken('Token contained no recognizable user identification')
+
+    if has_user_claims(validated_token):
+        if settings.JWT_USER_CHECK_TTL and not await ais_user_active(user_id):
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        return api_settings.TOKEN_USER_CLASS(validated_token)
+
+    try:
+        user = await User.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+    except User.DoesNotExist:
+        raise AuthenticationFailed('User not found', code='user_not_found')
+
+    if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+        raise AuthenticationFailed('User is inactive', code='user_inactive')
+
+    if api_settings.CHECK_REVOKE_TOKEN:
+        if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed("The user's password has been changed.", code='password_changed')
+
+    return user
+
+
+def jwt_required(view):
+    """Authenticate an async view with the same JWT rules and 401 body DRF uses."""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            request.user = await _authenticate(request)
+        except APIException as e:
+            detail = e.detail if isinstance(e.detail, dict) else {'detail': e.detail}
+            response = JsonResponse(detail, status=401, encoder=JSONEncoder)
+            response['WWW-Authenticate'] = JWTAuthentication().authenticate_header(request)
+            return response
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def _request_data(request):
+    """The POSTed JSON object or form fields, as DRF's default parsers would read them."""
+    if request.content_type != 'application/json':
+        return request.POST
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError as e:
+        raise ParseError(f'JSON parse error - {e}')
+    if not isinstance(data, dict):
+        raise ParseError('Expected a JSON object')
+    return data
+
+
+def _throttled(wait):
+    response = JsonResponse({'detail': Throttled(wait).detail})
+    response.status_code = 429
+    response['Retry-After'] = str(wait)
+    return response
+
+
+def _hashing_busy():
+    response = JsonResponse({'detail': 'Too many logins in progress, try again shortly.'}, status=503)
+    response['Retry-After'] = '1'
+    return response
+
+
+def _not_modified(etag):
+    response = HttpResponseNotModified()
+    response['ETag'] = etag
+    return response
+
+
+@require_GET
+@jwt_required
+async def get_tasks(request):
+    try:
+        branches, sort = _filtered_task_branches(request)
+    except InvalidFilter as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    etag = await atask_list_etag(request.user, request.GET.urlencode())
+    if is_not_modified(request, etag):
+        return _not_modified(etag)
+
+    rows = _task_values(branches)
+    if 'cursor' in request.GET or 'page_size' in request.GET:
+        try:
+            page_size = get_page_size(request)
+            page, next_cursor = await akeyset_page(rows, request.GET.get('cursor'), page_size, sort)
+        except InvalidCursor as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        data = {'results': _task_rows_to_dicts(page, request), 'next_cursor': next_cursor}
+    elif is_filtered(request.GET):
+        data = _task_rows_to_dicts([row async for row in union_ordered(rows, sort=sort)], request)
+    else:
+        data = await task_cache.aget_task_list(request.user.id)
+        if data is None:
+            data = _task_rows_to_dicts([row async for row in union_ordered(rows)], request)
+            await task_cache.aset_task_list(request.user.id, data)
+
+    response = json_response(data)
+    response['ETag'] = etag
+    return response
+
+
+@require_GET
+@jwt_required
+async def get_user_profile(request):
+    try:
+        user = await User.objects.select_related('profile').only(*PROFILE_FIELDS).aget(id=request.user.id)
+    except User.DoesNotExist:
+        return JsonResponse({'error': 'User not found'}, status=404)
+    data = _profile_payload(request, user)
+    etag = payload_etag(data)
+    if is_not_modified(request, etag):
+        return _not_modified(etag)
+    response = JsonResponse(data)
+    response['ETag'] = etag
+    return response
+
+
+@require_GET
+@jwt_required
+async def getUsers(request):
+    users, error = _user_search_queryset(request)
+    if error:
+        return error
+
+    user_list = [{
+        'id': user.id,
+        'username': user.username,
+        'email': user.email
+    } async for user in users]
+
+    return json_response(user_list)
+
+
+@require_GET
+@jwt_required
+async def task_events(request):
+    """
+    Server-Sent Events stream of the user's task changes (see events.py), in
+    place of polling get_tasks. On each event, or after reconnecting, fetch
+    tasks/sync/ with the last watermark. ASGI only: under WSGI (gunicorn's
+    sync workers) the stream would hold a worker for as long as the client
+    stays connected, so it answers 501 there. With the default LocalBroker
+    only events published in the same server process are delivered; run a
+    single ASGI process or use RedisBroker (TASK_EVENTS_BACKEND).
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'Event streams are only served under ASGI'}, status=501)
+    user_id = request.user.id
+
+    async def stream():
+        async with events.get_broker().subscribe(user_id) as subscription:
+            # Sent once subscribed, so the client knows no later change is missed
+            yield 'retry: 5000\n\n'
+            while True:
+                message = await subscription.get(settings.TASK_EVENTS_KEEPALIVE)
+                if message is None:
+                    # Keeps proxies from closing an idle connection
+                    yield ': keepalive\n\n'
+                else:
+                    yield f'event: {message["type"]}\ndata: {json.dumps(message)}\n\n'
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@csrf_exempt
+@require_POST
+async def obtain_token(request):
+    """
+    api/token/: TokenObtainPairView's payloads and errors, with the password
+    check run in the hashing pool. A hash made at an older cost is replaced
+    on a successful login, as ModelBackend would.
+    """
+    try:
+        data = _request_data(request)
+    except ParseError as e:
+        return JsonResponse({'detail': e.detail}, status=400)
+    wait = ratelimit.check_login(request, data.get(User.USERNAME_FIELD))
+    if wait:
+        return _throttled(wait)
+    try:
+        # Field validation only; validate() would authenticate inline
+        credentials = ClaimsTokenObtainPairSerializer().to_internal_value(data)
+    except ValidationError as e:
+        return JsonResponse(e.detail, status=400, encoder=JSONEncoder)
+    username, password = credentials[User.USERNAME_FIELD], credentials['password']
+
+    try:
+        user = await User._default_manager.filter(**{User.USERNAME_FIELD: username}).afirst()
+        if user is None:
+            # Hash anyway so unknown usernames take as long as wrong passwords
+            await hashing.amake_password(password)
+            valid = False
+        else:
+            valid, must_update = await hashing.averify(password, user.password)
+    except hashing.HashingBusy:
+        return _hashing_busy()
+    if not valid or not user.is_active:
+        response = JsonResponse({'detail': 'No active account found with the given credentials'}, status=401)
+        response['WWW-Authenticate'] = JWTAuthentication().authenticate_header(request)
+        return response
+
+    if must_update:
+        try:
+            encoded = await hashing.amake_password(password)
+        except hashing.HashingBusy:
+            pass
+        else:
+            # Conditional, so a password changed meanwhile is not overwritten
+            await User.objects.filter(pk=user.pk, password=user.password).aupdate(password=encoded)
+    if api_settings.UPDATE_LAST_LOGIN:
+        await sync_to_async(update_last_login)(None, user)
+
+    refresh = ClaimsTokenObtainPairSerializer.get_token(user)
+    return JsonResponse({'refresh': str(refresh), 'access': str(refresh.access_token)})
+
+
+@csrf_exempt
+@require_POST
+async def register(request):
+    """api/register/: RegisterSerializer's validation, with the password hashed in the pool."""
+    try:
+        data = _request_data(request)
+    except ParseError as e:
+        return JsonResponse({'detail': e.detail}, status=400)
+    wait = ratelimit.check_register(request)
+    if wait:
+        return _throttled(wait)
+    serializer = RegisterSerializer(data=data)
+    if not await sync_to_async(serializer.is_valid)():
+        return JsonResponse(serializer.errors, status=400, encoder=JSONEncoder)
+
+    try:
+        encoded = await hashing.amake_password(serializer.validated_data['password'])
+    except hashing.HashingBusy:
+        return _hashing_busy()
+    # What create_user() does, minus the hashing
+    user = User(username=User.normalize_username(serializer.validated_data['username']), password=encoded)
+    try:
+        await user.asave()
+    except IntegrityError:
+        # Taken since the serializer checked
+        return JsonResponse({'username': ['A user with that username already exists.']}, status=400)
+    return JsonResponse(RegisterSerializer(user).data, status=201)
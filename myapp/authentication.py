@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+
+ACTIVE_KEY = 'jwt:active:{}'
+
+
+def is_user_active(user_id):
+    """
+    Whether the user still exists and is active, cached for JWT_USER_CHECK_TTL
+    seconds so revoked accounts are locked out without a query per request.
+    """
+    key = ACTIVE_KEY.format(user_id)
+    active = cache.get(key)
+    if active is None:
+        active = User.objects.filter(id=user_id, is_active=True).exists()
+        cache.set(key, active, settings.JWT_USER_CHECK_TTL)
+    return active
+
+
+async def ais_user_active(user_id):
+    key = ACTIVE_KEY.format(user_id)
+    active = await cache.aget(key)
+    if active is None:
+        active = await User.objects.filter(id=user_id, is_active=True).aexists()
+        await cache.aset(key, active, settings.JWT_USER_CHECK_TTL)
+    return active
+
+
+def forget_user(user_id):
+    cache.delete(ACTIVE_KEY.format(user_id))
+
+
+def has_user_claims(validated_token):
+    return 'username' in validated_token
+
+
+class ClaimsJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Build request.user from the id/username/email claims embedded at login
+    (see ClaimsTokenObtainPairSerializer) instead of loading the User row.
+    Tokens issued before those claims existed fall back to the DB lookup.
+    """
+
+    def get_user(self, validated_token):
+        if not has_user_claims(validated_token):
+            return JWTAuthentication.get_user(self, validated_token)
+
+        user = super().get_user(validated_token)
+        if settings.JWT_USER_CHECK_TTL and not is_user_active(user.id):
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        return user
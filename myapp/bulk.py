@@ -0,0 +1,255 @@
+from django.contrib.auth.models import User
+from django.db import connections, router, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .cache import invalidate_task_lists
+from .dashboard import record_task_changes, record_task_deletes
+from .models import Task
+from . import events
+from . import sync
+
+UPDATABLE_FIELDS = ['title', 'description', 'status', 'priority', 'deadline', 'assigned_to']
+
+# What the bookkeeping after a delete reads: list_user_ids() and counter_buckets()
+DELETED_FIELDS = ['id', 'user_id', 'status', 'priority', 'deadline', 'created_by_id', 'assigned_to_id']
+
+TITLE_MAX_LENGTH = Task._meta.get_field('title').max_length
+
+STATUS_VALUES = {value for value, _ in Task.STATUS_CHOICES}
+PRIORITY_VALUES = {value for value, _ in Task.PRIORITY_CHOICES}
+
+
+class ItemError(Exception):
+    pass
+
+
+def _existing_user_ids(items):
+    """Resolve every assigned_to referenced by the batch in a single query."""
+    ids = set()
+    for item in items:
+        if isinstance(item, dict) and item.get('assigned_to'):
+            try:
+                ids.add(int(item['assigned_to']))
+            except (TypeError, ValueError):
+                pass
+    if not ids:
+        return set()
+    return set(User.objects.filter(id__in=ids).values_list('id', flat=True))
+
+
+def _clean_fields(item, user_ids, partial):
+    """Validate one item's task fields, returning {model attname: value}."""
+    if not isinstance(item, dict):
+        raise ItemError('Each item must be an object')
+
+    fields = {}
+    if 'title' in item or not partial:
+        title = item.get('title')
+        if not title:
+            raise ItemError('Title is required')
+        if not isinstance(title, str):
+            raise ItemError('Title must be a string')
+        if len(title) > TITLE_MAX_LENGTH:
+            raise ItemError(f'Title must be at most {TITLE_MAX_LENGTH} characters')
+        fields['title'] = title
+    if 'description' in item or not partial:
+        description = item.get('description', '')
+        if description is not None and not isinstance(description, str):
+            raise ItemError('Description must be a string')
+        fields['description'] = description
+    if 'status' in item or not partial:
+        fields['status'] = item.get('status', 'pending')
+        if not isinstance(fields['status'], str) or fields['status'] not in STATUS_VALUES:
+            raise ItemError('Invalid status')
+    if 'priority' in item or not partial:
+        fields['priority'] = item.get('priority', 'medium')
+        if not isinstance(fields['priority'], str) or fields['priority'] not in PRIORITY_VALUES:
+            raise ItemError('Invalid priority')
+    if 'deadline' in item or not partial:
+        deadline = item.get('deadline')
+        if deadline:
+            try:
+                deadline = parse_date(deadline)
+            except (TypeError, ValueError):
+                deadline = None
+            if deadline is None:
+                raise ItemError('Invalid deadline, expected YYYY-MM-DD')
+        fields['deadline'] = deadline or None
+    if 'assigned_to' in item or not partial:
+        assigned_to = item.get('assigned_to')
+        if assigned_to:
+            try:
+                assigned_to = int(assigned_to)
+            except (TypeError, ValueError):
+                assigned_to = None
+            if assigned_to not in user_ids:
+                raise ItemError('Assigned user does not exist')
+        fields['assigned_to_id'] = assigned_to or None
+    return fields
+
+
+def clean_task(item, partial):
+    """
+    Validate a single create/update payload, returning {model attname: value}.
+    assigned_to is checked with an id-only query, not by loading the user.
+    """
+    return _clean_fields(item, _existing_user_ids([item]), partial)
+
+
+def bulk_create_tasks(user, items):
+    user_ids = _existing_user_ids(items)
+    results = []
+    tasks = []
+    for index, item in enumerate(items):
+        try:
+            fields = _clean_fields(item, user_ids, partial=False)
+        except ItemError as e:
+            results.append({'index': index, 'error': str(e)})
+            continue
+        task = Task(user_id=user.id, created_by_id=user.id, **fields)
+        tasks.append(task)
+        results.append({'index': index, 'task': task})
+
+    with transaction.atomic():
+        Task.objects.bulk_create(tasks)
+        record_task_changes(tasks)
+        events.record_task_changes(tasks, created=True)
+
+    # bulk_create skips post_save, so invalidate the cached lists here
+    invalidate_task_lists({user.id} | {task.assigned_to_id for task in tasks})
+    for result in results:
+        if 'task' in result:
+            # Backends that cannot return ids from a bulk INSERT (MySQL) leave this as None
+            result['id'] = result.pop('task').pk
+    return results
+
+
+def bulk_update_tasks(user, items):
+    user_ids = _existing_user_ids(items)
+    ids = set()
+    for item in items:
+        if isinstance(item, dict):
+            try:
+                ids.add(int(item.get('id')))
+            except (TypeError, ValueError):
+                pass
+
+    now = timezone.now()
+    results = []
+    affected_users = set()
+    changed_fields = {'updated_at'}
+    with transaction.atomic():
+        tasks = Task.objects.select_for_update().filter(user_id=user.id).in_bulk(ids) if ids else {}
+        for index, item in enumerate(items):
+            try:
+                task = tasks.get(int(item.get('id'))) if isinstance(item, dict) else None
+            except (TypeError, ValueError):
+                task = None
+            if task is None:
+                results.append({'index': index, 'error': 'Task not found'})
+                continue
+            try:
+                fields = _clean_fields(item, user_ids, partial=True)
+            except ItemError as e:
+                results.append({'index': index, 'error': str(e)})
+                continue
+            affected_users |= task.list_user_ids()
+            for name, value in fields.items():
+                setattr(task, name, value)
+            # bulk_update does not apply auto_now
+            task.updated_at = now
+            affected_users |= task.list_user_ids()
+            changed_fields.update(fields)
+            results.append({'index': index, 'id': task.id})
+
+        updated = list({result['id']: tasks[result['id']] for result in results if 'id' in result}.values())
+        if updated:
+            Task.objects.bulk_update(updated, sorted(changed_fields))
+            record_task_changes(updated)
+            sync.record_task_changes(updated)
+            events.record_task_changes(updated)
+
+    invalidate_task_lists(affected_users)
+    return results
+
+
+def _can_delete_returning(connection):
+    # The backends that RETURN from an INSERT (PostgreSQL, SQLite 3.35+,
+    # MariaDB 10.5+) can from a DELETE too; MySQL cannot
+    return connection.vendor in ('postgresql', 'sqlite', 'mysql') and connection.features.can_return_columns_from_insert
+
+
+def _delete_returning(connection, ids, user_id):
+    fields = [Task._meta.get_field(name) for name in DELETED_FIELDS]
+    quote = connection.ops.quote_name
+    where = f'{quote(Task._meta.pk.column)} IN ({", ".join(["%s"] * len(ids))})'
+    params = list(ids)
+    if user_id is not None:
+        where += f' AND {quote(Task._meta.get_field("user").column)} = %s'
+        params.append(user_id)
+    returning = ', '.join(quote(field.column) for field in fields)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {quote(Task._meta.db_table)} WHERE {where} RETURNING {returning}', params)
+        rows = cursor.fetchall()
+    # Same values a SELECT would give (e.g. SQLite dates come back as text)
+    return [
+        Task.from_db(connection.alias, [field.attname for field in fields],
+                     [field.to_python(value) for field, value in zip(fields, row)])
+        for row in rows
+    ]
+
+
+def delete_tasks(ids, user_id=None, exclude_user_ids=()):
+    """
+    Delete the tasks with these ids (only those owned by `user_id`, if
+    given) and return them, with only DELETED_FIELDS loaded. Where the
+    database supports it this is a single DELETE ... RETURNING; on MySQL a
+    locking SELECT of those columns and a DELETE by id, which Django runs
+    without the collector because Task has no delete signal receivers.
+
+    Nothing else cleans up after deleted tasks, so whoever deletes them goes
+    through here: the cache, counter, tombstone and event bookkeeping happens
+    once for the whole batch. `exclude_user_ids` get no tombstones (accounts
+    being deleted).
+    """
+    ids = list(ids)
+    if not ids:
+        return []
+    db = router.db_for_write(Task)
+    with transaction.atomic(using=db):
+        if _can_delete_returning(connections[db]):
+            tasks = _delete_returning(connections[db], ids, user_id)
+        else:
+            queryset = Task.objects.using(db).filter(id__in=ids)
+            if user_id is not None:
+                queryset = queryset.filter(user_id=user_id)
+            tasks = list(queryset.select_for_update().only(*DELETED_FIELDS))
+            if tasks:
+                Task.objects.using(db).filter(pk__in=[task.pk for task in tasks]).delete()
+        record_task_deletes(tasks)
+        sync.record_task_deletes(tasks, exclude_user_ids)
+        events.record_task_deletes(tasks)
+    invalidate_task_lists(set().union(*(task.list_user_ids() for task in tasks)))
+    return tasks
+
+
+def bulk_delete_tasks(user, ids):
+    results = []
+    valid_ids = []
+    for index, pk in enumerate(ids):
+        try:
+            valid_ids.append((index, int(pk)))
+        except (TypeError, ValueError):
+            results.append({'index': index, 'error': 'Invalid id'})
+
+    deleted = delete_tasks([pk for _, pk in valid_ids], user_id=user.id)
+    owned = {task.pk for task in deleted}
+
+    for index, pk in valid_ids:
+        if pk in owned:
+            results.append({'index': index, 'id': pk})
+        else:
+            results.append({'index': index, 'error': 'Task not found'})
+    results.sort(key=lambda result: result['index'])
+    return results
@@ -0,0 +1,100 @@
+import threading
+import uuid
+
+from django.core.cache import caches
+from django.db import transaction
+
+TASK_LIST_KEY = 'tasks:list:{}'
+TASK_LIST_GENERATION_KEY = 'tasks:generation:{}'
+
+_stats = {'hits': 0, 'misses': 0}
+_stats_lock = threading.Lock()
+
+
+def _cache():
+    return caches['tasks']
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def get_task_list(user_id):
+    """Return the cached task list payload for a user, or None on a miss."""
+    data = _cache().get(TASK_LIST_KEY.format(user_id))
+    _count('misses' if data is None else 'hits')
+    return data
+
+
+def set_task_list(user_id, data):
+    _cache().set(TASK_LIST_KEY.format(user_id), data)
+
+
+async def aget_task_list(user_id):
+    data = await _cache().aget(TASK_LIST_KEY.format(user_id))
+    _count('misses' if data is None else 'hits')
+    return data
+
+
+async def aset_task_list(user_id, data):
+    await _cache().aset(TASK_LIST_KEY.format(user_id), data)
+
+
+def invalidate_task_lists(user_ids):
+    """
+    Drop the users' cached lists now and again once the current transaction
+    commits: a list read in between still sees the old rows and would cache
+    them again.
+    """
+    keys = [TASK_LIST_KEY.format(user_id) for user_id in user_ids if user_id]
+    if keys:
+        _cache().delete_many(keys)
+        transaction.on_commit(lambda: _cache().delete_many(keys))
+
+
+def task_list_generation(user_id):
+    """
+    Token folded into the user's task list ETag for what the list embeds but
+    its tasks don't record: other users' usernames, emails and avatars. A
+    missing entry starts a new generation, so losing one can only turn a 304
+    into a 200.
+    """
+    key = TASK_LIST_GENERATION_KEY.format(user_id)
+    generation = _cache().get(key)
+    if generation is None:
+        generation = uuid.uuid4().hex
+        if not _cache().add(key, generation, None):
+            generation = _cache().get(key, generation)
+    return generation
+
+
+async def atask_list_generation(user_id):
+    key = TASK_LIST_GENERATION_KEY.format(user_id)
+    generation = await _cache().aget(key)
+    if generation is None:
+        generation = uuid.uuid4().hex
+        if not await _cache().aadd(key, generation, None):
+            generation = await _cache().aget(key, generation)
+    return generation
+
+
+def bump_task_list_generations(user_ids):
+    """
+    New list ETags for the users, now and again once the current transaction
+    commits, so an ETag handed out for a list read before the commit does
+    not outlive it.
+    """
+    keys = [TASK_LIST_GENERATION_KEY.format(user_id) for user_id in user_ids if user_id]
+
+    def bump():
+        _cache().set_many({key: uuid.uuid4().hex for key in keys}, None)
+
+    if keys:
+        bump()
+        transaction.on_commit(bump)
+
+
+def cache_stats():
+    with _stats_lock:
+        return dict(_stats)
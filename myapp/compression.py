@@ -0,0 +1,203 @@
+import gzip
+import threading
+import time
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Content types worth compressing; images, archives and the like already are
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/x-ndjson', 'application/javascript',
+    'application/xml', 'image/svg+xml',
+)
+# Compressing an event stream would hold events back until a block fills
+UNCOMPRESSIBLE_TYPES = ('text/event-stream',)
+
+
+class GzipCodec:
+    name = 'gzip'
+
+    def compress(self, data):
+        return gzip.compress(data, compresslevel=6, mtime=0)
+
+    def compressor(self):
+        return _ZlibStream(zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS))
+
+
+class _ZlibStream:
+    def __init__(self, compressobj):
+        self.compressobj = compressobj
+
+    def compress(self, chunk):
+        return self.compressobj.compress(chunk)
+
+    def finish(self):
+        return self.compressobj.flush()
+
+
+class BrotliCodec:
+    name = 'br'
+    # Quality 4 is the usual trade-off for on-the-fly compression; 11 is for static assets
+    quality = 4
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.quality)
+
+    def compressor(self):
+        return _BrotliStream(brotli.Compressor(quality=self.quality))
+
+
+class _BrotliStream:
+    def __init__(self, compressor):
+        self.compressor = compressor
+
+    def compress(self, chunk):
+        return self.compressor.process(chunk)
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+class ZstdCodec:
+    name = 'zstd'
+    level = 3
+
+    def compress(self, data):
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def compressor(self):
+        return _ZstdStream(zstandard.ZstdCompressor(level=self.level).compressobj())
+
+
+class _ZstdStream:
+    def __init__(self, compressobj):
+        self.compressobj = compressobj
+
+    def compress(self, chunk):
+        return self.compressobj.compress(chunk)
+
+    def finish(self):
+        return self.compressobj.flush()
+
+
+def available_codecs(names):
+    """The codecs among `names` (in preference order) whose library is installed."""
+    codecs = {'gzip': GzipCodec}
+    if brotli is not None:
+        codecs['br'] = BrotliCodec
+    if zstandard is not None:
+        codecs['zstd'] = ZstdCodec
+    return [codecs[name]() for name in names if name in codecs]
+
+
+def negotiate(accept_encoding, codecs):
+    """Return the first of `codecs` the Accept-Encoding header allows, or None."""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        coding, *params = part.strip().split(';')
+        q = 1.0
+        for param in params:
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = q
+    for codec in codecs:
+        if accepted.get(codec.name, accepted.get('*', 0.0)) > 0:
+            return codec
+    return None
+
+
+def is_compressible(content_type):
+    content_type = content_type.split(';')[0].strip().lower()
+    if content_type in UNCOMPRESSIBLE_TYPES:
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES) or content_type.endswith(('+json', '+xml'))
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def record(encoding, bytes_in, bytes_out, cpu_seconds):
+    with _stats_lock:
+        stats = _stats.setdefault(encoding, {'responses': 0, 'bytes_in': 0, 'bytes_out': 0, 'cpu_seconds': 0.0})
+        stats['responses'] += 1
+        stats['bytes_in'] += bytes_in
+        stats['bytes_out'] += bytes_out
+        stats['cpu_seconds'] += cpu_seconds
+
+
+def compression_stats():
+    """Per encoding: responses compressed, bytes before/after, bytes saved and CPU seconds spent."""
+    with _stats_lock:
+        return {
+            encoding: dict(stats, bytes_saved=stats['bytes_in'] - stats['bytes_out'])
+            for encoding, stats in _stats.items()
+        }
+
+
+class StreamMeter:
+    """
+    Compress a streamed response chunk by chunk, recording totals when it
+    ends. Output is not flushed per chunk (event streams are never
+    compressed), so exports keep their full compression ratio.
+    """
+
+    def __init__(self, codec):
+        self.codec = codec
+        self.compressor = codec.compressor()
+        self.bytes_in = self.bytes_out = 0
+        self.cpu = 0.0
+
+    def compress(self, chunk):
+        start = time.thread_time()
+        data = self.compressor.compress(chunk)
+        self.cpu += time.thread_time() - start
+        self.bytes_in += len(chunk)
+        self.bytes_out += len(data)
+        return data
+
+    def finish(self):
+        start = time.thread_time()
+        data = self.compressor.finish()
+        self.cpu += time.thread_time() - start
+        self.bytes_out += len(data)
+        record(self.codec.name, self.bytes_in, self.bytes_out, self.cpu)
+        return data
+
+    def wrap(self, chunks):
+        for chunk in chunks:
+            data = self.compress(chunk)
+            if data:
+                yield data
+        yield self.finish()
+
+    async def awrap(self, chunks):
+        async for chunk in chunks:
+            data = self.compress(chunk)
+            if data:
+                yield data
+        yield self.finish()
+
+
+def compress(codec, content):
+    """Compress a whole body and record it, or return None if that does not make it smaller."""
+    start = time.thread_time()
+    data = codec.compress(content)
+    cpu = time.thread_time() - start
+    if len(data) >= len(content):
+        return None
+    record(codec.name, len(content), len(data), cpu)
+    return data
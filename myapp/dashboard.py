@@ -0,0 +1,140 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Task, TaskCounter
+
+STATUS_VALUES = [value for value, _ in Task.STATUS_CHOICES]
+PRIORITY_VALUES = [value for value, _ in Task.PRIORITY_CHOICES]
+
+
+def _conditions(created, assigned, today):
+    """Name -> filter of every number in the summary."""
+    conditions = {'created': created, 'assigned': assigned}
+    for value in STATUS_VALUES:
+        conditions[f'status_{value}'] = Q(status=value)
+    for value in PRIORITY_VALUES:
+        conditions[f'priority_{value}'] = Q(priority=value)
+    conditions['overdue'] = Q(status='pending', deadline__lt=today)
+    conditions['due_today'] = Q(status='pending', deadline=today)
+    return conditions
+
+
+def _summary(row):
+    return {
+        'total': row['total'],
+        'created': row['created'],
+        'assigned': row['assigned'],
+        'status': {value: row[f'status_{value}'] for value in STATUS_VALUES},
+        'priority': {value: row[f'priority_{value}'] for value in PRIORITY_VALUES},
+        'overdue': row['overdue'],
+        'due_today': row['due_today'],
+    }
+
+
+def task_summary(user_id, today=None):
+    """
+    Counts of the tasks in the user's get_tasks list, computed in one query:
+    from TaskCounter when TASK_COUNTERS_ENABLED, otherwise straight from Task.
+    """
+    today = today or timezone.localdate()
+    if settings.TASK_COUNTERS_ENABLED:
+        return counter_summary(user_id, today)
+    return live_summary(user_id, today)
+
+
+def live_summary(user_id, today):
+    # One conditional aggregate over the tasks instead of shipping them all to the client
+    conditions = _conditions(Q(created_by_id=user_id), Q(assigned_to_id=user_id), today)
+    row = Task.objects.filter(Q(assigned_to_id=user_id) | Q(created_by_id=user_id)).aggregate(
+        total=Count('id'),
+        **{name: Count('id', filter=condition) for name, condition in conditions.items()},
+    )
+    return _summary(row)
+
+
+def counter_summary(user_id, today):
+    # Same numbers summed over the user's counter rows, one per distinct
+    # (relation, status, priority, deadline) rather than one per task
+    conditions = _conditions(Q(relation__in=['created', 'both']), Q(relation__in=['assigned', 'both']), today)
+    row = TaskCounter.objects.filter(user_id=user_id).aggregate(
+        total=Coalesce(Sum('count'), 0),
+        **{name: Coalesce(Sum('count', filter=condition), 0) for name, condition in conditions.items()},
+    )
+    return _summary(row)
+
+
+def _apply(deltas):
+    for (user_id, relation, status, priority, deadline), delta in deltas.items():
+        if not delta:
+            continue
+        bucket = {
+            'user_id': user_id, 'relation': relation, 'status': status,
+            'priority': priority, 'deadline': deadline,
+        }
+        # Update a single row by pk: MySQL/PostgreSQL treat NULL deadlines as
+        # distinct in the unique constraint, so racing creates can leave two
+        # rows for one bucket. The summary sums them, so that is harmless as
+        # long as each delta lands on exactly one of them.
+        pk = TaskCounter.objects.filter(**bucket).values_list('pk', flat=True).first()
+        if pk is None:
+            try:
+                with transaction.atomic():
+                    TaskCounter.objects.create(count=delta, **bucket)
+                continue
+            except IntegrityError:
+                # Created concurrently; add to that row instead
+                pk = TaskCounter.objects.filter(**bucket).values_list('pk', flat=True).first()
+        TaskCounter.objects.filter(pk=pk).update(count=F('count') + delta)
+
+
+def record_task_changes(tasks):
+    """Move saved tasks from the buckets they were loaded in to their current ones."""
+    if not settings.TASK_COUNTERS_ENABLED:
+        return
+    deltas = Counter()
+    stale_users = set()
+    for task in tasks:
+        if task.loaded_counter_buckets is None:
+            # Loaded with a counted field deferred, so the old buckets are unknown
+            stale_users |= task.list_user_ids() | task.loaded_list_user_ids
+            continue
+        current = task.counter_buckets()
+        deltas.update(current - task.loaded_counter_buckets)
+        deltas.subtract(task.loaded_counter_buckets - current)
+        task.loaded_counter_buckets = current
+    _apply(deltas)
+    rebuild_counters(stale_users)
+
+
+def record_task_deletes(tasks):
+    if not settings.TASK_COUNTERS_ENABLED:
+        return
+    deltas = Counter()
+    for task in tasks:
+        deltas.subtract(task.counter_buckets())
+    _apply(deltas)
+
+
+def rebuild_counters(user_ids):
+    """Recount the users' buckets from Task (also used to backfill after enabling counters)."""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    deltas = Counter()
+    tasks = Task.objects.filter(Q(assigned_to_id__in=user_ids) | Q(created_by_id__in=user_ids)).only(*Task.COUNTED_FIELDS)
+    for task in tasks.iterator():
+        deltas.update(bucket for bucket in task.counter_buckets() if bucket[0] in user_ids)
+    with transaction.atomic():
+        TaskCounter.objects.filter(user_id__in=user_ids).delete()
+        TaskCounter.objects.bulk_create(
+            TaskCounter(
+                user_id=user_id, relation=relation, status=status,
+                priority=priority, deadline=deadline, count=count,
+            )
+            for (user_id, relation, status, priority, deadline), count in deltas.items()
+        )
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.db.models import Count, Max, Q
+from django.utils.http import parse_etags, quote_etag
+
+from .cache import atask_list_generation, task_list_generation
+from .models import Task
+
+
+def make_etag(*parts):
+    digest = hashlib.sha1(':'.join(str(part) for part in parts).encode()).hexdigest()
+    return quote_etag(digest)
+
+
+def task_list_etag(user, query_string=''):
+    """
+    ETag for a user's task list from one aggregate query: the number of
+    visible tasks plus the newest updated_at. Any create, edit, reassignment
+    or delete changes one of the two; edits to the users the list embeds
+    change its generation (see cache.task_list_generation). With presigned
+    avatar URLs it also changes every half URL lifetime, so clients re-fetch
+    the list before the URLs they hold expire.
+    """
+    summary = _task_summary(user).aggregate(count=Count('id'), last_updated=Max('updated_at'))
+    return _task_list_etag(user, summary, query_string, task_list_generation(user.id))
+
+
+async def atask_list_etag(user, query_string=''):
+    summary = await _task_summary(user).aaggregate(count=Count('id'), last_updated=Max('updated_at'))
+    return _task_list_etag(user, summary, query_string, await atask_list_generation(user.id))
+
+
+def _task_summary(user):
+    return Task.objects.filter(Q(assigned_to_id=user.id) | Q(created_by_id=user.id))
+
+
+def _url_epoch():
+    # picture_urls caches a presigned URL for half its lifetime
+    if settings.PROFILE_PICTURE_URL_MODE != 'presigned':
+        return ''
+    return int(time.time() // (settings.PROFILE_PICTURE_URL_EXPIRY / 2))
+
+
+def _task_list_etag(user, summary, query_string, generation):
+    last_updated = summary['last_updated'].isoformat() if summary['last_updated'] else ''
+    return make_etag('tasks', user.id, summary['count'], last_updated, generation, _url_epoch(), query_string)
+
+
+def task_etag(task):
+    """ETag of one version of a task; update_task accepts it in If-Match."""
+    return make_etag('task', task.pk, task.updated_at.isoformat())
+
+
+def payload_etag(payload):
+    return make_etag(json.dumps(payload, sort_keys=True, default=str))
+
+
+def _opaque(etag):
+    return etag.removeprefix('W/')
+
+
+def is_not_modified(request, etag):
+    """
+    True when the request's If-None-Match already names this ETag. Compared
+    weakly, as If-None-Match requires: CompressionMiddleware hands out the
+    W/ form of our ETags and clients send that back.
+    """
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return '*' in etags or _opaque(etag) in {_opaque(tag) for tag in etags}
+
+
+def precondition_failed(request, etag):
+    """
+    True when the request's If-Match names neither this ETag nor '*'.
+    Compared weakly too: a task ETag only encodes updated_at, and
+    CompressionMiddleware may have handed it out in W/ form.
+    """
+    header = request.META.get('HTTP_IF_MATCH')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return '*' not in etags and _opaque(etag) not in {_opaque(tag) for tag in etags}
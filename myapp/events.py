@@ -0,0 +1,183 @@
+# Task change events pushed to clients over async/tasks/events/.
+#
+# Writes publish {'type': 'task.created' | 'task.updated' | 'task.deleted',
+# 'id': <task id>} to every user whose task list the change touches, once the
+# transaction commits. A subscriber that falls too far behind gets a single
+# {'type': 'resync'} instead of the backlog, as do the users of tasks
+# bulk-created on a backend that returns no ids (MySQL).
+#
+# The broker is chosen by TASK_EVENTS_BACKEND: LocalBroker fans out inside
+# this process, RedisBroker (needs the `redis` package) across every worker
+# and host.
+
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class LocalBroker:
+    """
+    In-process pub/sub. Only reaches subscribers served by the same process,
+    so it suits a single ASGI worker (and tests); use RedisBroker otherwise.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def publish(self, user_id, message):
+        with self._lock:
+            subscriptions = list(self._subscribers.get(user_id, ()))
+        # Publishers are sync views on worker threads; hand the message to
+        # each subscriber's event loop rather than touching its queue directly
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+            except RuntimeError:
+                # Loop already closed; its subscription is being torn down
+                pass
+
+    def subscribe(self, user_id):
+        return LocalSubscription(self, user_id)
+
+    def _add(self, subscription):
+        with self._lock:
+            self._subscribers[subscription.user_id].add(subscription)
+
+    def _remove(self, subscription):
+        with self._lock:
+            self._subscribers[subscription.user_id].discard(subscription)
+            if not self._subscribers[subscription.user_id]:
+                del self._subscribers[subscription.user_id]
+
+
+class LocalSubscription:
+    def __init__(self, broker, user_id):
+        self.broker = broker
+        self.user_id = user_id
+        self.overflowed = False
+
+    async def __aenter__(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=settings.TASK_EVENTS_QUEUE_SIZE)
+        self.broker._add(self)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.broker._remove(self)
+
+    def deliver(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        """Next message, or None if nothing arrives within `timeout` seconds."""
+        if self.overflowed:
+            # Too far behind to replay; tell the client to resync instead
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.overflowed = False
+            return {'type': 'resync'}
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class RedisBroker:
+    """Pub/sub over Redis channels (tasks:events:<user id>) at TASK_EVENTS_REDIS_URL."""
+
+    def __init__(self):
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError:
+            raise ImproperlyConfigured('RedisBroker requires the redis package')
+        self._redis = redis.asyncio
+        self._client = redis.Redis.from_url(settings.TASK_EVENTS_REDIS_URL)
+
+    def publish(self, user_id, message):
+        self._client.publish(f'tasks:events:{user_id}', json.dumps(message))
+
+    def subscribe(self, user_id):
+        return RedisSubscription(self._redis, user_id)
+
+
+class RedisSubscription:
+    def __init__(self, redis, user_id):
+        self.redis = redis
+        self.channel = f'tasks:events:{user_id}'
+
+    async def __aenter__(self):
+        self.client = self.redis.Redis.from_url(settings.TASK_EVENTS_REDIS_URL)
+        self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        await self.pubsub.subscribe(self.channel)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+    async def get(self, timeout):
+        message = await self.pubsub.get_message(timeout=timeout)
+        return json.loads(message['data']) if message else None
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(settings.TASK_EVENTS_BACKEND)()
+        return _broker
+
+
+def _publish(user_ids, message):
+    broker = get_broker()
+    for user_id in user_ids:
+        try:
+            broker.publish(user_id, message)
+        except Exception:
+            # A broker outage must not fail the write that already committed
+            logger.exception('Could not publish task event to user %s', user_id)
+
+
+def publish(user_ids, event_type, task_id=None):
+    """Send an event to the users once the current transaction commits."""
+    user_ids = {user_id for user_id in user_ids if user_id}
+    if user_ids:
+        message = {'type': event_type} if task_id is None else {'type': event_type, 'id': task_id}
+        transaction.on_commit(lambda: _publish(user_ids, message))
+
+
+def record_task_changes(tasks, created=False):
+    unidentified = set()
+    for task in tasks:
+        current = task.list_user_ids()
+        if task.pk is None:
+            # Nothing to name the task by; one resync per user covers the batch
+            unidentified |= current
+            continue
+        publish(current, 'task.created' if created else 'task.updated', task.pk)
+        # Reassigned away: gone from the previous users' lists
+        publish(task.loaded_list_user_ids - current, 'task.deleted', task.pk)
+    publish(unidentified, 'resync')
+
+
+def record_task_deletes(tasks):
+    for task in tasks:
+        publish(task.list_user_ids(), 'task.deleted', task.pk)
@@ -0,0 +1,66 @@
+import csv
+
+from .pagination import DEFAULT_SORT, keyset_page
+from .renderers import dumps
+
+CSV_COLUMNS = [
+    'id', 'title', 'description', 'status', 'priority', 'deadline', 'created_at', 'updated_at',
+    'assigned_to_id', 'assigned_to_username', 'created_by_id', 'created_by_username',
+]
+
+
+class Echo:
+    """File-like object whose write() just hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def iter_task_chunks(querysets, chunk_size, sort=DEFAULT_SORT):
+    """
+    Yield every task in list order as lists of up to `chunk_size`, one keyset
+    page each, so the avatars of a chunk can be resolved together.
+
+    Each batch is its own bounded query, so memory stays flat even on MySQL,
+    whose driver buffers a whole result set and has no server-side cursor
+    for .iterator() to use.
+    """
+    cursor = None
+    while True:
+        rows, cursor = keyset_page(querysets, cursor, chunk_size, sort)
+        if rows:
+            yield rows
+        if not cursor:
+            return
+
+
+def ndjson_lines(chunks, to_dicts):
+    # The same dicts and encoder as the task list, so each line matches its payload
+    for chunk in chunks:
+        for data in to_dicts(chunk):
+            yield dumps(data) + b'\n'
+
+
+def _isoformat(value):
+    """A date or datetime as the JSON renderers write it: UTC as Z, microseconds kept."""
+    if value is None:
+        return ''
+    text = value.isoformat()
+    return text[:-6] + 'Z' if text.endswith('+00:00') else text
+
+
+def _user_cell(user, key):
+    return user[key] if user else ''
+
+
+def csv_lines(chunks, to_dicts):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for chunk in chunks:
+        for data in to_dicts(chunk):
+            yield writer.writerow([
+                data['id'], data['title'], data['description'], data['status'], data['priority'],
+                _isoformat(data['deadline']), _isoformat(data['created_at']), _isoformat(data['updated_at']),
+                _user_cell(data['assigned_to'], 'id'), _user_cell(data['assigned_to'], 'username'),
+                _user_cell(data['created_by'], 'id'), _user_cell(data['created_by'], 'username'),
+            ])
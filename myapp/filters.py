@@ -0,0 +1,77 @@
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Task
+from .pagination import DEFAULT_SORT, SORT_FIELDS
+
+STATUS_VALUES = {value for value, _ in Task.STATUS_CHOICES}
+PRIORITY_VALUES = {value for value, _ in Task.PRIORITY_CHOICES}
+ROLES = {'assigned', 'created'}
+
+# Query parameters read by parse_task_filters(); a filtered or re-sorted
+# list is built per request instead of coming from the cached full list
+FILTER_PARAMS = ['status', 'priority', 'deadline_from', 'deadline_to', 'role', 'updated_since']
+
+
+class InvalidFilter(Exception):
+    pass
+
+
+def _choices(params, name, allowed):
+    # ?status=pending or ?status=pending,completed
+    values = set(params.get(name).split(','))
+    unknown = values - allowed
+    if unknown:
+        raise InvalidFilter(f'{name} must be one of {", ".join(sorted(allowed))}')
+    return values
+
+
+def _date(params, name):
+    try:
+        value = parse_date(params.get(name))
+    except ValueError:
+        value = None
+    if value is None:
+        raise InvalidFilter(f'{name} must be a date (YYYY-MM-DD)')
+    return value
+
+
+def parse_task_filters(params):
+    """
+    Validate the task list query parameters and return (role, condition, sort):
+    the UNION branch to keep ('assigned', 'created' or None for both), a Q to
+    apply to each branch and a SORT_FIELDS key for the ordering.
+    """
+    condition = Q()
+    if params.get('status'):
+        condition &= Q(status__in=_choices(params, 'status', STATUS_VALUES))
+    if params.get('priority'):
+        condition &= Q(priority__in=_choices(params, 'priority', PRIORITY_VALUES))
+    if params.get('deadline_from'):
+        condition &= Q(deadline__gte=_date(params, 'deadline_from'))
+    if params.get('deadline_to'):
+        condition &= Q(deadline__lte=_date(params, 'deadline_to'))
+    if params.get('updated_since'):
+        try:
+            updated_since = parse_datetime(params.get('updated_since'))
+        except ValueError:
+            updated_since = None
+        if updated_since is None:
+            raise InvalidFilter('updated_since must be an ISO 8601 datetime')
+        if timezone.is_naive(updated_since):
+            updated_since = timezone.make_aware(updated_since)
+        condition &= Q(updated_at__gte=updated_since)
+
+    role = params.get('role') or None
+    if role is not None and role not in ROLES:
+        raise InvalidFilter('role must be assigned or created')
+
+    sort = params.get('sort') or DEFAULT_SORT
+    if sort.removeprefix('-') not in SORT_FIELDS:
+        raise InvalidFilter(f'sort must be one of {", ".join(sorted(SORT_FIELDS))}, optionally prefixed with -')
+    return role, condition, sort
+
+
+def is_filtered(params):
+    return any(params.get(name) for name in FILTER_PARAMS) or params.get('sort', DEFAULT_SORT) != DEFAULT_SORT
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    Django's PBKDF2 hasher with its cost taken from PASSWORD_HASH_ITERATIONS.
+    Same algorithm name, so existing hashes keep verifying; a hash made at a
+    different cost is re-hashed at the configured one on the next login.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_ITERATIONS
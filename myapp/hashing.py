@@ -0,0 +1,77 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, get_hasher, identify_hasher, make_password
+
+_pool = None
+_slots = None
+_pool_lock = threading.Lock()
+
+
+class HashingBusy(Exception):
+    """Every hashing worker is busy and the queue is full; retry shortly."""
+
+
+def _init_worker():
+    # Spawned workers start from scratch and need the hashers configured
+    django.setup()
+
+
+def verify(password, encoded):
+    """
+    Return (password matches, hash should be upgraded). The upgrade is left
+    to the caller: check_password's setter cannot cross a process boundary.
+    """
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False, False
+    if not check_password(password, encoded):
+        return False, False
+    preferred = get_hasher()
+    return True, hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+
+
+def _get_pool():
+    global _pool, _slots
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: forking a threaded server process is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+            )
+            _slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE)
+        return _pool, _slots
+
+
+async def _run(func, *args):
+    """
+    Run a hashing function in the process pool (PASSWORD_HASH_WORKERS = 0:
+    on a thread) without blocking the event loop. At most PASSWORD_HASH_QUEUE
+    calls wait for a worker; past that HashingBusy is raised at once, so a
+    login burst is turned away instead of queueing up behind itself.
+    """
+    if not settings.PASSWORD_HASH_WORKERS:
+        return await sync_to_async(func, thread_sensitive=False)(*args)
+    pool, slots = _get_pool()
+    if not slots.acquire(blocking=False):
+        raise HashingBusy()
+    future = pool.submit(func, *args)
+    # Released when the work finishes, even if the request was cancelled
+    future.add_done_callback(lambda _: slots.release())
+    return await asyncio.wrap_future(future)
+
+
+async def averify(password, encoded):
+    return await _run(verify, password, encoded)
+
+
+async def amake_password(password):
+    return await _run(make_password, password)
@@ -0,0 +1,166 @@
+import functools
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+
+from myapp import seed
+from myapp.authentication import forget_user
+from myapp.cache import invalidate_task_lists
+
+PREFIX = 'bench-api'
+PASSWORD = 'bench-api-password'
+SCENARIOS = ('login', 'list', 'list-filtered', 'getusers', 'profile', 'create', 'update', 'delete')
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a data set (rolled back afterwards) and drive the API URLconf through the Django test '
+        'client: req/s, p50/p95/p99 latency and queries per request for each endpoint. Runs against '
+        'the configured database; without a MySQL server, select SQLite with DB_ENGINE=sqlite '
+        '(e.g. DB_ENGINE=sqlite python manage.py migrate, then DB_ENGINE=sqlite python manage.py '
+        'bench_api). Use loadtest against a running WSGI/ASGI server for concurrency.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--tasks-per-user', type=int, default=50)
+        parser.add_argument('--active-users', type=int, default=20, help='Users that log in and make the requests')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per scenario')
+        parser.add_argument('--only', nargs='+', choices=SCENARIOS, help='Run just these scenarios')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options['active_users'] > options['users']:
+            raise CommandError('--active-users cannot exceed --users')
+        user_ids = []
+        # Roll everything back so the benchmark leaves no rows behind
+        try:
+            with transaction.atomic():
+                user_ids = seed.seed(
+                    options['users'], options['tasks_per_user'], prefix=PREFIX, password=PASSWORD,
+                    rng_seed=options['seed'],
+                )
+                # Every active user logs in from the same address
+                with override_settings(LOGIN_RATE_PER_IP=0, LOGIN_RATE_PER_USER=0, LOGIN_RATE_PER_ACCOUNT=0):
+                    self.run(user_ids, options)
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            # Cached entries would outlive the rolled-back rows in a shared cache
+            invalidate_task_lists(user_ids)
+            for user_id in user_ids:
+                forget_user(user_id)
+
+    def run(self, user_ids, options):
+        rng = random.Random(options['seed'])
+        count = options['requests']
+        scenarios = options['only'] or SCENARIOS
+        active = dict(User.objects.filter(id__in=user_ids[:options['active_users']]).values_list('id', 'username'))
+        client = Client()
+
+        self.stdout.write(
+            f'{len(user_ids)} users x {options["tasks_per_user"]} tasks, {len(active)} active users, '
+            f'{count} requests per scenario on {connection.vendor}'
+        )
+        self.stdout.write(
+            f'{"scenario":<14} {"requests":>8} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} '
+            f'{"queries":>8} {"max q":>6}'
+        )
+
+        # Every active user logs in once; that also hands out the tokens the
+        # other scenarios use
+        tokens = {}
+
+        def login(user_id):
+            response = client.post('/api/token/', {'username': active[user_id], 'password': PASSWORD},
+                                   content_type='application/json')
+            tokens[user_id] = f'Bearer {response.json()["access"]}'
+            return response
+
+        logins = [functools.partial(login, user_id) for user_id in active]
+        if 'login' in scenarios:
+            self.report('login', logins)
+        else:
+            for call in logins:
+                call()
+
+        def request(method, path, data=None, user_id=None):
+            """A call making this request as `user_id` (or a random active user)."""
+            token = tokens[user_id or rng.choice(list(active))]
+            return lambda: getattr(client, method)(path, data, content_type='application/json', HTTP_AUTHORIZATION=token)
+
+        # Tasks created during the run, as (creator, task id), for update and delete
+        created = []
+
+        def create():
+            user_id = rng.choice(list(active))
+            response = request('post', '/api/tasks/create/', {
+                'title': 'benchmark task', 'description': 'created by bench_api',
+                'priority': rng.choice(('low', 'medium', 'high')), 'assigned_to': rng.choice(user_ids),
+            }, user_id)()
+            created.append((user_id, response.json()['id']))
+            return response
+
+        calls = {
+            'list': lambda: [request('get', '/api/tasks/') for _ in range(count)],
+            'list-filtered': lambda: [
+                request('get', '/api/tasks/?status=pending&priority=high,medium&sort=deadline') for _ in range(count)
+            ],
+            'getusers': lambda: [
+                request('get', f'/api/getusers/?search={PREFIX}-{rng.randrange(len(user_ids))}') for _ in range(count)
+            ],
+            'profile': lambda: [request('get', '/api/profile/') for _ in range(count)],
+            'create': lambda: [create] * count,
+            'update': lambda: [
+                request('put', f'/api/tasks/update/{pk}/', {'title': 'updated', 'status': 'completed'}, user_id)
+                for user_id, pk in created
+            ],
+            'delete': lambda: [request('delete', f'/api/tasks/delete/{pk}/', user_id=user_id) for user_id, pk in created],
+        }
+        for name in SCENARIOS[1:]:
+            if name not in scenarios:
+                continue
+            if name in ('update', 'delete') and not created:
+                # These work on the tasks 'create' makes
+                for call in calls['create']():
+                    call()
+            self.report(name, calls[name]())
+
+    def report(self, name, calls):
+        queries = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        latencies, query_counts = [], []
+        with connection.execute_wrapper(count_queries):
+            start = time.perf_counter()
+            for call in calls:
+                queries = 0
+                request_start = time.perf_counter()
+                response = call()
+                latencies.append((time.perf_counter() - request_start) * 1000)
+                query_counts.append(queries)
+                if response.status_code >= 400:
+                    raise CommandError(f'{name}: {response.status_code} {response.content[:200]!r}')
+            elapsed = time.perf_counter() - start
+
+        if not latencies:
+            return
+        centiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        self.stdout.write(
+            f'{name:<14} {len(latencies):>8} {len(latencies) / elapsed:>8.1f} {centiles[49]:>8.2f} '
+            f'{centiles[94]:>8.2f} {centiles[98]:>8.2f} {statistics.fmean(query_counts):>8.1f} {max(query_counts):>6}'
+        )
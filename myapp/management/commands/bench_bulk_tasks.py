@@ -0,0 +1,78 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIClient
+
+from myapp.models import Task
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare task create/update/delete throughput of the bulk endpoints with the per-task endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        # Roll everything back so the benchmark leaves no rows behind
+        try:
+            with transaction.atomic():
+                self.run(options['count'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, count):
+        user = User.objects.create_user(username='bench-bulk')
+        assignee = User.objects.create_user(username='bench-bulk-assignee')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        batch = settings.TASKS_BULK_MAX_ITEMS
+
+        self.stdout.write(f'{"path":<12} {"phase":<8} {"tasks/s":>10}')
+
+        def ids():
+            return list(Task.objects.filter(user=user).values_list('id', flat=True))
+
+        # Per-request path
+        self.report('per-task', 'create', count, lambda: [
+            client.post('/api/tasks/create/', {'title': f'task {i}', 'assigned_to': assignee.id}, format='json')
+            for i in range(count)
+        ])
+        pks = ids()
+        self.report('per-task', 'update', count, lambda: [
+            client.put(f'/api/tasks/update/{pk}/', {'title': 'updated', 'status': 'completed'}, format='json')
+            for pk in pks
+        ])
+        self.report('per-task', 'delete', count, lambda: [
+            client.delete(f'/api/tasks/delete/{pk}/') for pk in pks
+        ])
+
+        # Bulk path
+        def chunks(items):
+            return [items[i:i + batch] for i in range(0, len(items), batch)]
+
+        items = [{'title': f'task {i}', 'assigned_to': assignee.id} for i in range(count)]
+        self.report('bulk', 'create', count, lambda: [
+            client.post('/api/tasks/bulk/create/', chunk, format='json') for chunk in chunks(items)
+        ])
+        pks = ids()
+        updates = [{'id': pk, 'title': 'updated', 'status': 'completed'} for pk in pks]
+        self.report('bulk', 'update', count, lambda: [
+            client.put('/api/tasks/bulk/update/', chunk, format='json') for chunk in chunks(updates)
+        ])
+        self.report('bulk', 'delete', count, lambda: [
+            client.delete('/api/tasks/bulk/delete/', chunk, format='json') for chunk in chunks(pks)
+        ])
+
+    def report(self, path, phase, count, func):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f'{path:<12} {phase:<8} {count / elapsed:>10.0f}')
@@ -0,0 +1,83 @@
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure per-request latency through the full WSGI handler with connections closed after '
+        'every request (CONN_MAX_AGE=0) versus kept open (DB_CONN_MAX_AGE), with and without '
+        'health checks. Run it against the real database: the difference is the connect and '
+        'auth handshake, which is next to free on SQLite.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', required=True, help='An existing user to authenticate as')
+        parser.add_argument('--path', default='/api/tasks/')
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.using(options['database']).get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'No user {options["username"]!r}')
+        token = str(AccessToken.for_user(user))
+        handler = WSGIHandler()
+        environ = RequestFactory().get(options['path'], HTTP_AUTHORIZATION=f'Bearer {token}').environ
+
+        connection = connections[options['database']]
+        original = connection.settings_dict['CONN_MAX_AGE'], connection.settings_dict['CONN_HEALTH_CHECKS']
+        max_age = original[0] or 60
+        self.stdout.write(f'{options["path"]} on {connection.vendor}, {options["requests"]} requests')
+        self.stdout.write(f'{"connections":<28} {"connects":>8} {"mean ms":>8} {"p50 ms":>8} {"p95 ms":>8}')
+        try:
+            for label, age, health_checks in (
+                ('per request (max_age=0)', 0, False),
+                (f'persistent (max_age={max_age})', max_age, False),
+                (f'persistent + health checks', max_age, True),
+            ):
+                connection.close()
+                connection.settings_dict['CONN_MAX_AGE'] = age
+                connection.settings_dict['CONN_HEALTH_CHECKS'] = health_checks
+                connects, latencies = self.run(handler, environ, options['requests'])
+                centiles = statistics.quantiles(latencies, n=100)
+                self.stdout.write(
+                    f'{label:<28} {connects:>8} {statistics.fmean(latencies):>8.2f} '
+                    f'{centiles[49]:>8.2f} {centiles[94]:>8.2f}'
+                )
+        finally:
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'], connection.settings_dict['CONN_HEALTH_CHECKS'] = original
+
+    def run(self, handler, environ, count):
+        connects = 0
+
+        def on_connect(**kwargs):
+            nonlocal connects
+            connects += 1
+
+        latencies = []
+        connection_created.connect(on_connect)
+        try:
+            for _ in range(count):
+                request_environ = dict(environ)
+                start = time.perf_counter()
+                # request_started/request_finished fire as under gunicorn, so
+                # close_old_connections() applies CONN_MAX_AGE for real
+                response = handler(request_environ, lambda status, headers: None)
+                b''.join(response)
+                response.close()
+                latencies.append((time.perf_counter() - start) * 1000)
+                if response.status_code >= 400:
+                    raise CommandError(f'{environ["PATH_INFO"]} returned {response.status_code}')
+        finally:
+            connection_created.disconnect(on_connect)
+        return connects, latencies
@@ -0,0 +1,77 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from rest_framework.renderers import JSONRenderer
+
+from myapp.models import Profile, Task
+from myapp.pagination import union_ordered
+from myapp.renderers import FastJSONRenderer, orjson
+from myapp.views import _task_rows_to_dicts, _task_values, _tasks_to_dicts, _visible_task_branches
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Measure the cost of building and encoding the get_tasks payload, per 1k tasks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        # Roll everything back so the benchmark leaves no rows behind
+        try:
+            with transaction.atomic():
+                self.run(options['tasks'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, count, repeat):
+        user = User.objects.create_user(username='bench-json', email='bench@example.com')
+        assignee = User.objects.create_user(username='bench-json-assignee', email='assignee@example.com')
+        Profile.objects.create(user=assignee, profile_picture='profile_pics/a.webp', profile_thumbnail='profile_pics/thumbs/a.webp')
+        Task.objects.bulk_create(
+            Task(user=user, title=f'task {i}', description='x' * 100, created_by=user,
+                 assigned_to=assignee if i % 2 else None)
+            for i in range(count)
+        )
+        branches = _visible_task_branches(user)
+        per_k = 1000 / count
+
+        def timed(fn):
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = fn()
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            return best * 1000 * per_k, result
+
+        self.stdout.write(f'{count} tasks, best of {repeat}, ms per 1k tasks')
+        self.stdout.write(f'{"stage":<40} {"ms/1k":>8}')
+
+        fetch_ms, instances = timed(lambda: list(union_ordered(branches)))
+        self.stdout.write(f'{"fetch model instances":<40} {fetch_ms:>8.2f}')
+        values_ms, rows = timed(lambda: list(union_ordered(_task_values(branches))))
+        self.stdout.write(f'{"fetch .values() rows":<40} {values_ms:>8.2f}')
+
+        build_ms, data = timed(lambda: _tasks_to_dicts(instances))
+        self.stdout.write(f'{"build dicts from instances":<40} {build_ms:>8.2f}')
+        build_ms, data = timed(lambda: _task_rows_to_dicts(rows))
+        self.stdout.write(f'{"build dicts from rows":<40} {build_ms:>8.2f}')
+
+        render_ms, _ = timed(lambda: JSONRenderer().render(data))
+        self.stdout.write(f'{"render: DRF JSONRenderer":<40} {render_ms:>8.2f}')
+        for backend in ('stdlib', 'orjson'):
+            if backend == 'orjson' and orjson is None:
+                self.stdout.write(f'{"render: FastJSONRenderer (orjson)":<40} {"n/a":>8}')
+                continue
+            with override_settings(JSON_RENDERER=backend):
+                render_ms, _ = timed(lambda: FastJSONRenderer().render(data))
+            self.stdout.write(f'{f"render: FastJSONRenderer ({backend})":<40} {render_ms:>8.2f}')
@@ -0,0 +1,104 @@
+import asyncio
+import os
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client, override_settings
+
+USERNAME = 'bench-logins'
+PASSWORD = 'bench-logins-password'
+
+
+class Command(BaseCommand):
+    help = (
+        'Logins per second per core: the raw PBKDF2 verify rate at each --iterations, then '
+        'api/token/ one login at a time and --concurrency at a time (hashing in the process pool) '
+        'at PASSWORD_HASH_ITERATIONS. Rate limits are lifted for the run. Creates a temporary '
+        'user and deletes it afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, nargs='+', default=[1_000_000, 600_000, 260_000],
+                            help='PBKDF2 costs to time the hash rate at')
+        parser.add_argument('--hashes', type=int, default=10, help='Verifications per cost')
+        parser.add_argument('--logins', type=int, default=40, help='Logins per run')
+        parser.add_argument('--concurrency', type=int, default=4, help='Logins in flight in the concurrent run')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] > settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE:
+            raise CommandError('--concurrency cannot exceed PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE')
+        if User.objects.filter(username=USERNAME).exists():
+            raise CommandError(f'User {USERNAME!r} already exists; remove it first')
+        cores = os.cpu_count()
+        self.stdout.write(f'{cores} cores, PASSWORD_HASH_WORKERS={settings.PASSWORD_HASH_WORKERS}')
+
+        self.stdout.write(f'{"hash rate (1 core)":<24} {"verify ms":>10} {"logins/s":>10}')
+        for iterations in options['iterations']:
+            with override_settings(PASSWORD_HASH_ITERATIONS=iterations):
+                encoded = make_password(PASSWORD)
+                start = time.perf_counter()
+                for _ in range(options['hashes']):
+                    check_password(PASSWORD, encoded)
+                elapsed = (time.perf_counter() - start) / options['hashes']
+            self.stdout.write(f'{f"{iterations:,} iterations":<24} {elapsed * 1000:>10.1f} {1 / elapsed:>10.2f}')
+
+        User.objects.create_user(username=USERNAME, password=PASSWORD)
+        try:
+            with override_settings(LOGIN_RATE_PER_IP=0, LOGIN_RATE_PER_USER=0, LOGIN_RATE_PER_ACCOUNT=0):
+                self.stdout.write(
+                    f'{f"api/token/ ({settings.PASSWORD_HASH_ITERATIONS:,} it.)":<24} {"logins/s":>10} '
+                    f'{"per core":>10} {"p50 ms":>8} {"p95 ms":>8}'
+                )
+                # The first login starts the hashing pool; keep that out of the numbers
+                self.run_sequential(1)
+                # One login at a time keeps one core busy
+                self.report('sequential', *self.run_sequential(options['logins']), 1)
+                # Concurrent logins spread over up to PASSWORD_HASH_WORKERS cores
+                busy = max(1, min(cores, settings.PASSWORD_HASH_WORKERS or 1, options['concurrency']))
+                self.report(f'{options["concurrency"]} concurrent', *asyncio.run(self.run_concurrent(options)), busy)
+        finally:
+            User.objects.filter(username=USERNAME).delete()
+
+    def run_sequential(self, count):
+        client = Client()
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(count):
+            request_start = time.perf_counter()
+            response = client.post('/api/token/', {'username': USERNAME, 'password': PASSWORD},
+                                   content_type='application/json')
+            latencies.append((time.perf_counter() - request_start) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f'api/token/: {response.status_code} {response.content[:200]!r}')
+        return latencies, time.perf_counter() - start
+
+    async def run_concurrent(self, options):
+        client = AsyncClient()
+        latencies = []
+        remaining = options['logins']
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                request_start = time.perf_counter()
+                response = await client.post('/api/token/', {'username': USERNAME, 'password': PASSWORD},
+                                             content_type='application/json')
+                latencies.append((time.perf_counter() - request_start) * 1000)
+                if response.status_code != 200:
+                    raise CommandError(f'api/token/: {response.status_code} {response.content[:200]!r}')
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(options['concurrency'])))
+        return latencies, time.perf_counter() - start
+
+    def report(self, name, latencies, elapsed, cores):
+        rate = len(latencies) / elapsed
+        centiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f'{name:<24} {rate:>10.2f} {rate / cores:>10.2f} {centiles[49]:>8.1f} {centiles[94]:>8.1f}'
+        )
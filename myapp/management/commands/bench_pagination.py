@@ -0,0 +1,83 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from myapp.models import Task
+from myapp.pagination import encode_cursor, keyset_page
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare OFFSET paging with keyset (cursor) paging on the task list query'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000)
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        # Everything runs inside one transaction that is rolled back at the end,
+        # so the benchmark never leaves rows behind.
+        try:
+            with transaction.atomic():
+                self.run(**options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, rows, page_size, repeat, batch_size, **options):
+        user = User.objects.create_user(username='bench-pagination')
+        self.stdout.write(f'Seeding {rows} tasks...')
+        now = timezone.now()
+        batch = []
+        for i in range(rows):
+            batch.append(Task(user=user, created_by=user, assigned_to=user, title=f'task {i}'))
+            if len(batch) == batch_size:
+                Task.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Task.objects.bulk_create(batch)
+        # auto_now_add ignores explicit values, so spread created_at afterwards.
+        # Rows share a timestamp in blocks, which also exercises the id tie-breaker.
+        step = max(rows // 1000, 1)
+        ids = list(Task.objects.filter(user=user).order_by('id').values_list('id', flat=True)[::step])
+        for n, pk in enumerate(ids):
+            chunk = Task.objects.filter(user=user, id__gte=pk)
+            if n + 1 < len(ids):
+                chunk = chunk.filter(id__lt=ids[n + 1])
+            chunk.update(created_at=now + timedelta(seconds=n))
+
+        branches = [Task.objects.filter(assigned_to=user), Task.objects.filter(created_by=user)]
+        ordered = Task.objects.filter(Q(assigned_to=user) | Q(created_by=user)).order_by('-created_at', '-id')
+
+        depths = [0, rows // 100, rows // 10, rows // 2, rows - page_size]
+        self.stdout.write(f'{"offset":>10}  {"OFFSET ms":>10}  {"keyset ms":>10}')
+        for depth in depths:
+            depth = max(depth, 0)
+            # Build the cursor for this depth once, outside the timed section
+            cursor = None
+            if depth:
+                last = ordered.values('created_at', 'id')[depth - 1]
+                cursor = encode_cursor(last['created_at'], last['id'])
+
+            offset_ms = self.timed(repeat, lambda: list(ordered[depth:depth + page_size]))
+            keyset_ms = self.timed(repeat, lambda: keyset_page(branches, cursor, page_size))
+            self.stdout.write(f'{depth:>10}  {offset_ms:>10.2f}  {keyset_ms:>10.2f}')
+
+    def timed(self, repeat, func):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return best
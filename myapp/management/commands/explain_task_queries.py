@@ -0,0 +1,93 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from myapp.models import Task
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Run each task endpoint and print the EXPLAIN plan of every query it sends'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help='Explain as this existing user instead of a throwaway one')
+
+    def handle(self, *args, **options):
+        # The update/delete endpoints write, so run everything in a transaction
+        # that is always rolled back.
+        try:
+            with transaction.atomic():
+                self.run(options['username'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, username):
+        if username:
+            try:
+                user = User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f'User "{username}" does not exist')
+        else:
+            user = User.objects.create_user(username='explain-task-queries')
+
+        task = Task.objects.create(user=user, title='explain', created_by=user, assigned_to=user)
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        endpoints = [
+            ('get_tasks', lambda: client.get('/api/tasks/')),
+            ('get_tasks (page)', lambda: client.get('/api/tasks/', {'page_size': 50})),
+            ('get_tasks (updated_since)', lambda: client.get('/api/tasks/', {
+                'updated_since': '2000-01-01T00:00:00Z', 'sort': '-updated_at', 'page_size': 50,
+            })),
+            ('get_tasks (deadline range)', lambda: client.get('/api/tasks/', {
+                'deadline_from': '2000-01-01', 'deadline_to': '2100-01-01', 'sort': 'deadline', 'page_size': 50,
+            })),
+            ('get_tasks (status, role)', lambda: client.get('/api/tasks/', {
+                'status': 'pending', 'role': 'assigned', 'page_size': 50,
+            })),
+            ('update_task', lambda: client.put(f'/api/tasks/update/{task.id}/', {'title': 'explain'}, format='json')),
+            ('delete_task', lambda: client.delete(f'/api/tasks/delete/{task.id}/')),
+        ]
+        for name, call in endpoints:
+            with CaptureQueriesContext(connection) as ctx:
+                call()
+            for query in ctx.captured_queries:
+                self.explain(name, query['sql'])
+
+        self.explain_or_form(user)
+
+    def explain(self, name, sql):
+        if not sql.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+            return
+        prefix = 'EXPLAIN QUERY PLAN' if connection.vendor == 'sqlite' else 'EXPLAIN'
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql}')
+            columns = [col[0] for col in cursor.description]
+            rows = cursor.fetchall()
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f'== {name}'))
+        self.stdout.write(sql)
+        self.stdout.write(' | '.join(columns))
+        for row in rows:
+            self.stdout.write(' | '.join(str(value) for value in row))
+        self.stdout.write('')
+
+    def explain_or_form(self, user):
+        """
+        Print the plain OR form of the task list page for comparison with the
+        UNION form get_tasks sends, so a planner change can be spotted.
+        """
+        combined = Task.objects.filter(
+            Q(assigned_to=user) | Q(created_by=user)
+        ).order_by('-created_at', '-id')[:50]
+        self.stdout.write(self.style.MIGRATE_HEADING('== get_tasks (OR form, page of 50)'))
+        self.stdout.write(combined.explain())
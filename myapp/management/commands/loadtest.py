@@ -0,0 +1,77 @@
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Fire concurrent GETs at a running deployment and report throughput and tail latency. '
+        'Run it once against the WSGI server (gunicorn backend.wsgi) and once against the ASGI '
+        'server (e.g. uvicorn backend.asgi:application) with the same --concurrency to compare them; '
+        'point --url at /api/tasks/ for the sync views or /api/async/tasks/ for the async ones.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', required=True)
+        parser.add_argument('--token', help='Bearer access token')
+        parser.add_argument('--username')
+        parser.add_argument('--password')
+        parser.add_argument('--token-url', help='Defaults to <scheme://host>/api/token/')
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        token = options['token'] or self.obtain_token(options)
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        url = options['url']
+
+        def fetch(_):
+            request = urllib.request.Request(url, headers=headers)
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request) as response:
+                    response.read()
+                    ok = response.status < 400
+            except (urllib.error.URLError, ConnectionError):
+                ok = False
+            return time.perf_counter() - start, ok
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(fetch, range(options['requests'])))
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(latency * 1000 for latency, ok in results if ok)
+        errors = sum(1 for _, ok in results if not ok)
+        if not latencies:
+            raise CommandError(f'All {errors} requests failed')
+
+        centiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        self.stdout.write(f'url          {url}')
+        self.stdout.write(f'concurrency  {options["concurrency"]}')
+        self.stdout.write(f'requests     {len(results)} ({errors} errors)')
+        self.stdout.write(f'req/s        {len(results) / elapsed:.1f}')
+        self.stdout.write(f'p50 ms       {centiles[49]:.1f}')
+        self.stdout.write(f'p95 ms       {centiles[94]:.1f}')
+        self.stdout.write(f'p99 ms       {centiles[98]:.1f}')
+        self.stdout.write(f'max ms       {latencies[-1]:.1f}')
+
+    def obtain_token(self, options):
+        if not options['username']:
+            return None
+        token_url = options['token_url']
+        if not token_url:
+            scheme, _, host = options['url'].split('/', 3)[:3]
+            token_url = f'{scheme}//{host}/api/token/'
+        body = json.dumps({'username': options['username'], 'password': options['password']}).encode()
+        request = urllib.request.Request(token_url, data=body, headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request) as response:
+                return json.loads(response.read())['access']
+        except urllib.error.URLError as e:
+            raise CommandError(f'Could not obtain a token from {token_url}: {e}')
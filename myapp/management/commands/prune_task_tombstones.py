@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from myapp.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = 'Delete task tombstones older than TASKS_SYNC_TOMBSTONE_DAYS (run daily)'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Pruned {prune_tombstones()} task tombstones')
@@ -0,0 +1,30 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp import purge
+from myapp.models import UserPurge
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete users and their tasks in batches (see USER_PURGE_BATCH_SIZE). Without --user, '
+        'finish the account deletions an interrupted worker left behind (run on deploy or from cron)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', help='Delete this user id now (repeatable)')
+
+    def handle(self, *args, **options):
+        user_ids = options['user']
+        if user_ids:
+            missing = set(user_ids) - set(User.objects.filter(id__in=user_ids).values_list('id', flat=True))
+            if missing:
+                raise CommandError(f'No such user: {", ".join(map(str, sorted(missing)))}')
+            for user_id in user_ids:
+                purge.mark(user_id)
+        for user_id in user_ids or UserPurge.objects.order_by('requested_at').values_list('user_id', flat=True):
+            start = time.perf_counter()
+            deleted = purge.purge_user(user_id)
+            self.stdout.write(f'User {user_id}: deleted {deleted} tasks in {time.perf_counter() - start:.1f}s')
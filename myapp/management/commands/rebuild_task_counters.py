@@ -0,0 +1,19 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from myapp.dashboard import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Recount the TaskCounter rows behind tasks/summary/ (run after enabling TASK_COUNTERS_ENABLED)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', help='Only this user id (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        user_ids = options['user'] or list(User.objects.order_by('id').values_list('id', flat=True))
+        batch = options['batch_size']
+        for start in range(0, len(user_ids), batch):
+            rebuild_counters(user_ids[start:start + batch])
+        self.stdout.write(f'Rebuilt task counters for {len(user_ids)} users')
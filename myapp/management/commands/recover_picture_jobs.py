@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from myapp import pictures
+
+
+class Command(BaseCommand):
+    help = (
+        'Fail profile pictures left pending for PROFILE_PICTURE_JOB_TIMEOUT seconds and remove spool '
+        'files that old (run on every host on deploy and from cron)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--timeout', type=int, help='Seconds instead of PROFILE_PICTURE_JOB_TIMEOUT')
+
+    def handle(self, *args, **options):
+        failed, removed = pictures.recover_lost_jobs(options['timeout'])
+        self.stdout.write(f'Marked {failed} pending pictures failed, removed {removed} spool files')
@@ -0,0 +1,44 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp import seed
+
+
+class Command(BaseCommand):
+    help = (
+        'Create a reproducible data set for benchmarks: users <prefix>-0..N-1 (password --password) '
+        'with tasks, assignees and profiles, written with bulk_create'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--tasks-per-user', type=int, default=100)
+        parser.add_argument('--fan-out', type=int, default=5, help='Distinct assignees per user')
+        parser.add_argument('--profile-ratio', type=float, default=0.5)
+        parser.add_argument('--prefix', default='seed')
+        parser.add_argument('--password', default='seed')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; same seed, same data')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--clear', action='store_true', help='Delete a previous data set with this prefix first')
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if User.objects.filter(username__startswith=f'{prefix}-').exists():
+            if not options['clear']:
+                raise CommandError(f'Users named {prefix}-* already exist; pass --clear to replace them')
+            _, deleted = seed.unseed(prefix)
+            self.stdout.write(f'Deleted {deleted.get("auth.User", 0)} users and {deleted.get("myapp.Task", 0)} tasks')
+
+        start = time.perf_counter()
+        user_ids = seed.seed(
+            options['users'], options['tasks_per_user'], fan_out=options['fan_out'],
+            profile_ratio=options['profile_ratio'], prefix=prefix, password=options['password'],
+            rng_seed=options['seed'], batch_size=options['batch_size'],
+        )
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'Created {len(user_ids)} users and {len(user_ids) * options["tasks_per_user"]} tasks '
+            f'in {elapsed:.1f}s'
+        )
@@ -0,0 +1,186 @@
+# Per-request performance metrics, recorded by PerformanceMiddleware and
+# served in Prometheus text format at metrics/.
+#
+# Each request gets a RequestMetrics in a context variable, which follows the
+# request into sync_to_async threads under ASGI. Queries are counted by an
+# execute wrapper installed on every database connection as it opens, and
+# serialization time by renderers.dumps(). Totals live in this process only:
+# with several gunicorn workers each one reports its own.
+
+import contextvars
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+        # SQL templates (no parameters) by number of executions, so an N+1
+        # shows up as one statement run N times
+        self.statements = Counter()
+
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_seconds += time.perf_counter() - start
+        metrics.queries += 1
+        metrics.statements[sql] += 1
+
+
+def install(connection):
+    """Count this connection's queries against the current request."""
+    if db_execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(db_execute_wrapper)
+
+
+def record_serialize(seconds):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.serialize_seconds += seconds
+
+
+def start_request():
+    """Begin measuring a request; pass the returned token to end_request()."""
+    return _current.set(RequestMetrics())
+
+
+def end_request(token, request, response):
+    metrics = _current.get()
+    _current.reset(token)
+    elapsed = time.perf_counter() - metrics.start
+    match = getattr(request, 'resolver_match', None)
+    # The route pattern, not the path, so ids do not blow up the label set
+    route = '/' + match.route if match is not None else 'unmatched'
+    observe(request.method, route, response.status_code, elapsed, metrics)
+    _check_budgets(request, elapsed, metrics)
+    return metrics
+
+
+def _check_budgets(request, elapsed, metrics):
+    latency_budget = settings.PERF_LATENCY_BUDGET_MS
+    query_budget = settings.PERF_QUERY_BUDGET
+    over_latency = latency_budget and elapsed * 1000 > latency_budget
+    over_queries = query_budget and metrics.queries > query_budget
+    if not (over_latency or over_queries):
+        return
+    statements = '\n'.join(f'  {count}x {sql}' for sql, count in metrics.statements.most_common())
+    logger.warning(
+        'Slow request %s %s: %.1f ms, %d queries (%.1f ms in the database, %.1f ms serializing)\n%s',
+        request.method, request.get_full_path(), elapsed * 1000, metrics.queries,
+        metrics.db_seconds * 1000, metrics.serialize_seconds * 1000, statements,
+    )
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f'{name}_sum{{{labels}}} {self.sum}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+HISTOGRAMS = (
+    ('http_request_duration_seconds', 'Time to produce the response', LATENCY_BUCKETS),
+    ('http_request_db_queries', 'Database queries per request', QUERY_BUCKETS),
+    ('http_request_db_seconds', 'Time spent in database queries per request', LATENCY_BUCKETS),
+    ('http_request_serialize_seconds', 'Time spent encoding JSON per request', LATENCY_BUCKETS),
+)
+
+_series = {}
+_requests = Counter()
+_lock = threading.Lock()
+
+
+def observe(method, route, status, elapsed, metrics):
+    values = (elapsed, metrics.queries, metrics.db_seconds, metrics.serialize_seconds)
+    with _lock:
+        series = _series.get((method, route))
+        if series is None:
+            series = _series[method, route] = [Histogram(buckets) for _, _, buckets in HISTOGRAMS]
+        for histogram, value in zip(series, values):
+            histogram.observe(value)
+        _requests[method, route, status] += 1
+
+
+def reset():
+    with _lock:
+        _series.clear()
+        _requests.clear()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    from . import cache as task_cache
+    from . import compression
+
+    lines = ['# HELP http_requests_total Requests served', '# TYPE http_requests_total counter']
+    with _lock:
+        for (method, route, status), count in sorted(_requests.items()):
+            lines.append(
+                f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}'
+            )
+        for i, (name, help_text, _) in enumerate(HISTOGRAMS):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for (method, route), series in sorted(_series.items()):
+                lines.extend(series[i].samples(name, f'method="{method}",route="{_escape(route)}"'))
+
+    task_cache_stats = task_cache.cache_stats()
+    lines.append('# HELP task_list_cache_requests_total Task list cache lookups')
+    lines.append('# TYPE task_list_cache_requests_total counter')
+    for result in ('hits', 'misses'):
+        lines.append(f'task_list_cache_requests_total{{result="{result}"}} {task_cache_stats[result]}')
+
+    stats = compression.compression_stats()
+    for key, help_text in (
+        ('responses', 'Responses compressed'),
+        ('bytes_in', 'Bytes before compression'),
+        ('bytes_out', 'Bytes after compression'),
+        ('cpu_seconds', 'CPU time spent compressing'),
+    ):
+        lines.append(f'# HELP http_compression_{key}_total {help_text}')
+        lines.append(f'# TYPE http_compression_{key}_total counter')
+        for encoding, values in sorted(stats.items()):
+            lines.append(f'http_compression_{key}_total{{encoding="{encoding}"}} {values[key]}')
+    return '\n'.join(lines) + '\n'
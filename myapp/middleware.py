@@ -0,0 +1,89 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from . import compression, metrics
+
+
+class PerformanceMiddleware:
+    """
+    Record latency, query count, database time and serialization time per
+    route (see metrics.py), and log requests over PERF_LATENCY_BUDGET_MS or
+    PERF_QUERY_BUDGET with their SQL. Runs natively in both sync and async
+    mode, so async views are not pushed onto a thread. For streamed responses
+    the latency is the time to the first byte.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = metrics.start_request()
+        response = self.get_response(request)
+        metrics.end_request(token, request, response)
+        return response
+
+    async def __acall__(self, request):
+        token = metrics.start_request()
+        response = await self.get_response(request)
+        metrics.end_request(token, request, response)
+        return response
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    GZipMiddleware with brotli/zstd: compresses text and JSON responses with
+    the first of COMPRESSION_ENCODINGS that is installed and accepted by the
+    client. Bodies under COMPRESSION_MIN_SIZE, already-encoded responses and
+    binary or event-stream content are left alone. Streamed responses are
+    compressed as they stream, without a flush per chunk, so the compressor
+    may hold data back until later chunks or the end of the stream.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.codecs = compression.available_codecs(settings.COMPRESSION_ENCODINGS)
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+        if response.has_header('Content-Encoding') or response.has_header('Content-Range'):
+            return response
+        if not compression.is_compressible(response.get('Content-Type', '')):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        codec = compression.negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''), self.codecs)
+        if codec is None:
+            return response
+
+        if response.streaming:
+            meter = compression.StreamMeter(codec)
+            if response.is_async:
+                response.streaming_content = meter.awrap(response.streaming_content)
+            else:
+                response.streaming_content = meter.wrap(response.streaming_content)
+            del response.headers['Content-Length']
+        else:
+            content = compression.compress(codec, response.content)
+            if content is None:
+                return response
+            response.content = content
+            response.headers['Content-Length'] = str(len(content))
+
+        # The encoded body is a different representation, so a strong ETag
+        # becomes weak (RFC 9110 8.8.1); is_not_modified() compares weakly
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = codec.name
+        return response
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.1 on 2026-10-17 23:00
+
+from django.db import migrations, models
+
+
+def mark_existing_pictures_ready(apps, schema_editor):
+    Profile = apps.get_model('myapp', 'Profile')
+    Profile.objects.exclude(profile_picture__isnull=True).exclude(profile_picture='').update(picture_status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0008_task_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='picture_status',
+            field=models.CharField(choices=[('none', 'None'), ('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='none', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='picture_upload_id',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='profile_thumbnail',
+            field=models.ImageField(blank=True, null=True, upload_to='profile_pics/thumbs/'),
+        ),
+        migrations.RunPython(mark_existing_pictures_ready, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 00:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0013_user_purges'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='picture_requested_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,10 +1,27 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 
 class Profile(models.Model):
+    PICTURE_STATUS_CHOICES = [
+        ('none', 'None'),
+        ('pending', 'Pending'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     profile_picture = models.ImageField(upload_to='profile_pics/', null=True, blank=True)
+    profile_thumbnail = models.ImageField(upload_to='profile_pics/thumbs/', null=True, blank=True)
+    # State of the background processing started by upload_profile_picture
+    picture_status = models.CharField(max_length=10, choices=PICTURE_STATUS_CHOICES, default='none')
+    # Id of the upload being processed; a worker only publishes its result if
+    # this still matches, so a slow older upload cannot overwrite a newer one
+    picture_upload_id = models.UUIDField(null=True, blank=True)
+    # When that processing was started; recover_picture_jobs fails uploads
+    # left pending for longer than PROFILE_PICTURE_JOB_TIMEOUT
+    picture_requested_at = models.DateTimeField(null=True, blank=True)
 
 
 class Task(models.Model):
@@ -30,5 +47,119 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            # get_tasks: WHERE assigned_to = u OR created_by = u ORDER BY -created_at, -id.
+            # One index per side of the OR, each already in list order.
+            models.Index(fields=['assigned_to', '-created_at', '-id'], name='task_assignee_created_idx'),
+            models.Index(fields=['created_by', '-created_at', '-id'], name='task_creator_created_idx'),
+            # ?updated_since= and ?sort=updated_at
+            models.Index(fields=['assigned_to', '-updated_at', '-id'], name='task_assignee_updated_idx'),
+            models.Index(fields=['created_by', '-updated_at', '-id'], name='task_creator_updated_idx'),
+            # ?deadline_from=/?deadline_to= and ?sort=deadline
+            models.Index(fields=['assigned_to', 'deadline', 'id'], name='task_assignee_deadline_idx'),
+            models.Index(fields=['created_by', 'deadline', 'id'], name='task_creator_deadline_idx'),
+        ]
+
+    # Fields the TaskCounter buckets are keyed on
+    COUNTED_FIELDS = ['status', 'priority', 'deadline', 'assigned_to_id', 'created_by_id']
+
+    loaded_list_user_ids = frozenset()
+    loaded_counter_buckets = frozenset()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember whose task lists this row was in when it was loaded, so a
+        # save that reassigns it can invalidate the previous users' caches too.
+        instance.loaded_list_user_ids = instance.list_user_ids()
+        # Likewise the dashboard counter buckets it was counted in (None if a
+        # counted field was deferred and the old buckets are unknown)
+        instance.loaded_counter_buckets = instance.counter_buckets() if set(cls.COUNTED_FIELDS) <= set(field_names) else None
+        return instance
+
+    def list_user_ids(self):
+        """Ids of the users whose get_tasks list contains this task."""
+        return {
+            user_id for user_id in (self.__dict__.get('assigned_to_id'), self.__dict__.get('created_by_id'))
+            if user_id
+        }
+
+    def counter_buckets(self):
+        """The (user_id, relation, status, priority, deadline) TaskCounter rows counting this task."""
+        assigned_to_id = self.__dict__.get('assigned_to_id')
+        created_by_id = self.__dict__.get('created_by_id')
+        # A deadline assigned as a 'YYYY-MM-DD' string stays one until the
+        # task is reloaded; count it in the same bucket as the date
+        deadline = self._meta.get_field('deadline').to_python(self.__dict__.get('deadline'))
+        buckets = set()
+        for user_id in self.list_user_ids():
+            if user_id == assigned_to_id == created_by_id:
+                relation = 'both'
+            elif user_id == created_by_id:
+                relation = 'created'
+            else:
+                relation = 'assigned'
+            buckets.add((user_id, relation, self.status, self.priority, deadline))
+        return frozenset(buckets)
+
     def __str__(self):
         return self.title
+
+
+class TaskCounter(models.Model):
+    """
+    Number of tasks in one user's list per (relation, status, priority,
+    deadline), kept up to date on task writes when TASK_COUNTERS_ENABLED is
+    set. The dashboard summary then sums a handful of these rows instead of
+    scanning the user's tasks.
+    """
+    RELATION_CHOICES = [
+        ('created', 'Created'),
+        ('assigned', 'Assigned'),
+        ('both', 'Created and assigned'),
+    ]
+
+    user = models.ForeignKey(User, related_name='task_counters', on_delete=models.CASCADE)
+    relation = models.CharField(max_length=10, choices=RELATION_CHOICES)
+    status = models.CharField(max_length=10, choices=Task.STATUS_CHOICES)
+    priority = models.CharField(max_length=10, choices=Task.PRIORITY_CHOICES)
+    deadline = models.DateField(null=True, blank=True)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'relation', 'status', 'priority', 'deadline'],
+                name='task_counter_bucket_unique',
+            ),
+        ]
+
+
+class TaskTombstone(models.Model):
+    """
+    A task that left a user's list, by being deleted or reassigned away, so
+    tasks/sync/ can tell clients to drop it. Removed again if the task comes
+    back into the list, and pruned after TASKS_SYNC_TOMBSTONE_DAYS.
+    """
+    # Plain ids rather than foreign keys: tombstones are written while the
+    # task, and possibly its users, are being deleted
+    user_id = models.IntegerField()
+    task_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user_id', 'deleted_at', 'id'], name='task_tombstone_sync_idx'),
+        ]
+
+
+class UserPurge(models.Model):
+    """
+    A user whose account is being deleted in the background (see purge.py).
+    The user is deactivated when this is created and deleted, along with
+    this row, once their tasks are gone; purge_users resumes any left over.
+    """
+    # A plain id: the user row is deleted while this one still exists
+    user_id = models.IntegerField(unique=True)
+    requested_at = models.DateTimeField(default=timezone.now)
@@ -0,0 +1,151 @@
+import base64
+import json
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Q
+from django.utils.dateparse import parse_date, parse_datetime
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+# Keys the task list can be sorted by (?sort=key or ?sort=-key), with the
+# parser for their cursor values. Each has a (user, key) index per UNION
+# branch; ties are broken by id in the same direction.
+SORT_FIELDS = {
+    'created_at': parse_datetime,
+    'updated_at': parse_datetime,
+    'deadline': parse_date,
+}
+NULLABLE_SORT_FIELDS = {'deadline'}
+DEFAULT_SORT = '-created_at'
+
+
+def encode_cursor(value, pk, sort=DEFAULT_SORT):
+    raw = json.dumps({
+        's': sort,
+        'v': value.isoformat() if value is not None else None,
+        'i': pk,
+    }, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sort=DEFAULT_SORT):
+    """Return the (value, pk) a cursor points at; it must have been issued for `sort`."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        raw_value = data['v']
+        value = SORT_FIELDS[sort.lstrip('-')](raw_value) if raw_value is not None else None
+        pk = int(data['i'])
+        cursor_sort = data['s']
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise InvalidCursor('Invalid cursor')
+    if cursor_sort != sort:
+        raise InvalidCursor('Cursor was issued for a different sort')
+    if value is None and (raw_value is not None or sort.lstrip('-') not in NULLABLE_SORT_FIELDS):
+        raise InvalidCursor('Invalid cursor')
+    return value, pk
+
+
+def ordering(sort=DEFAULT_SORT):
+    """ORDER BY for a sort key: the field (NULLs last) then id, both in the same direction."""
+    field = sort.lstrip('-')
+    descending = sort.startswith('-')
+    if field in NULLABLE_SORT_FIELDS:
+        first = F(field).desc(nulls_last=True) if descending else F(field).asc(nulls_last=True)
+    else:
+        first = sort
+    return (first, '-id' if descending else 'id')
+
+
+def get_page_size(request):
+    """Read ?page_size=, falling back to TASKS_PAGE_SIZE and capped at TASKS_MAX_PAGE_SIZE."""
+    value = request.GET.get('page_size')
+    if not value:
+        return settings.TASKS_PAGE_SIZE
+    try:
+        page_size = int(value)
+    except ValueError:
+        raise InvalidCursor('page_size must be an integer')
+    if page_size < 1:
+        raise InvalidCursor('page_size must be positive')
+    return min(page_size, settings.TASKS_MAX_PAGE_SIZE)
+
+
+def keyset_page(querysets, cursor, page_size, sort=DEFAULT_SORT):
+    """
+    Return (rows, next_cursor) for one page ordered by `sort` (a SORT_FIELDS
+    key, '-' for descending) and then id.
+
+    Seeks past the cursor with a WHERE on (sort field, id) instead of OFFSET,
+    so every page costs the same no matter how deep the client has scrolled.
+    `querysets` may be a list; the page is then read as a UNION of them, each
+    side filtered (and, where the backend allows, limited) on its own index.
+    """
+    rows = list(_page_query(querysets, cursor, page_size, sort))
+    return _split_page(rows, page_size, sort)
+
+
+async def akeyset_page(querysets, cursor, page_size, sort=DEFAULT_SORT):
+    """Async keyset_page() for views running on the ASGI event loop."""
+    rows = [row async for row in _page_query(querysets, cursor, page_size, sort)]
+    return _split_page(rows, page_size, sort)
+
+
+def _seek(sort, value, pk):
+    """Rows after (value, pk) in `sort` order, NULLs of a nullable field coming last."""
+    field = sort.lstrip('-')
+    after = 'lt' if sort.startswith('-') else 'gt'
+    if value is None:
+        # Already into the trailing NULLs; only the id still orders them
+        return Q(**{f'{field}__isnull': True, f'id__{after}': pk})
+    seek = Q(**{f'{field}__{after}': value}) | Q(**{field: value, f'id__{after}': pk})
+    if field in NULLABLE_SORT_FIELDS:
+        seek |= Q(**{f'{field}__isnull': True})
+    return seek
+
+
+def _page_query(querysets, cursor, page_size, sort):
+    if not isinstance(querysets, (list, tuple)):
+        querysets = [querysets]
+
+    seek = None
+    if cursor:
+        seek = _seek(sort, *decode_cursor(cursor, sort))
+
+    # Fetch one extra row to know whether there is a next page.
+    branches = [qs.filter(seek) if seek is not None else qs for qs in querysets]
+    return union_ordered(branches, page_size + 1, sort)
+
+
+def _split_page(rows, page_size, sort):
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        # Rows are model instances or, from .values(), dicts
+        if isinstance(last, dict):
+            next_cursor = encode_cursor(last[sort.lstrip('-')], last['id'], sort)
+        else:
+            next_cursor = encode_cursor(getattr(last, sort.lstrip('-')), last.id, sort)
+    return rows, next_cursor
+
+
+def union_ordered(querysets, limit=None, sort=DEFAULT_SORT):
+    """UNION the querysets ordered by `sort` then id, optionally limited."""
+    order = ordering(sort)
+    if len(querysets) == 1:
+        queryset = querysets[0].order_by(*order)
+        return queryset[:limit] if limit else queryset
+
+    if limit and connection.features.supports_slicing_ordering_in_compound:
+        # Let each side walk its own index and stop after one page
+        querysets = [qs.order_by(*order)[:limit] for qs in querysets]
+    else:
+        querysets = [qs.order_by() for qs in querysets]
+
+    queryset = querysets[0].union(*querysets[1:]).order_by(*order)
+    return queryset[:limit] if limit else queryset
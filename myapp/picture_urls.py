@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+
+URL_KEY = 'profile:picture-urls:{}'
+
+
+def _build_url(name):
+    mode = settings.PROFILE_PICTURE_URL_MODE
+    if mode == 'cdn':
+        return f'https://{settings.PROFILE_PICTURE_CDN_DOMAIN}/{name}'
+    if mode == 'presigned':
+        # Signed by the storage backend (S3 query string auth / CloudFront signer)
+        return default_storage.url(name, expire=settings.PROFILE_PICTURE_URL_EXPIRY)
+    # Agar production hai toh S3 url
+    if settings.ENVIRONMENT == 'production':
+        return f'https://{settings.AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com/{name}'
+    # Local: relative to MEDIA_URL, the view makes it absolute for the request host
+    return settings.MEDIA_URL + name
+
+
+def _build(picture, thumbnail):
+    return {
+        'name': picture or '',
+        'picture': _build_url(picture) if picture else None,
+        'thumbnail': _build_url(thumbnail) if thumbnail else None,
+    }
+
+
+def _cached():
+    # Plain URLs are a string format away, cheaper than a cache round trip;
+    # only signed URLs are worth caching (for half their lifetime, so a cached
+    # URL always has at least that long left to live).
+    return settings.PROFILE_PICTURE_URL_MODE == 'presigned'
+
+
+def resolve_many(profiles):
+    """Return {profile.id: {'picture': url, 'thumbnail': url}} for the profiles."""
+    return resolve_names({
+        profile.id: (profile.profile_picture.name, profile.profile_thumbnail.name)
+        for profile in profiles if profile is not None
+    })
+
+
+def resolve_names(names):
+    """
+    resolve_many() for rows read with .values(): takes
+    {profile id: (picture name, thumbnail name)}.
+    """
+    if not _cached():
+        return {profile_id: _build(*pair) for profile_id, pair in names.items()}
+
+    keys = {profile_id: URL_KEY.format(profile_id) for profile_id in names}
+    found = cache.get_many(keys.values())
+    urls, missing = {}, {}
+    for profile_id, (picture, thumbnail) in names.items():
+        entry = found.get(keys[profile_id])
+        # The stored name guards against a URL cached for a previous upload
+        if entry is None or entry['name'] != (picture or ''):
+            entry = missing[keys[profile_id]] = _build(picture, thumbnail)
+        urls[profile_id] = entry
+    if missing:
+        cache.set_many(missing, settings.PROFILE_PICTURE_URL_EXPIRY // 2)
+    return urls
+
+
+def resolve(profile):
+    if profile is None:
+        return {'picture': None, 'thumbnail': None}
+    return resolve_many([profile])[profile.id]
+
+
+def invalidate(profile_id):
+    cache.delete(URL_KEY.format(profile_id))
@@ -0,0 +1,154 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from . import picture_urls
+from .models import Profile
+from .signals import refresh_task_lists_embedding
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+FORMATS = {
+    'WEBP': ('webp', {'quality': 85, 'method': 4}),
+    'JPEG': ('jpg', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PROFILE_PICTURE_WORKERS,
+                thread_name_prefix='profile-picture',
+            )
+        return _executor
+
+
+def enqueue(profile_id, upload_id, spool_path):
+    """Process the spooled upload once the current transaction commits."""
+    def submit():
+        if settings.PROFILE_PICTURE_WORKERS:
+            _get_executor().submit(_run_in_worker, profile_id, upload_id, spool_path)
+        else:
+            process_upload(profile_id, upload_id, spool_path)
+    transaction.on_commit(submit)
+
+
+def _render(image, max_size):
+    """Resize to fit max_size and encode without any of the source metadata."""
+    image = image.copy()
+    image.thumbnail((max_size, max_size), Image.LANCZOS)
+    extension, options = FORMATS[settings.PROFILE_PICTURE_FORMAT]
+    buffer = BytesIO()
+    image.save(buffer, settings.PROFILE_PICTURE_FORMAT, **options)
+    return extension, buffer.getvalue()
+
+
+def _run_in_worker(profile_id, upload_id, spool_path):
+    # No request cycle closes a pool thread's connection, so apply
+    # CONN_MAX_AGE and drop dead connections around each job here
+    close_old_connections()
+    try:
+        process_upload(profile_id, upload_id, spool_path)
+    finally:
+        close_old_connections()
+
+
+def process_upload(profile_id, upload_id, spool_path):
+    try:
+        _process(profile_id, upload_id, spool_path)
+    except Exception:
+        logger.exception('Processing profile picture upload %s failed', upload_id)
+        Profile.objects.filter(id=profile_id, picture_upload_id=upload_id).update(picture_status='failed')
+    finally:
+        if os.path.exists(spool_path):
+            os.remove(spool_path)
+
+
+def _process(profile_id, upload_id, spool_path):
+    try:
+        with Image.open(spool_path) as source:
+            source.load()
+            # Apply the EXIF rotation before the metadata is dropped
+            image = ImageOps.exif_transpose(source)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        Profile.objects.filter(id=profile_id, picture_upload_id=upload_id).update(picture_status='failed')
+        return
+
+    if settings.PROFILE_PICTURE_FORMAT == 'JPEG' or image.mode not in ('RGB', 'RGBA'):
+        keep_alpha = settings.PROFILE_PICTURE_FORMAT != 'JPEG' and image.has_transparency_data
+        image = image.convert('RGBA' if keep_alpha else 'RGB')
+
+    extension, picture = _render(image, settings.PROFILE_PICTURE_MAX_SIZE)
+    _, thumbnail = _render(image, settings.PROFILE_THUMBNAIL_SIZE)
+
+    profile = Profile.objects.get(id=profile_id)
+    old_picture, old_thumbnail = profile.profile_picture.name, profile.profile_thumbnail.name
+
+    # Push to STORAGES["default"] (S3 in production) from the worker thread
+    name = f'{upload_id.hex}.{extension}'
+    picture_name = profile.profile_picture.storage.save(
+        profile.profile_picture.field.generate_filename(profile, name), ContentFile(picture))
+    thumbnail_name = profile.profile_thumbnail.storage.save(
+        profile.profile_thumbnail.field.generate_filename(profile, name), ContentFile(thumbnail))
+
+    # Publish only if no newer upload has replaced this one in the meantime
+    published = Profile.objects.filter(id=profile_id, picture_upload_id=upload_id).update(
+        profile_picture=picture_name,
+        profile_thumbnail=thumbnail_name,
+        picture_status='ready',
+    )
+    if published:
+        stale = [old_picture, old_thumbnail]
+        picture_urls.invalidate(profile_id)
+        # Task lists embed the thumbnail as the user's avatar
+        refresh_task_lists_embedding(profile.user_id)
+    else:
+        stale = [picture_name, thumbnail_name]
+    for stale_name in stale:
+        if stale_name:
+            profile.profile_picture.storage.delete(stale_name)
+
+
+def recover_lost_jobs(timeout=None):
+    """
+    Clean up after jobs that died with their worker (restart, crash, OOM):
+    uploads still pending after `timeout` seconds are marked failed so the
+    user can upload again, and spool files that old are removed, since no
+    job is reading them any more. Spool files are local, so this has to run
+    on every host. Returns (failed uploads, removed files).
+    """
+    timeout = timeout or settings.PROFILE_PICTURE_JOB_TIMEOUT
+    stale = Q(picture_requested_at__lt=timezone.now() - timedelta(seconds=timeout)) | Q(picture_requested_at=None)
+    failed = Profile.objects.filter(stale, picture_status='pending').update(picture_status='failed')
+
+    removed = 0
+    cutoff = time.time() - timeout
+    try:
+        entries = list(os.scandir(settings.PROFILE_PICTURE_SPOOL_DIR))
+    except FileNotFoundError:
+        entries = []
+    # Unfinished resumable uploads live in a subdirectory and expire on their own
+    for entry in entries:
+        if entry.is_file() and entry.stat().st_mtime < cutoff:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+    return failed, removed
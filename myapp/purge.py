@@ -0,0 +1,98 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import close_old_connections, transaction
+
+from . import bulk
+from .authentication import forget_user
+from .models import Task, TaskTombstone, UserPurge
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Deleting a user cascades to the tasks they own, created or are assigned;
+# each relation is walked on its own index
+TASK_RELATIONS = ('user_id', 'created_by_id', 'assigned_to_id')
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.USER_PURGE_WORKERS,
+                thread_name_prefix='user-purge',
+            )
+        return _executor
+
+
+def mark(user_id):
+    """Deactivate the user and record that they are to be purged."""
+    # A queryset update: saving the user would bump every task that embeds them
+    User.objects.filter(id=user_id).update(is_active=False)
+    forget_user(user_id)
+    UserPurge.objects.get_or_create(user_id=user_id)
+
+
+def schedule(user_id):
+    """
+    mark() the user now and delete them and their tasks in the background
+    once the current transaction commits.
+    """
+    mark(user_id)
+
+    def submit():
+        if settings.USER_PURGE_WORKERS:
+            _get_executor().submit(_run_in_worker, user_id)
+        else:
+            run(user_id)
+    transaction.on_commit(submit)
+
+
+def _run_in_worker(user_id):
+    # No request cycle closes a pool thread's connection, so apply
+    # CONN_MAX_AGE and drop dead connections around each job here
+    close_old_connections()
+    try:
+        run(user_id)
+    finally:
+        close_old_connections()
+
+
+def run(user_id):
+    try:
+        purge_user(user_id)
+    except Exception:
+        # The UserPurge row stays; purge_users picks it up again
+        logger.exception('Purging user %s failed', user_id)
+
+
+def purge_user(user_id, batch_size=None):
+    """
+    Delete the user's tasks USER_PURGE_BATCH_SIZE at a time, each batch in
+    its own short transaction so no lock on the tasks table is held for
+    long, then the user. Safe to re-run after an interruption.
+    """
+    batch_size = batch_size or settings.USER_PURGE_BATCH_SIZE
+    deleted = 0
+    for relation in TASK_RELATIONS:
+        tasks = Task.objects.filter(**{relation: user_id})
+        while True:
+            ids = list(tasks.values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            deleted += len(bulk.delete_tasks(ids, exclude_user_ids={user_id}))
+
+    with transaction.atomic():
+        # Nothing references the user's tasks any more, so this cascade only
+        # reaches the profile and counters
+        User.objects.filter(id=user_id).delete()
+        TaskTombstone.objects.filter(user_id=user_id).delete()
+        UserPurge.objects.filter(user_id=user_id).delete()
+    return deleted
+
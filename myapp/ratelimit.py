@@ -0,0 +1,61 @@
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+
+def hit(scope, key, limit, window):
+    """
+    Count one request against `key` in a fixed window of `window` seconds.
+    Returns the seconds until the window resets if this request is over
+    `limit` (0 = no limit), else None.
+    """
+    if not limit:
+        return None
+    cache = caches['ratelimit']
+    now = time.time()
+    window_start = int(now // window) * window
+    digest = hashlib.sha1(str(key).encode()).hexdigest()
+    cache_key = f'ratelimit:{scope}:{digest}:{window_start}'
+    cache.add(cache_key, 0, window)
+    try:
+        count = cache.incr(cache_key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.set(cache_key, 1, window)
+        count = 1
+    if count > limit:
+        return max(1, math.ceil(window_start + window - now))
+    return None
+
+
+def client_ip(request):
+    # DRF's notion of the client address: X-Forwarded-For is only read
+    # behind the NUM_PROXIES trusted proxies
+    return BaseThrottle().get_ident(request)
+
+
+def check_login(request, username):
+    """
+    Count a login attempt by IP, by username from that IP and by username
+    alone; the seconds to wait if any is over its limit. The tight username
+    limit is per IP so that nobody can lock an account out by failing its
+    logins from elsewhere; the looser one on the username alone still caps
+    guessing spread over many addresses.
+    """
+    window = settings.LOGIN_RATE_WINDOW
+    ip = client_ip(request)
+    waits = [hit('login-ip', ip, settings.LOGIN_RATE_PER_IP, window)]
+    if username not in (None, ''):
+        username = str(username).lower()
+        waits.append(hit('login-user', (username, ip), settings.LOGIN_RATE_PER_USER, window))
+        waits.append(hit('login-account', username, settings.LOGIN_RATE_PER_ACCOUNT, window))
+    waits = [wait for wait in waits if wait]
+    return max(waits) if waits else None
+
+
+def check_register(request):
+    return hit('register-ip', client_ip(request), settings.REGISTER_RATE_PER_IP, settings.LOGIN_RATE_WINDOW)
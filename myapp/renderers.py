@@ -0,0 +1,74 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from . import metrics
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _encoder_default(obj):
+    # Whatever orjson has no native encoding for (Decimal, lazy strings, ...)
+    # is handled exactly as DRF's encoder would
+    return JSONEncoder().default(obj)
+
+
+def orjson_dumps(data):
+    # OPT_UTC_Z: write UTC datetimes as ...Z like DRF's encoder does
+    return orjson.dumps(data, default=_encoder_default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+
+def stdlib_dumps(data):
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode()
+
+
+def get_dumps():
+    """The encoder picked by JSON_RENDERER: 'orjson', 'stdlib' or 'auto' (orjson if installed)."""
+    backend = settings.JSON_RENDERER
+    if backend == 'auto':
+        backend = 'orjson' if orjson is not None else 'stdlib'
+    if backend == 'orjson':
+        if orjson is None:
+            raise ImproperlyConfigured('JSON_RENDERER is orjson but the orjson package is not installed')
+        return orjson_dumps
+    if backend == 'stdlib':
+        return stdlib_dumps
+    raise ImproperlyConfigured(f'Unknown JSON_RENDERER {backend!r}')
+
+
+def dumps(data):
+    """Serialize to JSON bytes with the configured encoder."""
+    start = time.perf_counter()
+    ret = get_dumps()(data)
+    # Same escaping as JSONRenderer, so the output is safe inside <script>
+    ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+    metrics.record_serialize(time.perf_counter() - start)
+    return ret
+
+
+def json_response(data, status=200):
+    """JsonResponse(data, safe=False) encoded with dumps()."""
+    return HttpResponse(dumps(data), status=status, content_type='application/json')
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding through dumps(), so responses use orjson where it is
+    available. Indented output (?indent= via the Accept header) still goes
+    through the stdlib encoder.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
@@ -0,0 +1,80 @@
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from . import dashboard
+from .models import Profile, Task
+
+STATUS_WEIGHTS = {'pending': 6, 'completed': 4}
+PRIORITY_WEIGHTS = {'low': 3, 'medium': 5, 'high': 2}
+
+
+def seed(users, tasks_per_user, fan_out=5, profile_ratio=0.5, prefix='seed', password='seed',
+         rng_seed=0, batch_size=2000):
+    """
+    Create `users` users named <prefix>-<n> with `tasks_per_user` tasks each,
+    every user's tasks spread over `fan_out` assignees (some left unassigned),
+    and a Profile for `profile_ratio` of them. The same arguments always
+    produce the same rows. Returns the new users' ids.
+    """
+    rng = random.Random(rng_seed)
+    # One hash for everyone: hashing per user would dominate the seeding time
+    password_hash = make_password(password)
+    today = timezone.localdate()
+
+    with transaction.atomic():
+        User.objects.bulk_create(
+            (User(username=f'{prefix}-{n}', email=f'{prefix}-{n}@example.com', password=password_hash)
+             for n in range(users)),
+            batch_size=batch_size,
+        )
+        # bulk_create only returns ids on some backends; read them back
+        user_ids = list(
+            User.objects.filter(username__startswith=f'{prefix}-').order_by('id').values_list('id', flat=True)
+        )
+
+        with_profile = [user_id for user_id in user_ids if rng.random() < profile_ratio]
+        Profile.objects.bulk_create(
+            (Profile(user_id=user_id, profile_picture=f'profile_pics/{user_id}.webp',
+                     profile_thumbnail=f'profile_pics/thumbs/{user_id}.webp', picture_status='ready')
+             for user_id in with_profile),
+            batch_size=batch_size,
+        )
+
+        statuses, status_weights = zip(*STATUS_WEIGHTS.items())
+        priorities, priority_weights = zip(*PRIORITY_WEIGHTS.items())
+
+        def tasks():
+            for index, user_id in enumerate(user_ids):
+                assignees = rng.sample(user_ids, min(fan_out, len(user_ids)))
+                for n in range(tasks_per_user):
+                    # About a third without a deadline, the rest from a month
+                    # overdue to two months out
+                    deadline = None if rng.random() < 0.3 else today + timedelta(days=rng.randint(-30, 60))
+                    yield Task(
+                        user_id=user_id,
+                        created_by_id=user_id,
+                        assigned_to_id=rng.choice(assignees) if rng.random() < 0.8 else None,
+                        title=f'Task {n} of {prefix}-{index}',
+                        description=' '.join(rng.choices(('lorem', 'ipsum', 'dolor', 'sit', 'amet'), k=rng.randint(0, 40))),
+                        status=rng.choices(statuses, status_weights)[0],
+                        priority=rng.choices(priorities, priority_weights)[0],
+                        deadline=deadline,
+                    )
+
+        # bulk_create skips the post_save handlers, so counters are rebuilt below
+        Task.objects.bulk_create(tasks(), batch_size=batch_size)
+
+        if settings.TASK_COUNTERS_ENABLED:
+            dashboard.rebuild_counters(user_ids)
+    return user_ids
+
+
+def unseed(prefix='seed'):
+    """Delete the users seed() created with this prefix, and everything of theirs."""
+    return User.objects.filter(username__startswith=f'{prefix}-').delete()
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth.models import User
 from .models import Task
 
@@ -15,3 +16,14 @@ class TaskSerializer(serializers.ModelSerializer):
         # 👇 Add the new fields here
         fields = ['id', 'user', 'title','description', 'status', 'priority', 'deadline','created_by', 'assigned_to', 'created_at', 'updated_at']
 
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    # Embed what the API reads from request.user so ClaimsJWTAuthentication
+    # can skip the user lookup on every request
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['username'] = user.username
+        token['email'] = user.email
+        token['is_staff'] = user.is_staff
+        return token
@@ -0,0 +1,61 @@
+from django.contrib.auth.models import User
+from django.db.backends.signals import connection_created
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import forget_user
+from .cache import bump_task_list_generations, invalidate_task_lists
+from .dashboard import record_task_changes
+from .models import Task
+from . import events
+from . import metrics
+from . import sync
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, **kwargs):
+    # Also drop the lists of whoever the task belonged to before this save,
+    # so reassigning a task removes it from the old assignee's list.
+    invalidate_task_lists(instance.list_user_ids() | instance.loaded_list_user_ids)
+    record_task_changes([instance])
+    sync.record_task_changes([instance], created)
+    events.record_task_changes([instance], created)
+    instance.loaded_list_user_ids = instance.list_user_ids()
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    metrics.install(connection)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    forget_user(instance.id)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Re-check is_active on the next request instead of after the TTL
+    forget_user(instance.id)
+    # Task lists embed the username/email of both users. Logins only touch
+    # last_login, so skip those instead of scanning tasks on every login.
+    if created or (update_fields and set(update_fields) <= {'last_login', 'password'}):
+        return
+    refresh_task_lists_embedding(instance.id)
+
+
+def refresh_task_lists_embedding(user_id):
+    """
+    Expire every task list that embeds this user (username, email, avatar):
+    new list ETags and no cached lists for everyone on those tasks. The tasks
+    themselves are left alone, so their updated_at, ETags and sync position
+    only move when they are edited.
+    """
+    related = Task.objects.filter(Q(assigned_to_id=user_id) | Q(created_by_id=user_id))
+    user_ids = {user_id}
+    for assigned_to_id, created_by_id in related.values_list('assigned_to_id', 'created_by_id').distinct():
+        user_ids.update((assigned_to_id, created_by_id))
+    user_ids.discard(None)
+    bump_task_list_generations(user_ids)
+    invalidate_task_lists(user_ids)
@@ -0,0 +1,138 @@
+import base64
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import TaskTombstone
+from .pagination import encode_cursor, keyset_page
+
+
+class InvalidWatermark(Exception):
+    pass
+
+
+class WatermarkExpired(InvalidWatermark):
+    pass
+
+
+def encode_watermark(changed, deleted):
+    """Opaque token holding the (timestamp, id) reached in the task and tombstone streams."""
+    raw = json.dumps({
+        'c': [changed[0].isoformat(), changed[1]] if changed else None,
+        'd': [deleted[0].isoformat(), deleted[1]],
+    }, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _position(value):
+    if value is None:
+        return None
+    at = parse_datetime(value[0])
+    if at is None:
+        raise ValueError(value[0])
+    return at, int(value[1])
+
+
+def decode_watermark(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        changed = _position(data['c'])
+        deleted = _position(data['d'])
+    except (ValueError, TypeError, KeyError, IndexError):
+        raise InvalidWatermark('Invalid watermark')
+    if deleted is None:
+        raise InvalidWatermark('Invalid watermark')
+    return changed, deleted
+
+
+def _settle(position, previous, has_more, horizon):
+    """
+    The position to hand back for one stream. A row written by a transaction
+    that has not committed yet can carry a timestamp older than rows already
+    returned, so the final page stops at `horizon` (now minus
+    TASKS_SYNC_WINDOW) and rows newer than that are sent again next time.
+    """
+    if not has_more and position is not None and position > horizon:
+        position = horizon
+    if previous is not None and (position is None or position < previous):
+        position = previous
+    return position
+
+
+def changes_since(branches, user_id, watermark, batch_size):
+    """
+    Return (changed tasks, deleted task ids, new watermark, has_more) for the
+    user's task list. Without a watermark every task counts as changed and
+    only later deletions are reported.
+    """
+    now = timezone.now()
+    horizon = (now - timedelta(seconds=settings.TASKS_SYNC_WINDOW), 0)
+    if watermark:
+        changed_from, deleted_from = decode_watermark(watermark)
+        if deleted_from[0] < now - timedelta(days=settings.TASKS_SYNC_TOMBSTONE_DAYS):
+            # Tombstones this old may have been pruned
+            raise WatermarkExpired('Watermark expired, sync from scratch')
+    else:
+        changed_from, deleted_from = None, horizon
+
+    # Tasks in (updated_at, id) order, resuming after the last one sent
+    cursor = encode_cursor(changed_from[0], changed_from[1], 'updated_at') if changed_from else None
+    tasks, next_cursor = keyset_page(branches, cursor, batch_size, 'updated_at')
+    changed_more = next_cursor is not None
+    changed_to = (tasks[-1].updated_at, tasks[-1].id) if tasks else None
+
+    deleted_at, deleted_id = deleted_from
+    tombstones = list(
+        TaskTombstone.objects.filter(user_id=user_id)
+        .filter(Q(deleted_at__gt=deleted_at) | Q(deleted_at=deleted_at, id__gt=deleted_id))
+        .order_by('deleted_at', 'id')
+        .values_list('deleted_at', 'id', 'task_id')[:batch_size + 1]
+    )
+    deleted_more = len(tombstones) > batch_size
+    tombstones = tombstones[:batch_size]
+    deleted_to = tombstones[-1][:2] if tombstones else None
+
+    new_watermark = encode_watermark(
+        _settle(changed_to, changed_from, changed_more, horizon),
+        _settle(deleted_to, deleted_from, deleted_more, horizon),
+    )
+    deleted_ids = sorted({task_id for _, _, task_id in tombstones})
+    return tasks, deleted_ids, new_watermark, changed_more or deleted_more
+
+
+def record_task_changes(tasks, created=False):
+    """Tombstone saved tasks for users they were moved out of, and clear them for users they came back to."""
+    if created:
+        return
+    removed = []
+    returned = Q()
+    for task in tasks:
+        current = task.list_user_ids()
+        removed += [
+            TaskTombstone(user_id=user_id, task_id=task.pk)
+            for user_id in task.loaded_list_user_ids - current
+        ]
+        for user_id in current - task.loaded_list_user_ids:
+            returned |= Q(user_id=user_id, task_id=task.pk)
+    if removed:
+        TaskTombstone.objects.bulk_create(removed)
+    if returned:
+        TaskTombstone.objects.filter(returned).delete()
+
+
+def record_task_deletes(tasks, exclude_user_ids=()):
+    TaskTombstone.objects.bulk_create(
+        TaskTombstone(user_id=user_id, task_id=task.pk)
+        for task in tasks for user_id in task.list_user_ids() if user_id not in exclude_user_ids
+    )
+
+
+def prune_tombstones():
+    cutoff = timezone.now() - timedelta(days=settings.TASKS_SYNC_TOMBSTONE_DAYS)
+    deleted, _ = TaskTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
@@ -1,3 +1,1464 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from PIL import Image
+
+from . import bulk, compression, dashboard, etags, events, hashing, metrics, picture_urls, pictures, purge, uploads, views
+from .cache import get_task_list, set_task_list, task_list_generation
+from .models import Profile, Task, TaskTombstone, UserPurge
+from .pagination import union_ordered
+from .renderers import FastJSONRenderer
+from .serializers import ClaimsTokenObtainPairSerializer
+
+
+class GetTasksQueryCountTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='owner', email='owner@example.com', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        caches['tasks'].clear()
+
+    def _make_tasks(self, count):
+        for i in range(count):
+            assignee = User.objects.create_user(username=f'assignee{Task.objects.count()}', email='a@example.com')
+            Task.objects.create(user=self.user, title=f'task {i}', created_by=self.user, assigned_to=assignee)
+
+    def _query_count(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/tasks/')
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_query_count_does_not_grow_with_tasks(self):
+        self._make_tasks(2)
+        small, _ = self._query_count()
+
+        self._make_tasks(20)
+        large, response = self._query_count()
+
+        self.assertEqual(small, large)
+        # ETag aggregate + the list itself
+        self.assertEqual(large, 2)
+        self.assertEqual(len(response.data), 22)
+
+    def test_user_fields_are_included(self):
+        self._make_tasks(1)
+        _, response = self._query_count()
+
+        task = response.data[0]
+        self.assertEqual(task['created_by'], {'id': self.user.id, 'username': 'owner', 'email': 'owner@example.com', 'avatar': None})
+        self.assertEqual(task['assigned_to']['username'], 'assignee0')
+
+    def test_task_on_both_sides_is_listed_once(self):
+        Task.objects.create(user=self.user, title='self', created_by=self.user, assigned_to=self.user)
+        _, response = self._query_count()
+        self.assertEqual(len(response.data), 1)
+
+
+class GetTasksPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='owner', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        caches['tasks'].clear()
+        for i in range(5):
+            Task.objects.create(user=self.user, title=f'task {i}', created_by=self.user)
+        # Give every task the same timestamp so only the id tie-breaker orders them
+        Task.objects.update(created_at=Task.objects.first().created_at)
+
+    def test_walks_all_pages_without_gaps_or_duplicates(self):
+        seen = []
+        cursor = None
+        while True:
+            params = {'page_size': 2}
+            if cursor:
+                params['cursor'] = cursor
+            response = self.client.get('/api/tasks/', params)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(task['id'] for task in response.data['results'])
+            cursor = response.data['next_cursor']
+            if not cursor:
+                break
+
+        expected = list(Task.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get('/api/tasks/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_without_params_returns_plain_list(self):
+        response = self.client.get('/api/tasks/')
+        self.assertEqual(len(response.data), 5)
+
+
+class TaskListCacheTests(TestCase):
+    def setUp(self):
+        caches['tasks'].clear()
+        self.owner = User.objects.create_user(username='owner')
+        self.alice = User.objects.create_user(username='alice')
+        self.bob = User.objects.create_user(username='bob')
+        self.task = Task.objects.create(user=self.owner, title='t', created_by=self.owner, assigned_to=self.alice)
+
+    def _list(self, user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return [task['id'] for task in client.get('/api/tasks/').data]
+
+    def test_second_read_is_served_from_cache(self):
+        self._list(self.owner)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self._list(self.owner), [self.task.id])
+        # Only the ETag aggregate runs
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_reassignment_invalidates_old_and_new_assignee(self):
+        self.assertEqual(self._list(self.alice), [self.task.id])
+        self.assertEqual(self._list(self.bob), [])
+
+        task = Task.objects.get(id=self.task.id)
+        task.assigned_to = self.bob
+        task.save()
+
+        self.assertEqual(self._list(self.alice), [])
+        self.assertEqual(self._list(self.bob), [self.task.id])
+
+    def test_lists_cached_before_the_commit_are_dropped_after_it(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.title = 'changed'
+            self.task.save()
+            # A concurrent read that still sees the old row caches it again
+            set_task_list(self.owner.id, ['stale'])
+            generation = task_list_generation(self.owner.id)
+            self.alice.username = 'alice2'
+            self.alice.save()
+            self.assertNotEqual(task_list_generation(self.owner.id), generation)
+            generation = task_list_generation(self.owner.id)
+        self.assertIsNone(get_task_list(self.owner.id))
+        self.assertNotEqual(task_list_generation(self.owner.id), generation)
+
+    def test_delete_invalidates_creator_and_assignee(self):
+        self._list(self.owner)
+        self._list(self.alice)
+        bulk.delete_tasks([self.task.id])
+        self.assertEqual(self._list(self.owner), [])
+        self.assertEqual(self._list(self.alice), [])
+
+    def test_username_change_refreshes_embedded_user(self):
+        client = APIClient()
+        client.force_authenticate(user=self.owner)
+        client.get('/api/tasks/')
+
+        self.alice.username = 'alice2'
+        self.alice.save()
+
+        response = client.get('/api/tasks/')
+        self.assertEqual(response.data[0]['assigned_to']['username'], 'alice2')
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        caches['tasks'].clear()
+        self.user = User.objects.create_user(username='owner', email='owner@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.task = Task.objects.create(user=self.user, title='t', created_by=self.user)
+
+    def test_matching_etag_returns_304_without_listing(self):
+        etag = self.client.get('/api/tasks/')['ETag']
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_etag_changes_when_a_task_changes(self):
+        etag = self.client.get('/api/tasks/')['ETag']
+        self.task.title = 'changed'
+        self.task.save()
+        response = self.client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_changes_when_a_task_is_deleted(self):
+        Task.objects.create(user=self.user, title='other', created_by=self.user)
+        etag = self.client.get('/api/tasks/')['ETag']
+        bulk.delete_tasks([self.task.id])
+        response = self.client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(PROFILE_PICTURE_URL_MODE='presigned', PROFILE_PICTURE_URL_EXPIRY=600)
+    def test_etag_changes_when_presigned_urls_are_resigned(self):
+        with mock.patch.object(etags.time, 'time', return_value=1000):
+            etag = self.client.get('/api/tasks/')['ETag']
+            self.assertEqual(self.client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with mock.patch.object(etags.time, 'time', return_value=1300):
+            response = self.client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_changes_when_an_embedded_user_changes(self):
+        etag = self.client.get('/api/tasks/')['ETag']
+        updated_at = Task.objects.get(id=self.task.id).updated_at
+        self.user.email = 'new@example.com'
+        self.user.save()
+        response = self.client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['created_by']['email'], 'new@example.com')
+        # The task itself did not change
+        self.assertEqual(Task.objects.get(id=self.task.id).updated_at, updated_at)
+
+    def test_profile_etag(self):
+        etag = self.client.get('/api/profile/')['ETag']
+        self.assertEqual(self.client.get('/api/profile/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.user.email = 'new@example.com'
+        self.user.save()
+        self.assertEqual(self.client.get('/api/profile/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class UserSearchTests(TestCase):
+    def setUp(self):
+        for name in ['bob', 'bobby', 'bobcat', 'alice', 'boba']:
+            User.objects.create_user(username=name)
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.get(username='alice'))
+
+    def _search(self, **params):
+        return [user['username'] for user in self.client.get('/api/getusers/', params).json()]
+
+    def test_exact_match_ranks_first_and_results_are_capped(self):
+        self.assertEqual(self._search(search='bob', limit=2), ['bob', 'boba'])
+
+    def test_pages_with_after(self):
+        self.assertEqual(self._search(search='bob', limit=2, after='boba'), ['bobby', 'bobcat'])
+
+    def test_empty_search_is_bounded(self):
+        self.assertEqual(len(self._search(limit=3)), 3)
+
+
+class BulkTaskTests(TestCase):
+    def setUp(self):
+        caches['tasks'].clear()
+        self.user = User.objects.create_user(username='owner')
+        self.other = User.objects.create_user(username='other')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_bulk_create_reports_per_item_errors(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/tasks/bulk/create/', [
+                {'title': 'a', 'assigned_to': self.other.id},
+                {'title': ''},
+                {'title': 'c', 'assigned_to': 999999},
+                {'title': 'd', 'deadline': '2026-01-31', 'priority': 'high'},
+            ], format='json')
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertIn('id', results[0])
+        self.assertEqual(results[1]['error'], 'Title is required')
+        self.assertEqual(results[2]['error'], 'Assigned user does not exist')
+        self.assertIn('id', results[3])
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 2)
+        # one user lookup + one INSERT, independent of the batch size
+        self.assertLessEqual(len([q for q in ctx.captured_queries if 'SAVEPOINT' not in q['sql']]), 2)
+
+    def test_rejects_non_string_and_overlong_fields(self):
+        response = self.client.post('/api/tasks/bulk/create/', [
+            {'title': 5},
+            {'title': {'a': 1}},
+            {'title': 'x' * 256},
+            {'title': 'ok', 'description': ['a']},
+            {'title': 'ok', 'status': {'a': 1}},
+            {'title': 'x' * 255, 'description': None},
+        ], format='json')
+        errors = [result.get('error') for result in response.data['results']]
+        self.assertEqual(errors, [
+            'Title must be a string', 'Title must be a string', 'Title must be at most 255 characters',
+            'Description must be a string', 'Invalid status', None,
+        ])
+        response = self.client.post('/api/tasks/create/', {'title': 5}, format='json')
+        self.assertEqual((response.status_code, response.data), (400, {'error': 'Title must be a string'}))
+
+    def test_bulk_update_only_touches_own_tasks(self):
+        mine = Task.objects.create(user=self.user, title='mine', created_by=self.user)
+        theirs = Task.objects.create(user=self.other, title='theirs', created_by=self.other)
+        response = self.client.put('/api/tasks/bulk/update/', [
+            {'id': mine.id, 'status': 'completed', 'assigned_to': self.other.id},
+            {'id': theirs.id, 'status': 'completed'},
+            {'id': mine.id, 'status': 'bogus'},
+        ], format='json')
+        results = response.data['results']
+        self.assertEqual(results[0], {'index': 0, 'id': mine.id})
+        self.assertEqual(results[1]['error'], 'Task not found')
+        self.assertEqual(results[2]['error'], 'Invalid status')
+
+        mine.refresh_from_db()
+        theirs.refresh_from_db()
+        self.assertEqual((mine.status, mine.assigned_to_id, mine.title), ('completed', self.other.id, 'mine'))
+        self.assertEqual(theirs.status, 'pending')
+
+    def test_bulk_update_invalidates_assignee_cache(self):
+        mine = Task.objects.create(user=self.user, title='mine', created_by=self.user)
+        other_client = APIClient()
+        other_client.force_authenticate(user=self.other)
+        self.assertEqual(other_client.get('/api/tasks/').data, [])
+
+        self.client.put('/api/tasks/bulk/update/', [{'id': mine.id, 'assigned_to': self.other.id}], format='json')
+        self.assertEqual(len(other_client.get('/api/tasks/').data), 1)
+
+    def test_bulk_delete(self):
+        mine = Task.objects.create(user=self.user, title='mine', created_by=self.user)
+        theirs = Task.objects.create(user=self.other, title='theirs', created_by=self.other)
+        response = self.client.delete('/api/tasks/bulk/delete/', [mine.id, theirs.id, 'x'], format='json')
+        self.assertEqual(response.data['results'], [
+            {'index': 0, 'id': mine.id},
+            {'index': 1, 'error': 'Task not found'},
+            {'index': 2, 'error': 'Invalid id'},
+        ])
+        self.assertEqual(list(Task.objects.values_list('id', flat=True)), [theirs.id])
+
+    def test_rejects_non_list(self):
+        response = self.client.post('/api/tasks/bulk/create/', {'title': 'a'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class ExportTasksTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='owner')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        for i in range(5):
+            Task.objects.create(user=self.user, title=f'task {i}', created_by=self.user)
+
+    def test_ndjson_export_streams_every_task_in_chunks(self):
+        with self.settings(TASKS_EXPORT_CHUNK_SIZE=2):
+            response = self.client.get('/api/tasks/export/ndjson/')
+            lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        ids = [json.loads(line)['id'] for line in lines]
+        self.assertEqual(ids, list(Task.objects.order_by('-created_at', '-id').values_list('id', flat=True)))
+
+    def test_avatars_are_resolved_once_per_chunk(self):
+        with self.settings(TASKS_EXPORT_CHUNK_SIZE=2), \
+                mock.patch.object(picture_urls, 'resolve_many', wraps=picture_urls.resolve_many) as resolve_many:
+            response = self.client.get('/api/tasks/export/csv/')
+            b''.join(response.streaming_content)
+        self.assertEqual(resolve_many.call_count, 3)
+
+    def test_csv_export(self):
+        response = self.client.get('/api/tasks/export/csv/')
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0][:2], ['id', 'title'])
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[1][-1], 'owner')
+
+    def test_exports_serialize_tasks_like_the_list(self):
+        Task.objects.update(created_at=datetime(2026, 1, 2, 3, 4, 5, 123456, tzinfo=dt_timezone.utc))
+        listed = {task['id']: task for task in self.client.get('/api/tasks/').json()}
+        response = self.client.get('/api/tasks/export/ndjson/')
+        for line in b''.join(response.streaming_content).decode().splitlines():
+            task = json.loads(line)
+            self.assertEqual(task, listed[task['id']])
+        self.assertTrue(task['created_at'].endswith('05.123456Z'))
+
+        response = self.client.get('/api/tasks/export/csv/')
+        rows = list(csv.DictReader(b''.join(response.streaming_content).decode().splitlines()))
+        for row in rows:
+            self.assertEqual(row['created_at'], listed[int(row['id'])]['created_at'])
+            self.assertEqual(row['updated_at'], listed[int(row['id'])]['updated_at'])
+
+    def test_unknown_format(self):
+        self.assertEqual(self.client.get('/api/tasks/export/xml/').status_code, 400)
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        caches['tasks'].clear()
+        self.user = User.objects.create_user(username='owner', email='owner@example.com')
+        other = User.objects.create_user(username='other')
+        Task.objects.create(user=self.user, title='mine', created_by=self.user, assigned_to=other)
+        Task.objects.create(user=other, title='theirs', created_by=other, assigned_to=self.user)
+        self.token = f'Bearer {AccessToken.for_user(self.user)}'
+
+    async def test_tasks_match_sync_endpoint(self):
+        async_response = await self.async_client.get('/api/async/tasks/', headers={'Authorization': self.token})
+        sync_response = await sync_to_async(self.client.get)('/api/tasks/', HTTP_AUTHORIZATION=self.token)
+        self.assertEqual(async_response.status_code, 200)
+        self.assertEqual(async_response.json(), sync_response.json())
+        self.assertEqual(async_response['ETag'], sync_response['ETag'])
+
+    async def test_tasks_not_modified(self):
+        etag = (await self.async_client.get('/api/async/tasks/', headers={'Authorization': self.token}))['ETag']
+        response = await self.async_client.get('/api/async/tasks/', headers={'Authorization': self.token, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_tasks_page(self):
+        response = await self.async_client.get('/api/async/tasks/', {'page_size': 1}, headers={'Authorization': self.token})
+        self.assertEqual(len(response.json()['results']), 1)
+        self.assertIsNotNone(response.json()['next_cursor'])
+
+    async def test_requires_valid_token(self):
+        response = await self.async_client.get('/api/async/tasks/')
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get('/api/async/tasks/', headers={'Authorization': 'Bearer nope'})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['code'], 'token_not_valid')
+
+    async def test_profile_and_user_search(self):
+        profile = await self.async_client.get('/api/async/profile/', headers={'Authorization': self.token})
+        self.assertEqual(profile.json()['email'], 'owner@example.com')
+        users = await self.async_client.get('/api/async/getusers/', {'search': 'ot'}, headers={'Authorization': self.token})
+        self.assertEqual([user['username'] for user in users.json()], ['other'])
+
+
+class ClaimsJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches['tasks'].clear()
+        self.user = User.objects.create_user(username='owner', email='owner@example.com', password='secret')
+
+    def _login(self):
+        response = self.client.post('/api/token/', {'username': 'owner', 'password': 'secret'})
+        return f"Bearer {response.json()['access']}"
+
+    def test_token_carries_user_claims(self):
+        token = AccessToken(self._login().split()[1])
+        self.assertEqual((token['username'], token['email']), ('owner', 'owner@example.com'))
+
+    def test_requests_skip_the_user_lookup(self):
+        auth = self._login()
+        self.client.get('/api/profile/', HTTP_AUTHORIZATION=auth)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/profile/', HTTP_AUTHORIZATION=auth)
+        self.assertEqual(response.json()['username'], 'owner')
+        # Only the profile view's own user + profile fetch; no authentication lookup
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_deactivated_user_is_rejected(self):
+        auth = self._login()
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get('/api/profile/', HTTP_AUTHORIZATION=auth)
+        self.assertEqual(response.status_code, 401)
+
+    def test_tokens_without_claims_fall_back_to_the_database(self):
+        auth = f'Bearer {AccessToken.for_user(self.user)}'
+        response = self.client.get('/api/profile/', HTTP_AUTHORIZATION=auth)
+        self.assertEqual(response.json()['email'], 'owner@example.com')
+
+    def test_writes_work_with_token_user(self):
+        auth = self._login()
+        response = self.client.post('/api/tasks/create/', {'title': 't'}, HTTP_AUTHORIZATION=auth)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Task.objects.get().created_by, self.user)
+        self.assertEqual(len(self.client.get('/api/tasks/', HTTP_AUTHORIZATION=auth).json()), 1)
+
+
+@override_settings(PROFILE_PICTURE_WORKERS=0)
+class ProfilePictureTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        overrides = self.settings(MEDIA_ROOT=self.media, PROFILE_PICTURE_SPOOL_DIR=os.path.join(self.media, 'spool'))
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.user = User.objects.create_user(username='owner')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _image(self, size=(2000, 1000)):
+        buffer = BytesIO()
+        exif = Image.Exif()
+        exif[0x010F] = 'SecretCamera'
+        Image.new('RGB', size, 'red').save(buffer, 'JPEG', exif=exif)
+        return SimpleUploadedFile('me.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+    def _upload(self, upload):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.put('/api/upload-picture/', {'profile_picture': upload}, format='multipart')
+
+    def test_upload_is_processed_into_resized_stripped_images(self):
+        response = self._upload(self._image())
+        self.assertEqual(response.status_code, 202)
+
+        profile = Profile.objects.get(user=self.user)
+        self.assertEqual(profile.picture_status, 'ready')
+        with Image.open(profile.profile_picture.path) as picture:
+            self.assertEqual(picture.format, 'WEBP')
+            self.assertEqual(picture.size, (1024, 512))
+            self.assertNotIn('exif', picture.info)
+        with Image.open(profile.profile_thumbnail.path) as thumbnail:
+            self.assertEqual(thumbnail.size, (128, 64))
+        self.assertEqual(os.listdir(os.path.join(self.media, 'spool')), [])
+
+        data = self.client.get('/api/profile/').data
+        self.assertEqual(data['profile_picture_status'], 'ready')
+        self.assertTrue(data['profile_thumbnail'].endswith(profile.profile_thumbnail.name))
+
+    def test_replacing_a_picture_deletes_the_old_files(self):
+        self._upload(self._image())
+        old = Profile.objects.get(user=self.user).profile_picture.path
+        self._upload(self._image((300, 300)))
+        self.assertFalse(os.path.exists(old))
+
+    def test_undecodable_upload_fails(self):
+        # Passes the magic-byte sniff but cannot be decoded
+        self._upload(SimpleUploadedFile('x.jpg', b'\xff\xd8\xff' + b'garbage' * 10, content_type='image/jpeg'))
+        self.assertEqual(Profile.objects.get(user=self.user).picture_status, 'failed')
+
+    def test_pool_jobs_release_their_connection(self):
+        with mock.patch.object(pictures, 'close_old_connections') as close, \
+                mock.patch.object(pictures, 'process_upload', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                pictures._run_in_worker(1, uuid.uuid4(), '/nonexistent')
+        self.assertEqual(close.call_count, 2)
+
+    @override_settings(PROFILE_PICTURE_JOB_TIMEOUT=600)
+    def test_lost_jobs_are_failed_and_their_spool_files_removed(self):
+        # Queued, but the worker never ran (e.g. the process restarted)
+        self.client.put('/api/upload-picture/', {'profile_picture': self._image()}, format='multipart')
+        spool_dir = os.path.join(self.media, 'spool')
+        lost = os.path.join(spool_dir, os.listdir(spool_dir)[0])
+        self.assertEqual(pictures.recover_lost_jobs(), (0, 0))
+
+        Profile.objects.update(picture_requested_at=timezone.now() - timedelta(minutes=11))
+        os.utime(lost, (time.time() - 660, time.time() - 660))
+        self.assertEqual(pictures.recover_lost_jobs(), (1, 1))
+        self.assertEqual(Profile.objects.get(user=self.user).picture_status, 'failed')
+        self.assertFalse(os.path.exists(lost))
+
+    def test_oversized_upload_is_rejected_while_streaming(self):
+        with self.settings(MAX_FILE_SIZE_MB=1):
+            big = SimpleUploadedFile('big.jpg', b'\xff\xd8\xff' + b'0' * (1024 * 1024), content_type='image/jpeg')
+            response = self._upload(big)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], 'File too large (max 1MB allowed)')
+        self.assertEqual(os.listdir(os.path.join(self.media, 'spool')), [])
+
+    def test_non_image_is_rejected_from_its_first_bytes(self):
+        response = self._upload(SimpleUploadedFile('x.jpg', b'MZ' + b'0' * 100, content_type='image/jpeg'))
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Profile.objects.filter(user=self.user).exists())
+
+    def _patch(self, url, offset, body):
+        return self.client.generic('PATCH', url, body, content_type='application/offset+octet-stream',
+                                   HTTP_UPLOAD_OFFSET=str(offset))
+
+    def test_resumable_upload(self):
+        data = self._image().read()
+        created = self.client.post('/api/upload-picture/resumable/', {'length': len(data)}, format='json')
+        self.assertEqual(created.status_code, 201)
+        url = f"/api/upload-picture/resumable/{created.data['upload_id']}/"
+
+        self.assertEqual(self._patch(url, 0, data[:1000]).data, {'offset': 1000})
+        # A retried chunk at a stale offset is refused and told where to resume
+        conflict = self._patch(url, 0, data[:1000])
+        self.assertEqual(conflict.status_code, 409)
+        self.assertEqual(self.client.head(url)['Upload-Offset'], '1000')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            done = self._patch(url, 1000, data[1000:])
+        self.assertEqual(done.status_code, 202)
+        self.assertEqual(Profile.objects.get(user=self.user).picture_status, 'ready')
+        self.assertEqual(self.client.head(url).status_code, 404)
+
+    def test_resumable_upload_sniffs_first_chunk(self):
+        created = self.client.post('/api/upload-picture/resumable/', {'length': 100}, format='json')
+        url = f"/api/upload-picture/resumable/{created.data['upload_id']}/"
+        response = self._patch(url, 0, b'%PDF-1.7' + b'0' * 20)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response['Upload-Offset'], '0')
+
+    def test_resumable_upload_without_its_part_is_not_found(self):
+        created = self.client.post('/api/upload-picture/resumable/', {'length': 100}, format='json')
+        url = f"/api/upload-picture/resumable/{created.data['upload_id']}/"
+        upload = uploads.ResumableUpload(uuid.UUID(str(created.data['upload_id'])))
+        os.remove(upload.part_path)
+        self.assertEqual(self.client.head(url).status_code, 404)
+        self.assertEqual(self._patch(url, 0, self._image().read()[:50]).status_code, 404)
+        self.assertFalse(os.path.exists(upload.part_path))
+
+    def test_active_resumable_upload_does_not_expire(self):
+        data = self._image().read()
+        created = self.client.post('/api/upload-picture/resumable/', {'length': len(data)}, format='json')
+        url = f"/api/upload-picture/resumable/{created.data['upload_id']}/"
+        upload = uploads.ResumableUpload(uuid.UUID(str(created.data['upload_id'])))
+        stale = time.time() - 2 * settings.PROFILE_UPLOAD_SESSION_TTL
+        os.utime(upload.meta_path, (stale, stale))
+        self._patch(url, 0, data[:1000])
+
+        uploads.ResumableUpload.remove_expired()
+        self.assertEqual(self.client.head(url)['Upload-Offset'], '1000')
+
+        os.utime(upload.part_path, (stale, stale))
+        uploads.ResumableUpload.remove_expired()
+        self.assertFalse(os.path.exists(upload.part_path) or os.path.exists(upload.meta_path))
+
+    def test_resumable_upload_rejects_oversized_length(self):
+        response = self.client.post('/api/upload-picture/resumable/', {'length': 100 * 1024 * 1024}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(PROFILE_PICTURE_WORKERS=0)
+class AvatarTests(TestCase):
+    def setUp(self):
+        caches['tasks'].clear()
+        cache.clear()
+        self.user = User.objects.create_user(username='owner')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        for i in range(3):
+            assignee = User.objects.create_user(username=f'assignee{i}')
+            Profile.objects.create(user=assignee, profile_thumbnail=f'profile_pics/thumbs/{i}.webp')
+            Task.objects.create(user=self.user, title=f't{i}', created_by=self.user, assigned_to=assignee)
+
+    def test_task_list_embeds_avatars_in_the_same_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/tasks/')
+        avatars = sorted(task['assigned_to']['avatar'] for task in response.data)
+        self.assertEqual(avatars, [f'http://testserver/media/profile_pics/thumbs/{i}.webp' for i in range(3)])
+        # ETag aggregate + the list
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+    def test_profile_is_one_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/profile/')
+        self.assertEqual(response.data['profile_picture'], None)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    @override_settings(PROFILE_PICTURE_URL_MODE='cdn', PROFILE_PICTURE_CDN_DOMAIN='cdn.example.com')
+    def test_cdn_urls(self):
+        response = self.client.get('/api/tasks/')
+        self.assertTrue(response.data[0]['assigned_to']['avatar'].startswith('https://cdn.example.com/profile_pics/thumbs/'))
+
+    @override_settings(PROFILE_PICTURE_URL_MODE='presigned')
+    def test_presigned_urls_are_cached_per_profile(self):
+        profile = Profile.objects.get(user__username='assignee0')
+        profile.profile_picture = 'profile_pics/a.webp'
+        signed = []
+
+        def fake_url(name, expire=None):
+            signed.append(name)
+            return f'https://bucket.example.com/{name}?expires={expire}'
+
+        with mock.patch.object(profile.profile_picture.storage, 'url', side_effect=fake_url):
+            first = picture_urls.resolve(profile)
+            second = picture_urls.resolve(profile)
+            self.assertEqual(first, second)
+            self.assertEqual(len(signed), 2)  # picture + thumbnail, once
+
+            # A new upload changes the stored name, so the cached URL is not reused
+            profile.profile_picture = 'profile_pics/b.webp'
+            self.assertEqual(picture_urls.resolve(profile)['picture'], 'https://bucket.example.com/profile_pics/b.webp?expires=3600')
+
+
+class TaskSummaryTests(TestCase):
+    def setUp(self):
+        caches['tasks'].clear()
+        self.user = User.objects.create_user(username='owner')
+        self.other = User.objects.create_user(username='other')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.today = timezone.localdate()
+
+    def _write_tasks(self):
+        yesterday = str(self.today - timedelta(days=1))
+        self.client.post('/api/tasks/create/', {'title': 'mine', 'deadline': yesterday}, format='json')
+        self.client.post('/api/tasks/create/', {'title': 'delegated', 'assigned_to': self.other.id, 'priority': 'high'}, format='json')
+        Task.objects.create(user=self.other, title='for me', created_by=self.other, assigned_to=self.user, deadline=self.today)
+        self.client.post('/api/tasks/bulk/create/', [
+            {'title': 'bulk 1', 'priority': 'low'},
+            {'title': 'bulk 2', 'assigned_to': self.other.id, 'deadline': yesterday},
+            {'title': 'bulk 3'},
+        ], format='json')
+        bulk_ids = list(Task.objects.filter(title__startswith='bulk').order_by('id').values_list('id', flat=True))
+        mine = Task.objects.get(title='mine')
+        self.client.put(f'/api/tasks/update/{mine.id}/', {'title': 'mine', 'status': 'completed', 'assigned_to': self.user.id}, format='json')
+        self.client.put('/api/tasks/bulk/update/', [
+            {'id': bulk_ids[0], 'status': 'completed'},
+            {'id': bulk_ids[1], 'assigned_to': None},
+        ], format='json')
+        self.client.delete(f'/api/tasks/delete/{bulk_ids[2]}/')
+        self.client.delete('/api/tasks/bulk/delete/', [bulk_ids[0]], format='json')
+
+    def test_summary_counts_created_and_assigned_tasks(self):
+        self._write_tasks()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/tasks/summary/')
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(response.data, {
+            'total': 4,
+            'created': 3,
+            'assigned': 2,
+            'status': {'pending': 3, 'completed': 1},
+            'priority': {'low': 0, 'medium': 3, 'high': 1},
+            'overdue': 1,
+            'due_today': 1,
+        })
+
+    @override_settings(TASK_COUNTERS_ENABLED=True)
+    def test_counters_match_the_live_aggregate(self):
+        self._write_tasks()
+        for user in (self.user, self.other):
+            self.assertEqual(
+                dashboard.counter_summary(user.id, self.today),
+                dashboard.live_summary(user.id, self.today),
+            )
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/tasks/summary/')
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertIn('taskcounter', ctx.captured_queries[0]['sql'].lower())
+        self.assertEqual(response.data['total'], 4)
+
+    @override_settings(TASK_COUNTERS_ENABLED=True)
+    def test_rebuild_backfills_counters(self):
+        with override_settings(TASK_COUNTERS_ENABLED=False):
+            self._write_tasks()
+        self.assertEqual(dashboard.counter_summary(self.user.id, self.today)['total'], 0)
+        call_command('rebuild_task_counters', stdout=StringIO())
+        self.assertEqual(
+            dashboard.counter_summary(self.user.id, self.today),
+            dashboard.live_summary(self.user.id, self.today),
+        )
+
+
+class TaskFilterTests(TestCase):
+    def setUp(self):
+        caches['tasks'].clear()
+        self.user = User.objects.create_user(username='owner')
+        self.other = User.objects.create_user(username='other')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        today = date(2026, 1, 10)
+        specs = [
+            ('a', 'pending', 'high', today, self.user, self.other),
+            ('b', 'completed', 'low', today - timedelta(days=5), self.user, self.user),
+            ('c', 'pending', 'medium', None, self.other, self.user),
+            ('d', 'pending', 'low', today + timedelta(days=5), self.user, None),
+            ('e', 'completed', 'high', None, self.other, self.user),
+            ('f', 'pending', 'medium', today + timedelta(days=1), self.other, self.other),  # not visible
+        ]
+        for title, status, priority, deadline, created_by, assigned_to in specs:
+            Task.objects.create(
+                user=created_by, title=title, status=status, priority=priority,
+                deadline=deadline, created_by=created_by, assigned_to=assigned_to,
+            )
+
+    def _titles(self, **params):
+        response = self.client.get('/api/tasks/', params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [task['title'] for task in response.data]
+
+    def test_filters(self):
+        self.assertEqual(self._titles(status='pending'), ['d', 'c', 'a'])
+        self.assertEqual(self._titles(priority='low,high'), ['e', 'd', 'b', 'a'])
+        self.assertEqual(self._titles(role='created'), ['d', 'b', 'a'])
+        self.assertEqual(self._titles(role='assigned'), ['e', 'c', 'b'])
+        self.assertEqual(self._titles(deadline_from='2026-01-06', deadline_to='2026-01-15'), ['d', 'a'])
+        self.assertEqual(self._titles(status='completed', role='assigned'), ['e', 'b'])
+
+    def test_updated_since(self):
+        Task.objects.filter(title='c').update(updated_at=timezone.now() + timedelta(hours=1))
+        since = (timezone.now() + timedelta(minutes=30)).isoformat()
+        self.assertEqual(self._titles(updated_since=since), ['c'])
+
+    def test_sort_by_deadline_puts_missing_deadlines_last(self):
+        self.assertEqual(self._titles(sort='deadline'), ['b', 'a', 'd', 'c', 'e'])
+        self.assertEqual(self._titles(sort='-deadline'), ['d', 'a', 'b', 'e', 'c'])
+
+    def test_cursor_pages_follow_the_sort(self):
+        for sort in ('deadline', '-deadline', 'updated_at', '-created_at'):
+            titles, cursor = [], None
+            while True:
+                params = {'sort': sort, 'page_size': 2}
+                if cursor:
+                    params['cursor'] = cursor
+                response = self.client.get('/api/tasks/', params)
+                titles += [task['title'] for task in response.data['results']]
+                cursor = response.data['next_cursor']
+                if not cursor:
+                    break
+            self.assertEqual(titles, self._titles(sort=sort), sort)
+
+    def test_cursor_from_another_sort_is_rejected(self):
+        cursor = self.client.get('/api/tasks/', {'page_size': 2}).data['next_cursor']
+        response = self.client.get('/api/tasks/', {'sort': 'deadline', 'cursor': cursor})
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_filters_are_rejected(self):
+        for params in ({'status': 'done'}, {'priority': 'urgent'}, {'role': 'owner'},
+                       {'deadline_from': 'tomorrow'}, {'updated_since': 'yesterday'},
+                       {'sort': 'title'}, {'sort': '--deadline'}):
+            response = self.client.get('/api/tasks/', params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('error', response.data)
+
+    def test_filtered_lists_are_not_cached(self):
+        self._titles(status='pending')
+        self.assertIsNone(caches['tasks'].get(f'tasks:list:{self.user.id}'))
+        self.assertEqual(len(self._titles()), 5)
+        self.assertEqual(self._titles(status='completed'), ['e', 'b'])
+
+    async def test_async_endpoint_filters(self):
+        token = str(AccessToken.for_user(self.user))
+        response = await self.async_client.get(
+            '/api/async/tasks/', {'status': 'pending', 'sort': 'deadline'},
+            headers={'Authorization': f'Bearer {token}'},
+        )
+        self.assertEqual([task['title'] for task in response.json()], ['a', 'd', 'c'])
+
+
+@override_settings(TASKS_SYNC_WINDOW=0)
+class TaskSyncTests(TestCase):
+    def setUp(self):
+        caches['tasks'].clear()
+        self.user = User.objects.create_user(username='owner')
+        self.other = User.objects.create_user(username='other')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.tasks = [
+            Task.objects.create(user=self.user, title=f't{i}', created_by=self.user, assigned_to=self.other)
+            for i in range(3)
+        ]
+        self.assigned = Task.objects.create(user=self.other, title='assigned', created_by=self.other, assigned_to=self.user)
+
+    def _sync(self, watermark=None):
+        params = {'watermark': watermark} if watermark else {}
+        response = self.client.get('/api/tasks/sync/', params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_full_then_incremental_sync(self):
+        first = self._sync()
+        self.assertEqual({task['title'] for task in first['changed']}, {'t0', 't1', 't2', 'assigned'})
+        self.assertEqual(first['deleted'], [])
+        self.assertFalse(first['has_more'])
+
+        self.client.put(f'/api/tasks/update/{self.tasks[0].id}/', {'title': 'renamed'}, format='json')
+        self.client.delete(f'/api/tasks/delete/{self.tasks[1].id}/')
+        self.client.post('/api/tasks/create/', {'title': 'new'}, format='json')
+        # Reassigned away from the user, so it leaves their list
+        self.assigned.assigned_to = self.other
+        self.assigned.save()
+
+        second = self._sync(first['watermark'])
+        self.assertEqual([task['title'] for task in second['changed']], ['renamed', 'new'])
+        self.assertEqual(second['deleted'], sorted([self.tasks[1].id, self.assigned.id]))
+
+        third = self._sync(second['watermark'])
+        self.assertEqual((third['changed'], third['deleted']), ([], []))
+
+    def test_task_reassigned_back_is_not_reported_deleted(self):
+        watermark = self._sync()['watermark']
+        self.assigned.assigned_to = self.other
+        self.assigned.save()
+        self.assigned.assigned_to = self.user
+        self.assigned.save()
+        data = self._sync(watermark)
+        self.assertEqual([task['title'] for task in data['changed']], ['assigned'])
+        self.assertEqual(data['deleted'], [])
+
+    def test_bulk_writes_are_synced(self):
+        watermark = self._sync()['watermark']
+        self.client.put('/api/tasks/bulk/update/', [{'id': self.tasks[0].id, 'status': 'completed'}], format='json')
+        self.client.delete('/api/tasks/bulk/delete/', [self.tasks[2].id], format='json')
+        data = self._sync(watermark)
+        self.assertEqual([task['title'] for task in data['changed']], ['t0'])
+        self.assertEqual(data['deleted'], [self.tasks[2].id])
+
+    def test_purging_a_user_tombstones_their_tasks_for_others(self):
+        watermark = self._sync()['watermark']
+        # Deletes every task they created or were assigned
+        purge.purge_user(self.other.id)
+        self.assertEqual(self._sync(watermark)['deleted'], sorted([task.id for task in self.tasks] + [self.assigned.id]))
+
+    @override_settings(TASKS_SYNC_BATCH_SIZE=2)
+    def test_changes_are_paged(self):
+        titles, watermark = [], None
+        while True:
+            data = self._sync(watermark)
+            titles += [task['title'] for task in data['changed']]
+            watermark = data['watermark']
+            if not data['has_more']:
+                break
+        self.assertEqual(titles, ['t0', 't1', 't2', 'assigned'])
+
+    def test_bad_and_expired_watermarks(self):
+        self.assertEqual(self.client.get('/api/tasks/sync/', {'watermark': 'nope'}).status_code, 400)
+        watermark = self._sync()['watermark']
+        with override_settings(TASKS_SYNC_TOMBSTONE_DAYS=0):
+            self.assertEqual(self.client.get('/api/tasks/sync/', {'watermark': watermark}).status_code, 410)
+
+
+class TaskEventTests(TestCase):
+    def setUp(self):
+        caches['tasks'].clear()
+        self.user = User.objects.create_user(username='owner')
+        self.other = User.objects.create_user(username='other')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _published(self, write):
+        with mock.patch.object(events, '_publish') as publish, self.captureOnCommitCallbacks(execute=True):
+            write()
+        return sorted((sorted(call.args[0]), call.args[1]['type']) for call in publish.call_args_list)
+
+    def test_writes_notify_creator_and_assignee(self):
+        published = self._published(lambda: self.client.post(
+            '/api/tasks/create/', {'title': 'new', 'assigned_to': self.other.id}, format='json'))
+        self.assertEqual(published, [([self.user.id, self.other.id], 'task.created')])
+
+        task = Task.objects.get()
+        published = self._published(lambda: self.client.put(
+            f'/api/tasks/update/{task.id}/', {'title': 'new', 'assigned_to': self.user.id}, format='json'))
+        # Reassigned away from `other`, so it is gone from their list
+        self.assertEqual(published, [([self.user.id], 'task.updated'), ([self.other.id], 'task.deleted')])
+
+        published = self._published(lambda: self.client.delete(f'/api/tasks/delete/{task.id}/'))
+        self.assertEqual(published, [([self.user.id], 'task.deleted')])
+
+    def test_bulk_create_without_returned_ids_asks_for_a_resync(self):
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            published = self._published(lambda: self.client.post('/api/tasks/bulk/create/', [
+                {'title': 'a', 'assigned_to': self.other.id}, {'title': 'b'},
+            ], format='json'))
+        self.assertEqual(published, [([self.user.id, self.other.id], 'resync')])
+
+    def test_nothing_is_published_on_rollback(self):
+        with mock.patch.object(events, '_publish') as publish, self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Task.objects.create(user=self.user, title='t', created_by=self.user)
+                    raise ValueError
+            except ValueError:
+                pass
+        publish.assert_not_called()
+
+    async def test_event_stream(self):
+        token = f'Bearer {AccessToken.for_user(self.user)}'
+        response = await self.async_client.get('/api/async/tasks/events/', headers={'Authorization': token})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 5000\n\n')
+
+        def create_task():
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post('/api/tasks/create/', {'title': 'pushed'}, format='json')
+
+        await sync_to_async(create_task)()
+        task_id = await Task.objects.values_list('id', flat=True).aget()
+        chunk = await asyncio.wait_for(anext(stream), 5)
+        self.assertEqual(chunk, f'event: task.created\ndata: {{"type": "task.created", "id": {task_id}}}\n\n'.encode())
+        await stream.aclose()
+
+    def test_event_stream_is_not_served_under_wsgi(self):
+        token = f'Bearer {AccessToken.for_user(self.user)}'
+        response = self.client.get('/api/async/tasks/events/', HTTP_AUTHORIZATION=token)
+        self.assertEqual(response.status_code, 501)
+
+    @override_settings(TASK_EVENTS_QUEUE_SIZE=2)
+    async def test_slow_subscriber_is_told_to_resync(self):
+        broker = events.LocalBroker()
+        async with broker.subscribe(self.user.id) as subscription:
+            for task_id in range(5):
+                broker.publish(self.user.id, {'type': 'task.updated', 'id': task_id})
+            await asyncio.sleep(0)
+            self.assertEqual(await subscription.get(1), {'type': 'resync'})
+            self.assertIsNone(await subscription.get(0.01))
+
+
+class JSONRendererTests(TestCase):
+    def test_matches_drf_json_renderer(self):
+        data = {
+            'when': datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=dt_timezone.utc),
+            'naive': datetime(2026, 1, 2, 3, 4, 5),
+            'day': date(2026, 1, 2),
+            'amount': Decimal('1.50'),
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'text': 'café \u2028 \u2029 </script>',
+            'nested': [{'a': None, 'b': True, 'c': 1.5}],
+        }
+        expected = JSONRenderer().render(data)
+        for backend in ('stdlib', 'orjson'):
+            with self.subTest(backend=backend), override_settings(JSON_RENDERER=backend):
+                self.assertEqual(FastJSONRenderer().render(data), expected)
+
+    @override_settings(PROFILE_PICTURE_WORKERS=0)
+    def test_values_rows_serialize_like_instances(self):
+        caches['tasks'].clear()
+        owner = User.objects.create_user(username='owner', email='o@example.com')
+        Profile.objects.create(user=owner, profile_picture='profile_pics/o.webp', profile_thumbnail='profile_pics/thumbs/o.webp')
+        other = User.objects.create_user(username='other')
+        Task.objects.create(user=owner, title='a', created_by=owner, assigned_to=other, deadline=date(2026, 1, 1))
+        Task.objects.create(user=other, title='b', created_by=other, assigned_to=owner)
+        Task.objects.create(user=owner, title='c', created_by=owner)
+
+        branches = views._visible_task_branches(owner)
+        self.assertEqual(
+            views._task_rows_to_dicts(union_ordered(views._task_values(branches))),
+            views._tasks_to_dicts(union_ordered(branches)),
+        )
+
+
+class CompressionTests(TestCase):
+    def setUp(self):
+        caches['tasks'].clear()
+        self.user = User.objects.create_user(username='owner', email='owner@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        Task.objects.bulk_create(
+            Task(user=self.user, title=f'task {i}', description='lorem ipsum ' * 5, created_by=self.user)
+            for i in range(50)
+        )
+
+    def test_large_json_is_gzipped(self):
+        plain = self.client.get('/api/tasks/')
+        response = self.client.get('/api/tasks/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+        # The weakened ETag still satisfies If-None-Match
+        self.assertTrue(response['ETag'].startswith('W/'))
+        response = self.client.get('/api/tasks/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_skipped_when_not_accepted_or_small(self):
+        self.assertFalse(self.client.get('/api/tasks/').has_header('Content-Encoding'))
+        self.assertFalse(self.client.get('/api/tasks/', HTTP_ACCEPT_ENCODING='gzip;q=0').has_header('Content-Encoding'))
+        self.assertFalse(self.client.get('/api/tasks/summary/', HTTP_ACCEPT_ENCODING='gzip').has_header('Content-Encoding'))
+
+    def test_streamed_export_is_compressed(self):
+        plain = b''.join(self.client.get('/api/tasks/export/ndjson/').streaming_content)
+        response = self.client.get('/api/tasks/export/ndjson/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), plain)
+
+    def test_negotiation_and_content_types(self):
+        # Server preference order among what the client accepts
+        codecs = [compression.ZstdCodec(), compression.BrotliCodec(), compression.GzipCodec()]
+        self.assertEqual(compression.negotiate('gzip, br;q=0.5', codecs).name, 'br')
+        self.assertEqual(compression.negotiate('gzip, br;q=0', codecs).name, 'gzip')
+        self.assertEqual(compression.negotiate('*', codecs).name, 'zstd')
+        self.assertIsNone(compression.negotiate('identity', codecs))
+        self.assertIsNone(compression.negotiate('*;q=0', codecs))
+        self.assertTrue(compression.is_compressible('application/json; charset=utf-8'))
+        self.assertTrue(compression.is_compressible('application/problem+json'))
+        self.assertFalse(compression.is_compressible('image/webp'))
+        self.assertFalse(compression.is_compressible('text/event-stream'))
+
+    def test_stats(self):
+        self.client.get('/api/tasks/', HTTP_ACCEPT_ENCODING='gzip')
+        admin = User.objects.create_user(username='admin', is_staff=True)
+        self.client.force_authenticate(user=admin)
+        stats = self.client.get('/api/compression-stats/').data['gzip']
+        self.assertGreaterEqual(stats['responses'], 1)
+        self.assertGreater(stats['bytes_saved'], 0)
+        self.assertEqual(stats['bytes_saved'], stats['bytes_in'] - stats['bytes_out'])
+
+
+class DatabaseConnectionTests(TestCase):
+    def test_bench_restores_connection_settings(self):
+        User.objects.create_user(username='bench', email='bench@example.com')
+        before = dict(connection.settings_dict)
+        out = StringIO()
+        call_command('bench_db_connections', username='bench', requests=5, stdout=out)
+
+        self.assertIn('per request (max_age=0)', out.getvalue())
+        self.assertIn('persistent + health checks', out.getvalue())
+        self.assertEqual(connection.settings_dict['CONN_MAX_AGE'], before['CONN_MAX_AGE'])
+        self.assertEqual(connection.settings_dict['CONN_HEALTH_CHECKS'], before['CONN_HEALTH_CHECKS'])
+
+
+@override_settings(METRICS_TOKEN='scrape-me', PERF_LATENCY_BUDGET_MS=0, PERF_QUERY_BUDGET=0)
+class MetricsTests(TestCase):
+    def setUp(self):
+        caches['tasks'].clear()
+        metrics.reset()
+        self.user = User.objects.create_user(username='owner', email='owner@example.com')
+        for i in range(3):
+            Task.objects.create(user=self.user, title=f't{i}', created_by=self.user)
+        self.token = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def scrape(self):
+        response = self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer scrape-me')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode()
+
+    def sample(self, text, name):
+        for line in text.splitlines():
+            if line.startswith(name + ' '):
+                return float(line.rsplit(' ', 1)[1])
+        self.fail(f'{name} not in metrics')
+
+    def test_records_queries_and_serialization_per_route(self):
+        self.client.get('/api/tasks/', HTTP_AUTHORIZATION=self.token)
+        text = self.scrape()
+        labels = '{method="GET",route="/api/tasks/"}'
+        self.assertEqual(self.sample(text, 'http_requests_total{method="GET",route="/api/tasks/",status="200"}'), 1)
+        self.assertEqual(self.sample(text, f'http_request_duration_seconds_count{labels}'), 1)
+        self.assertGreater(self.sample(text, f'http_request_db_queries_sum{labels}'), 0)
+        self.assertGreater(self.sample(text, f'http_request_db_seconds_sum{labels}'), 0)
+        self.assertGreater(self.sample(text, f'http_request_serialize_seconds_sum{labels}'), 0)
+        self.assertIn('task_list_cache_requests_total{result="misses"}', text)
+
+    async def test_records_async_views(self):
+        await self.async_client.get('/api/async/tasks/', headers={'Authorization': self.token})
+        text = await sync_to_async(self.scrape)()
+        labels = '{method="GET",route="/api/async/tasks/"}'
+        self.assertGreater(self.sample(text, f'http_request_db_queries_sum{labels}'), 0)
+
+    def test_routes_not_paths(self):
+        task = Task.objects.first()
+        self.client.put(f'/api/tasks/update/{task.pk}/', {'title': 'x'}, content_type='application/json',
+                        HTTP_AUTHORIZATION=self.token)
+        self.assertIn('route="/api/tasks/update/<int:pk>/"', self.scrape())
+
+    def test_logs_requests_over_query_budget_with_sql(self):
+        with override_settings(PERF_QUERY_BUDGET=1), self.assertLogs('myapp.metrics', 'WARNING') as logs:
+            self.client.get('/api/tasks/', HTTP_AUTHORIZATION=self.token)
+        self.assertIn('Slow request GET /api/tasks/', logs.output[0])
+        self.assertIn('FROM "myapp_task"', logs.output[0])
+
+    def test_endpoint_requires_token(self):
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 401)
+        self.assertEqual(self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+        with override_settings(METRICS_TOKEN=''):
+            self.assertEqual(self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer scrape-me').status_code, 404)
+
+
+class SeedDataTests(TestCase):
+    def test_seeds_reproducible_data_set(self):
+        call_command('seed_data', users=10, tasks_per_user=4, profile_ratio=1, stdout=StringIO())
+        self.assertEqual(User.objects.filter(username__startswith='seed-').count(), 10)
+        self.assertEqual(Task.objects.count(), 40)
+        self.assertEqual(Profile.objects.count(), 10)
+        self.assertTrue(User.objects.get(username='seed-3').check_password('seed'))
+        first = list(Task.objects.order_by('id').values_list('title', 'status', 'priority', 'deadline'))
+
+        with self.assertRaises(CommandError):
+            call_command('seed_data', users=10, tasks_per_user=4, stdout=StringIO())
+        call_command('seed_data', users=10, tasks_per_user=4, profile_ratio=1, clear=True, stdout=StringIO())
+        self.assertEqual(Task.objects.count(), 40)
+        self.assertEqual(list(Task.objects.order_by('id').values_list('title', 'status', 'priority', 'deadline')), first)
+
+    def test_bench_api_reports_every_scenario_and_rolls_back(self):
+        out = StringIO()
+        call_command('bench_api', users=5, tasks_per_user=3, active_users=2, requests=3, stdout=out)
+        for scenario in ('login', 'list', 'list-filtered', 'getusers', 'profile', 'create', 'update', 'delete'):
+            self.assertIn(f'\n{scenario} ', out.getvalue())
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(Task.objects.exists())
+
+
+class TaskWriteTests(TestCase):
+    def setUp(self):
+        caches['tasks'].clear()
+        self.user = User.objects.create_user(username='owner', email='owner@example.com')
+        self.other = User.objects.create_user(username='other')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.task = Task.objects.create(user=self.user, title='t', description='d', created_by=self.user)
+
+    def test_create_checks_assignee_without_loading_user(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/tasks/create/', {'title': 'new', 'assigned_to': self.other.id}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response['ETag'])
+        self.assertFalse(any('"auth_user"."password"' in query['sql'] for query in queries.captured_queries))
+
+        response = self.client.post('/api/tasks/create/', {'title': 'new', 'assigned_to': 999999}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Assigned user does not exist'})
+        response = self.client.post('/api/tasks/create/', {'title': 'new', 'status': 'bogus'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_patch_writes_only_changed_fields(self):
+        before = self.task.updated_at
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(f'/api/tasks/update/{self.task.id}/', {'title': 'renamed', 'description': 'd'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['title'], 'renamed')
+        self.assertEqual(response.json()['user'], {'id': self.user.id, 'username': 'owner'})
+        self.assertFalse(any('"auth_user"' in query['sql'] for query in queries.captured_queries))
+        updates = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE "myapp_task"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"title"', updates[0])
+        self.assertNotIn('"description"', updates[0])
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, 'renamed')
+        self.assertGreater(self.task.updated_at, before)
+
+    def test_update_with_claims_token_returns_owner(self):
+        client = APIClient()
+        token = ClaimsTokenObtainPairSerializer.get_token(self.user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = client.patch(f'/api/tasks/update/{self.task.id}/', {'title': 'renamed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['user'], {'id': self.user.id, 'username': 'owner'})
+
+    def test_unchanged_update_writes_nothing(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.put(f'/api/tasks/update/{self.task.id}/', {'title': 't', 'status': 'pending'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any(query['sql'].startswith('UPDATE') for query in queries.captured_queries))
+
+    def test_put_requires_title(self):
+        response = self.client.put(f'/api/tasks/update/{self.task.id}/', {'status': 'completed'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.patch(f'/api/tasks/update/{self.task.id}/', {'status': 'completed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'completed')
+
+    def test_if_match_prevents_lost_update(self):
+        etag = self.client.patch(f'/api/tasks/update/{self.task.id}/', {'title': 'first'}, format='json')['ETag']
+        # Someone else edits the task in between
+        response = self.client.patch(f'/api/tasks/update/{self.task.id}/', {'title': 'second'}, format='json')
+        fresh = response['ETag']
+        self.assertNotEqual(etag, fresh)
+
+        response = self.client.patch(f'/api/tasks/update/{self.task.id}/', {'title': 'stale'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(response.json()['task']['title'], 'second')
+        self.assertEqual(response['ETag'], fresh)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, 'second')
+
+        response = self.client.patch(f'/api/tasks/update/{self.task.id}/', {'title': 'third'}, format='json', HTTP_IF_MATCH=f'W/{fresh}')
+        self.assertEqual(response.status_code, 200)
+
+    def test_update_of_someone_elses_task_is_not_found(self):
+        task = Task.objects.create(user=self.other, title='theirs', created_by=self.other)
+        response = self.client.patch(f'/api/tasks/update/{task.id}/', {'title': 'mine now'}, format='json')
+        self.assertEqual(response.status_code, 404)
+
+
+class TaskDeleteTests(TestCase):
+    def setUp(self):
+        caches['tasks'].clear()
+        self.user = User.objects.create_user(username='owner', email='owner@example.com')
+        self.other = User.objects.create_user(username='other')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.task = Task.objects.create(user=self.user, title='t', created_by=self.user, assigned_to=self.other)
+
+    def test_delete_keeps_bookkeeping(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(f'/api/tasks/delete/{self.task.id}/')
+        self.assertEqual(response.status_code, 200)
+        task_queries = [query['sql'] for query in queries.captured_queries if '"myapp_task"' in query['sql']]
+        self.assertEqual(len(task_queries), 1)
+        self.assertTrue(task_queries[0].startswith('DELETE'))
+        self.assertFalse(Task.objects.exists())
+        self.assertEqual(
+            set(TaskTombstone.objects.values_list('user_id', 'task_id')),
+            {(self.user.id, self.task.id), (self.other.id, self.task.id)},
+        )
+
+    def test_delete_without_returning(self):
+        # MySQL: a locking SELECT, then a DELETE by id without the collector
+        with mock.patch.object(bulk, '_can_delete_returning', return_value=False):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.delete(f'/api/tasks/delete/{self.task.id}/')
+        self.assertEqual(response.status_code, 200)
+        task_queries = [query['sql'] for query in queries.captured_queries if '"myapp_task"' in query['sql']]
+        self.assertEqual(len(task_queries), 2)
+        self.assertTrue(task_queries[1].startswith('DELETE'))
+        self.assertFalse(Task.objects.exists())
+        self.assertEqual(TaskTombstone.objects.count(), 2)
+
+    def test_admin_delete_keeps_bookkeeping(self):
+        self.user.is_staff = self.user.is_superuser = True
+        self.user.save()
+        self.client.force_login(self.user)
+        response = self.client.post(f'/admin/myapp/task/{self.task.id}/delete/', {'post': 'yes'})
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Task.objects.exists())
+        self.assertEqual(TaskTombstone.objects.count(), 2)
+
+    def test_bulk_delete_queries_do_not_grow_with_the_batch(self):
+        def count(n):
+            ids = [
+                Task.objects.create(user=self.user, title='t', created_by=self.user, assigned_to=self.other).id
+                for _ in range(n)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                self.client.delete('/api/tasks/bulk/delete/', ids, format='json')
+            return len([query for query in queries.captured_queries if 'SAVEPOINT' not in query['sql']])
+
+        self.assertEqual(count(1), count(5))
+        self.assertEqual(TaskTombstone.objects.count(), 2 * 6)
+
+    def test_delete_of_someone_elses_task_is_not_found(self):
+        task = Task.objects.create(user=self.other, title='theirs', created_by=self.other)
+        response = self.client.delete(f'/api/tasks/delete/{task.id}/')
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(Task.objects.filter(id=task.id).exists())
+        self.assertFalse(TaskTombstone.objects.exists())
+
+
+@override_settings(USER_PURGE_WORKERS=0, USER_PURGE_BATCH_SIZE=2)
+class UserPurgeTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='leaving')
+        self.other = User.objects.create_user(username='staying')
+        for i in range(3):
+            Task.objects.create(user=self.user, title=f'own {i}', created_by=self.user, assigned_to=self.other)
+        self.assigned = Task.objects.create(user=self.other, title='assigned', created_by=self.other, assigned_to=self.user)
+        self.unrelated = Task.objects.create(user=self.other, title='unrelated', created_by=self.other)
+
+    def test_delete_account_purges_in_background(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = client.delete('/api/account/')
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(User.objects.get(id=self.user.id).is_active)
+        self.assertTrue(UserPurge.objects.filter(user_id=self.user.id).exists())
+
+        for callback in callbacks:
+            callback()
+        self.assertFalse(User.objects.filter(id=self.user.id).exists())
+        self.assertEqual(list(Task.objects.values_list('title', flat=True)), ['unrelated'])
+        self.assertFalse(UserPurge.objects.exists())
+        # The remaining user is told about the tasks they lost; the purged one gets nothing
+        self.assertEqual(set(TaskTombstone.objects.values_list('user_id', flat=True)), {self.other.id})
+        self.assertEqual(TaskTombstone.objects.count(), 4)
+
+    def test_purge_users_resumes_interrupted_purges(self):
+        UserPurge.objects.create(user_id=self.user.id)
+        out = StringIO()
+        call_command('purge_users', stdout=out)
+        self.assertIn(f'User {self.user.id}: deleted 4 tasks', out.getvalue())
+        self.assertFalse(User.objects.filter(id=self.user.id).exists())
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_pool_jobs_release_their_connection(self):
+        with mock.patch.object(purge, 'close_old_connections') as close, \
+                mock.patch.object(purge, 'purge_user', side_effect=RuntimeError), \
+                self.assertLogs('myapp.purge', 'ERROR'):
+            purge._run_in_worker(self.user.id)
+        self.assertEqual(close.call_count, 2)
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1000, PASSWORD_HASH_WORKERS=0)
+class LoginTests(TestCase):
+    def setUp(self):
+        caches['ratelimit'].clear()
+        self.user = User.objects.create_user(username='owner', password='secret')
+
+    def _login(self, password='secret', username='owner', ip='127.0.0.1'):
+        return self.client.post('/api/token/', {'username': username, 'password': password},
+                                content_type='application/json', REMOTE_ADDR=ip)
+
+    @override_settings(LOGIN_RATE_PER_USER=2)
+    def test_logins_rate_limited_per_username_and_ip(self):
+        self.assertEqual(self._login('wrong').status_code, 401)
+        self.assertEqual(self._login('wrong').status_code, 401)
+        response = self._login()
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(response['Retry-After'])
+        # Other accounts are unaffected, and so is the owner elsewhere
+        self.assertEqual(self._login(username='someone-else').status_code, 401)
+        self.assertEqual(self._login(ip='10.0.0.2').status_code, 200)
+
+    @override_settings(LOGIN_RATE_PER_IP=1)
+    def test_logins_rate_limited_per_ip(self):
+        self.assertEqual(self._login(username='someone-else').status_code, 401)
+        self.assertEqual(self._login().status_code, 429)
+
+    def test_spoofed_forwarded_for_does_not_dodge_the_limits(self):
+        # Without trusted proxies (NUM_PROXIES=0) the header is not the client IP
+        statuses = [
+            self.client.post('/api/token/', {'username': 'owner', 'password': 'wrong'},
+                             content_type='application/json', HTTP_X_FORWARDED_FOR=f'10.1.0.{i}').status_code
+            for i in range(20)
+        ]
+        self.assertEqual(statuses[-1], 429)
+
+    @override_settings(LOGIN_RATE_PER_ACCOUNT=3)
+    def test_logins_rate_limited_per_username_from_any_ip(self):
+        statuses = [self._login('wrong', ip=f'10.1.0.{i}').status_code for i in range(4)]
+        self.assertEqual(statuses, [401, 401, 401, 429])
+        self.assertEqual(self._login(username='someone-else').status_code, 401)
+
+    @override_settings(REGISTER_RATE_PER_IP=1)
+    def test_registrations_rate_limited_per_ip(self):
+        response = self.client.post('/api/register/', {'username': 'new', 'password': 'pw'})
+        self.assertEqual(response.status_code, 201)
+        response = self.client.post('/api/register/', {'username': 'newer', 'password': 'pw'})
+        self.assertEqual(response.status_code, 429)
+
+    def test_token_errors_match_simplejwt(self):
+        response = self._login('wrong')
+        self.assertEqual(response.json(), {'detail': 'No active account found with the given credentials'})
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer realm="api"')
+        self.assertEqual(self._login(username='nobody').status_code, 401)
+        response = self.client.post('/api/token/', {'username': ''}, content_type='application/json')
+        self.assertEqual(response.json(), {
+            'username': ['This field may not be blank.'], 'password': ['This field is required.'],
+        })
+        # Form posts work as they did with TokenObtainPairView
+        response = self.client.post('/api/token/', {'username': 'owner', 'password': 'secret'})
+        self.assertEqual(AccessToken(response.json()['access'])['username'], 'owner')
+
+    def test_login_rehashes_at_configured_cost(self):
+        with override_settings(PASSWORD_HASH_ITERATIONS=1200):
+            self.assertEqual(self._login().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1200$'))
+        self.assertTrue(check_password('secret', self.user.password))
+
+    async def test_token_under_asgi(self):
+        response = await self.async_client.post(
+            '/api/token/', {'username': 'owner', 'password': 'secret'}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        tasks = await self.async_client.get(
+            '/api/async/tasks/', headers={'Authorization': f'Bearer {response.json()["access"]}'},
+        )
+        self.assertEqual(tasks.status_code, 200)
+
+    def test_register(self):
+        response = self.client.post('/api/register/', {'username': 'new', 'password': 'pw'}, content_type='application/json')
+        self.assertEqual((response.status_code, response.json()), (201, {'username': 'new'}))
+        self.assertTrue(check_password('pw', User.objects.get(username='new').password))
+
+        response = self.client.post('/api/register/', {'username': 'new', 'password': 'pw'})
+        self.assertEqual(response.json(), {'username': ['A user with that username already exists.']})
+
+    @override_settings(PASSWORD_HASH_WORKERS=1)
+    async def test_process_pool(self):
+        encoded = make_password('secret')
+        self.assertEqual((await hashing.averify('secret', encoded))[0], True)
+        self.assertEqual(await hashing.averify('wrong', encoded), (False, False))
+        self.assertTrue(check_password('secret', await hashing.amake_password('secret')))
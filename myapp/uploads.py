@@ -0,0 +1,272 @@
+import json
+import os
+import time
+import uuid
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers, StopUpload
+
+# Leading bytes of the formats Pillow is asked to decode
+IMAGE_SIGNATURES = [
+    b'\xff\xd8\xff',          # JPEG
+    b'\x89PNG\r\n\x1a\n',     # PNG
+    b'GIF87a',
+    b'GIF89a',
+]
+SNIFF_LENGTH = 12
+
+# Room for the multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadRejected(Exception):
+    pass
+
+
+class OffsetMismatch(UploadRejected):
+    pass
+
+
+class UploadNotFound(Exception):
+    """The upload finished or expired after it was loaded."""
+
+
+def max_upload_size():
+    return settings.MAX_FILE_SIZE_MB * 1024 * 1024
+
+
+def too_large_message():
+    return f'File too large (max {settings.MAX_FILE_SIZE_MB}MB allowed)'
+
+
+def looks_like_image(head):
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return True
+    return any(head.startswith(signature) for signature in IMAGE_SIGNATURES)
+
+
+def new_spool_path():
+    os.makedirs(settings.PROFILE_PICTURE_SPOOL_DIR, exist_ok=True)
+    return os.path.join(settings.PROFILE_PICTURE_SPOOL_DIR, uuid.uuid4().hex)
+
+
+class SpooledUploadedFile(UploadedFile):
+    """An upload already written to the spool directory by SpoolingImageUploadHandler."""
+
+    def __init__(self, spool_path, name, content_type, size, charset=None, content_type_extra=None):
+        super().__init__(open(spool_path, 'rb'), name, content_type, size, charset, content_type_extra)
+        self.spool_path = spool_path
+
+    def temporary_file_path(self):
+        return self.spool_path
+
+
+class SpoolingImageUploadHandler(FileUploadHandler):
+    """
+    Stream one image field straight into the spool directory while the body
+    is still arriving. The upload is dropped as soon as it passes
+    MAX_FILE_SIZE_MB or its first bytes are not a known image signature, so
+    nothing oversized or bogus is ever buffered in full.
+    """
+
+    def __init__(self, request=None, field_name='profile_picture'):
+        super().__init__(request)
+        self.field_name = field_name
+        self.error = None
+        self.spool = None
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        if field_name != self.field_name:
+            return
+        self.spool_path = new_spool_path()
+        self.spool = open(self.spool_path, 'wb')
+        self.size = 0
+        self.head = b''
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.spool is None:
+            # Some other field; let the default handlers have it
+            return raw_data
+        self.size += len(raw_data)
+        if self.size > max_upload_size():
+            self._reject(too_large_message())
+        if len(self.head) < SNIFF_LENGTH:
+            self.head += raw_data[:SNIFF_LENGTH - len(self.head)]
+            if len(self.head) == SNIFF_LENGTH and not looks_like_image(self.head):
+                self._reject('Unsupported file type, expected an image')
+        self.spool.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.spool is None:
+            return None
+        if not looks_like_image(self.head):
+            self._reject('Unsupported file type, expected an image')
+        self.spool.close()
+        self.spool = None
+        return SpooledUploadedFile(self.spool_path, self.file_name, self.content_type, self.size,
+                                   self.charset, self.content_type_extra)
+
+    def upload_interrupted(self):
+        self._discard()
+
+    def _reject(self, message):
+        self.error = message
+        self._discard()
+        # Keep draining (not storing) the rest of the body so the client still
+        # gets a clean 400 response instead of a reset connection
+        raise StopUpload(connection_reset=False)
+
+    def _discard(self):
+        if self.spool is not None:
+            self.spool.close()
+            self.spool = None
+            os.remove(self.spool_path)
+
+
+def _lock_exclusive(file, offset):
+    """
+    Block until no other process holds the lock on `file`; it is released
+    when the file is closed. Windows locks are mandatory, so there a byte at
+    `offset` is locked, which must lie past anything read or written.
+    """
+    if fcntl is not None:
+        fcntl.flock(file, fcntl.LOCK_EX)
+    else:
+        file.seek(offset)
+        # Retries for about 10 seconds, then raises OSError
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+
+
+class ResumableUpload:
+    """
+    A chunked upload kept in the spool directory as <id>.part plus a small
+    <id>.json describing its owner and announced length. The committed offset
+    is simply the size of the .part file, so any worker on the host can resume.
+    The state lives on that host's disk under PROFILE_PICTURE_SPOOL_DIR:
+    every request for an upload must reach the same host (sticky sessions,
+    or a spool directory shared by all of them), or it answers 404.
+    """
+
+    def __init__(self, upload_id):
+        self.upload_id = upload_id
+        base = os.path.join(settings.PROFILE_PICTURE_SPOOL_DIR, 'resumable', upload_id.hex)
+        self.part_path = base + '.part'
+        self.meta_path = base + '.json'
+
+    @classmethod
+    def create(cls, user_id, length):
+        if length <= 0:
+            raise UploadRejected('length must be positive')
+        if length > max_upload_size():
+            raise UploadRejected(too_large_message())
+        cls.remove_expired()
+        upload = cls(uuid.uuid4())
+        os.makedirs(os.path.dirname(upload.part_path), exist_ok=True)
+        open(upload.part_path, 'wb').close()
+        with open(upload.meta_path, 'w') as meta:
+            json.dump({'user_id': user_id, 'length': length}, meta)
+        return upload
+
+    @classmethod
+    def load(cls, upload_id, user_id):
+        """Return the user's upload, or None if it does not exist."""
+        upload = cls(upload_id)
+        try:
+            with open(upload.meta_path) as meta:
+                data = json.load(meta)
+        except FileNotFoundError:
+            return None
+        if data['user_id'] != user_id:
+            return None
+        upload.length = data['length']
+        return upload
+
+    @classmethod
+    def remove_expired(cls):
+        """
+        Remove uploads idle for PROFILE_UPLOAD_SESSION_TTL. The .part and
+        .json go together, judged by whichever was touched last: append()
+        only writes the .part, and an active upload must keep its .json.
+        """
+        directory = os.path.join(settings.PROFILE_PICTURE_SPOOL_DIR, 'resumable')
+        if not os.path.isdir(directory):
+            return
+        cutoff = time.time() - settings.PROFILE_UPLOAD_SESSION_TTL
+        for stem in {os.path.splitext(name)[0] for name in os.listdir(directory)}:
+            paths = [os.path.join(directory, stem + extension) for extension in ('.part', '.json')]
+            mtimes = []
+            for path in paths:
+                try:
+                    mtimes.append(os.path.getmtime(path))
+                except FileNotFoundError:
+                    pass
+            if mtimes and max(mtimes) < cutoff:
+                for path in paths:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+
+    @property
+    def offset(self):
+        try:
+            return os.path.getsize(self.part_path)
+        except FileNotFoundError:
+            raise UploadNotFound()
+
+    @property
+    def complete(self):
+        return self.offset == self.length
+
+    def append(self, offset, stream, chunk_size=64 * 1024):
+        """
+        Append the request body at `offset`, which must be the current end of
+        the upload. Returns the new offset.
+        """
+        try:
+            # Not 'ab': that would recreate a finished or expired upload
+            part = open(self.part_path, 'r+b')
+        except FileNotFoundError:
+            raise UploadNotFound()
+        with part:
+            # One writer per upload; a concurrent PATCH waits, then fails the offset check
+            _lock_exclusive(part, self.length)
+            current = part.seek(0, os.SEEK_END)
+            if offset != current:
+                raise OffsetMismatch(f'Upload-Offset must be {current}')
+            while stream is not None:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                if current + len(chunk) > self.length:
+                    part.truncate(offset)
+                    raise UploadRejected('Upload exceeds the announced length')
+                part.write(chunk)
+                previous, current = current, current + len(chunk)
+                # Sniff as soon as the first bytes are in, not after the whole file
+                if previous < SNIFF_LENGTH and (current >= SNIFF_LENGTH or current == self.length):
+                    part.flush()
+                    with open(self.part_path, 'rb') as written:
+                        head = written.read(SNIFF_LENGTH)
+                    if not looks_like_image(head):
+                        part.truncate(0)
+                        raise UploadRejected('Unsupported file type, expected an image')
+            return current
+
+    def finish(self):
+        """Move the completed upload into the processing spool and return its path."""
+        spool_path = new_spool_path()
+        os.replace(self.part_path, spool_path)
+        os.remove(self.meta_path)
+        return spool_path
@@ -1,16 +1,35 @@
 from django.urls import path
 from .views import *
+from . import async_views
 from django.conf import settings
 from django.conf.urls.static import static
 
 urlpatterns = [
     path('test/', test_view),
     path('tasks/', get_tasks),
+    path('tasks/summary/', task_summary),
+    path('tasks/sync/', sync_tasks),
+    path('tasks/cache-stats/', task_cache_stats),
+    path('compression-stats/', compression_stats),
+    path('metrics/', prometheus_metrics),
+    path('tasks/export/<str:export_format>/', export_tasks),
     path('tasks/create/', create_task),
     path('tasks/update/<int:pk>/', update_task),
     path('tasks/delete/<int:pk>/', delete_task),
-    path('register/', RegisterView.as_view(), name='register'),
+    path('tasks/bulk/create/', bulk_create_tasks),
+    path('tasks/bulk/update/', bulk_update_tasks),
+    path('tasks/bulk/delete/', bulk_delete_tasks),
+    path('register/', async_views.register, name='register'),
     path('upload-picture/', upload_profile_picture, name='upload-profile-picture'),
+    path('upload-picture/resumable/', create_picture_upload, name='create-picture-upload'),
+    path('upload-picture/resumable/<uuid:upload_id>/', picture_upload, name='picture-upload'),
     path('profile/', get_user_profile, name='get_user_profile'),
+    path('account/', delete_account, name='delete-account'),
     path('getusers/', getUsers, name='getusers'),
+
+    # Async (ASGI) read endpoints, same payloads as above
+    path('async/tasks/', async_views.get_tasks, name='async_get_tasks'),
+    path('async/profile/', async_views.get_user_profile, name='async_get_user_profile'),
+    path('async/getusers/', async_views.getUsers, name='async_getusers'),
+    path('async/tasks/events/', async_views.task_events, name='async_task_events'),
 ]
\ No newline at end of file
@@ -4,13 +4,18 @@ from django.shortcuts import render
 from rest_framework.decorators import api_view, permission_classes, parser_classes
 from rest_framework.response import Response
 from rest_framework import status, generics
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.serializers import ModelSerializer
 from django.contrib.auth.models import User
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
 from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+import functools
+import hmac
 import os
-from django.db.models import Q
+import uuid
 
 from django.core.files.storage import default_storage
 
@@ -18,8 +23,23 @@ from rest_framework.parsers import MultiPartParser, FormParser
 
 from .models import Task, Profile
 from .serializers import TaskSerializer
-
-# Register Serializer & View
+from . import bulk
+from . import cache as task_cache
+from . import compression
+from . import dashboard
+from . import export
+from . import filters
+from . import metrics
+from . import picture_urls
+from . import pictures
+from . import purge
+from . import sync
+from . import uploads
+from .etags import is_not_modified, payload_etag, precondition_failed, task_etag, task_list_etag
+from .pagination import InvalidCursor, get_page_size, keyset_page, union_ordered
+from .renderers import json_response
+
+# Register Serializer (api/register/ is async_views.register)
 class RegisterSerializer(ModelSerializer):
     class Meta:
         model = User
@@ -29,74 +49,158 @@ class RegisterSerializer(ModelSerializer):
     def create(self, validated_data):
         return User.objects.create_user(**validated_data)
 
-class RegisterView(generics.CreateAPIView):
-    queryset = User.objects.all()
-    permission_classes = [AllowAny]
-    serializer_class = RegisterSerializer
 
 
+def _start_picture_processing(user_id, spool_path):
+    """Mark the profile pending and hand the spooled file to the worker pool."""
+    upload_id = uuid.uuid4()
+    with transaction.atomic():
+        profile, _ = Profile.objects.get_or_create(user_id=user_id)
+        profile.picture_status = 'pending'
+        profile.picture_upload_id = upload_id
+        profile.picture_requested_at = timezone.now()
+        profile.save(update_fields=['picture_status', 'picture_upload_id', 'picture_requested_at'])
+        pictures.enqueue(profile.id, upload_id, spool_path)
+    return Response(
+        {'message': 'Profile picture uploaded successfully', 'status': profile.picture_status},
+        status=status.HTTP_202_ACCEPTED,
+    )
+
 
 # for upload profile pichture 
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
 @parser_classes([MultiPartParser, FormParser])
 def upload_profile_picture(request):
-    print("📦 Storage being used:", type(request.user))
-
-    if 'profile_picture' not in request.FILES:
+    # Refuse an announced oversized body before reading any of it
+    try:
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        content_length = 0
+    if content_length > uploads.max_upload_size() + uploads.MULTIPART_OVERHEAD:
+        return Response({'error': uploads.too_large_message()}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Stream the file part straight to the spool, checking size and magic
+    # bytes as chunks arrive (must be set up before request.FILES is read)
+    handler = uploads.SpoolingImageUploadHandler(request._request)
+    request._request.upload_handlers.insert(0, handler)
+
+    profile_picture = request.FILES.get('profile_picture')
+    if handler.error:
+        return Response({'error': handler.error}, status=status.HTTP_400_BAD_REQUEST)
+    if profile_picture is None:
         return Response({'error': 'No file uploaded'}, status=400)
 
-    profile_picture = request.FILES['profile_picture']
+    # Spool and return; decoding, thumbnails, the storage upload and
+    # deleting the old picture all happen in the background worker pool,
+    # which opens the spooled file itself
+    profile_picture.close()
+    return _start_picture_processing(request.user.id, profile_picture.spool_path)
 
-    if profile_picture.size > settings.MAX_FILE_SIZE_MB * 1024 * 1024:
-        return Response({'error': 'File too large (max 1MB allowed)'}, status=status.HTTP_400_BAD_REQUEST)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def create_picture_upload(request):
+    """Start a resumable upload; the client then PATCHes chunks to it."""
     try:
-        profile = Profile.objects.get(user=request.user)
-        if profile.profile_picture:
-            # ✅ Correct way to delete on any storage backend (S3 or local)
-            profile.profile_picture.delete(save=False)
-    except Profile.DoesNotExist:
-        profile = Profile.objects.create(user=request.user)
+        length = int(request.data.get('length'))
+    except (TypeError, ValueError):
+        return Response({'error': 'length is required'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        upload = uploads.ResumableUpload.create(request.user.id, length)
+    except uploads.UploadRejected as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(
+        {'upload_id': upload.upload_id, 'offset': 0, 'length': length},
+        status=status.HTTP_201_CREATED,
+    )
 
-    profile.profile_picture = profile_picture
-    profile.save()
 
-    return Response({'message': 'Profile picture uploaded successfully'})
+@api_view(['HEAD', 'PATCH'])
+@permission_classes([IsAuthenticated])
+def picture_upload(request, upload_id):
+    """
+    HEAD reports how much of the upload the server has (Upload-Offset).
+    PATCH appends the raw request body at the Upload-Offset header; once the
+    announced length is reached the picture is queued for processing.
+    """
+    upload = uploads.ResumableUpload.load(upload_id, request.user.id)
+    if upload is None:
+        return Response({'error': 'Upload not found'}, status=404)
+    try:
+        return _resume_picture_upload(request, upload)
+    except uploads.UploadNotFound:
+        # Finished by a concurrent PATCH, or expired, since it was loaded
+        return Response({'error': 'Upload not found'}, status=404)
 
 
+def _resume_picture_upload(request, upload):
+    if request.method == 'HEAD':
+        return Response(headers={'Upload-Offset': upload.offset, 'Upload-Length': upload.length})
+
+    try:
+        offset = int(request.headers['Upload-Offset'])
+    except (KeyError, ValueError):
+        return Response({'error': 'Upload-Offset header is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        offset = upload.append(offset, request.stream)
+    except uploads.OffsetMismatch as e:
+        return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT, headers={'Upload-Offset': upload.offset})
+    except uploads.UploadRejected as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST, headers={'Upload-Offset': upload.offset})
+
+    if offset < upload.length:
+        return Response({'offset': offset}, headers={'Upload-Offset': offset})
+    return _start_picture_processing(request.user.id, upload.finish())
+
+
+
+def _profile_of(user):
+    """The user's Profile loaded through select_related, or None if they have none."""
+    try:
+        return user.profile
+    except Profile.DoesNotExist:
+        return None
+
+
+def _absolute_url(request, url):
+    # Local media URLs are relative; S3/CDN ones are already absolute
+    return request.build_absolute_uri(url) if request is not None and url else url
+
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_user_profile(request):
-    user = request.user
+    # User and profile in one query; the picture URLs come from picture_urls
     try:
-        profile = Profile.objects.get(user=user)
-        # if profile.profile_picture:
-        #     profile_picture_url = profile.profile_picture.url  # ✅ REAL S3 URL
-        # else:
-        #     profile_picture_url = None
-        if profile.profile_picture:
-            filename = profile.profile_picture.name  # 'profile_pics/filename.jpg'
-
-            # Agar production hai toh S3 url
-            if settings.ENVIRONMENT == 'production':
-                profile_picture_url = f'https://{settings.AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com/{filename}'
-            else:
-                # Local me absolute uri with domain
-                profile_picture_url = request.build_absolute_uri(settings.MEDIA_URL + filename)
-        else:
-            profile_picture_url = None
-            
-    except Profile.DoesNotExist:
-        profile_picture_url = None
-
-    return Response({
+        user = User.objects.select_related('profile').only(*PROFILE_FIELDS).get(id=request.user.id)
+    except User.DoesNotExist:
+        return Response({'error': 'User not found'}, status=404)
+    data = _profile_payload(request, user)
+    etag = payload_etag(data)
+    if is_not_modified(request, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+    return Response(data, headers={'ETag': etag})
+
+
+PROFILE_FIELDS = [
+    'id', 'username', 'email',
+    'profile__id', 'profile__profile_picture', 'profile__profile_thumbnail', 'profile__picture_status',
+]
+
+
+def _profile_payload(request, user):
+    profile = _profile_of(user)
+    urls = picture_urls.resolve(profile)
+    return {
         'id': user.id,
         'username': user.username,
         'email': user.email,
-        'profile_picture': profile_picture_url
-    })
+        'profile_picture': _absolute_url(request, urls['picture']),
+        'profile_thumbnail': _absolute_url(request, urls['thumbnail']),
+        'profile_picture_status': profile.picture_status if profile else 'none',
+    }
 
 
 
@@ -106,37 +210,252 @@ def test_view(request):
 
 
 
+def _user_to_dict(user, request=None, avatars=None):
+    if user is None:
+        return None
+    profile = _profile_of(user)
+    if profile is None:
+        avatar = None
+    elif avatars is not None:
+        avatar = avatars[profile.id]['thumbnail']
+    else:
+        avatar = picture_urls.resolve(profile)['thumbnail']
+    return {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'avatar': _absolute_url(request, avatar),
+    }
+
+
+def _task_to_dict(task, request=None, avatars=None):
+    return {
+        'id': task.id,
+        'title': task.title,
+        'description': task.description,
+        'status': task.status,
+        'priority': task.priority,
+        'deadline': task.deadline,
+        'created_at': task.created_at,
+        'updated_at': task.updated_at,
+        'assigned_to': _user_to_dict(task.assigned_to, request, avatars),
+        'created_by': _user_to_dict(task.created_by, request, avatars),
+    }
+
+
+def _tasks_to_dicts(tasks, request=None):
+    """Serialize a page of tasks, resolving every avatar URL in one batch."""
+    tasks = list(tasks)
+    profiles = [
+        _profile_of(user)
+        for task in tasks for user in (task.assigned_to, task.created_by) if user is not None
+    ]
+    avatars = picture_urls.resolve_many(profiles)
+    return [_task_to_dict(task, request, avatars) for task in tasks]
+
+
+# Columns get_tasks reads with .values(), straight into dicts for the
+# renderer without building Task/User/Profile instances first
+TASK_VALUES = [
+    'id', 'title', 'description', 'status', 'priority', 'deadline', 'created_at', 'updated_at',
+    'assigned_to_id', 'assigned_to__username', 'assigned_to__email', 'assigned_to__profile__id',
+    'assigned_to__profile__profile_picture', 'assigned_to__profile__profile_thumbnail',
+    'created_by_id', 'created_by__username', 'created_by__email', 'created_by__profile__id',
+    'created_by__profile__profile_picture', 'created_by__profile__profile_thumbnail',
+]
+
+
+def _task_values(branches):
+    return [branch.values(*TASK_VALUES) for branch in branches]
+
+
+def _task_rows_to_dicts(rows, request=None):
+    """_tasks_to_dicts() for TASK_VALUES rows; produces the same payload."""
+    rows = list(rows)
+    names = {}
+    for row in rows:
+        for side in ('assigned_to', 'created_by'):
+            profile_id = row[f'{side}__profile__id']
+            if profile_id is not None:
+                names[profile_id] = (row[f'{side}__profile__profile_picture'], row[f'{side}__profile__profile_thumbnail'])
+    avatars = picture_urls.resolve_names(names)
+
+    def user(row, side):
+        if row[f'{side}_id'] is None:
+            return None
+        profile_id = row[f'{side}__profile__id']
+        avatar = avatars[profile_id]['thumbnail'] if profile_id is not None else None
+        return {
+            'id': row[f'{side}_id'],
+            'username': row[f'{side}__username'],
+            'email': row[f'{side}__email'],
+            'avatar': _absolute_url(request, avatar),
+        }
+
+    return [{
+        'id': row['id'],
+        'title': row['title'],
+        'description': row['description'],
+        'status': row['status'],
+        'priority': row['priority'],
+        'deadline': row['deadline'],
+        'created_at': row['created_at'],
+        'updated_at': row['updated_at'],
+        'assigned_to': user(row, 'assigned_to'),
+        'created_by': user(row, 'created_by'),
+    } for row in rows]
+
+
+def _visible_task_branches(user, role=None):
+    # Join both user FKs (and their profiles, for avatars) in the same query
+    # and load only the columns we emit, so the list costs one query no matter
+    # how many tasks the user has.
+    # The OR is split into a UNION so each side can use its own
+    # (user, -created_at, -id) index instead of sorting the merged rows.
+    tasks = Task.objects.select_related(
+        'assigned_to__profile', 'created_by__profile',
+    ).only(
+        'id', 'title', 'description', 'status', 'priority', 'deadline',
+        'created_at', 'updated_at',
+        'assigned_to__id', 'assigned_to__username', 'assigned_to__email',
+        'assigned_to__profile__id', 'assigned_to__profile__profile_picture',
+        'assigned_to__profile__profile_thumbnail',
+        'created_by__id', 'created_by__username', 'created_by__email',
+        'created_by__profile__id', 'created_by__profile__profile_picture',
+        'created_by__profile__profile_thumbnail',
+    )
+    branches = []
+    if role in (None, 'assigned'):
+        branches.append(tasks.filter(assigned_to_id=user.id))
+    if role in (None, 'created'):
+        branches.append(tasks.filter(created_by_id=user.id))
+    return branches
+
+
+def _filtered_task_branches(request):
+    """
+    Return (branches, sort) for the task list narrowed by the request's
+    ?status=&priority=&deadline_from=&deadline_to=&role=&updated_since=&sort=.
+    The filters go into every UNION branch's WHERE; raises InvalidFilter.
+    """
+    role, condition, sort = filters.parse_task_filters(request.GET)
+    return [branch.filter(condition) for branch in _visible_task_branches(request.user, role)], sort
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_tasks(request):
-    tasks = Task.objects.filter(
-         Q(assigned_to=request.user) | Q(created_by=request.user)
-    ).order_by('-created_at')
-
-    data = []
-    for task in tasks:
-        data.append({
-            'id': task.id,
-            'title': task.title,
-            'description': task.description,
-            'status': task.status,
-            'priority': task.priority,
-            'deadline': task.deadline,
-            'created_at': task.created_at,
-            'updated_at': task.updated_at,
-            'assigned_to': {
-                'id': task.assigned_to.id,
-                'username': task.assigned_to.username,
-                'email': task.assigned_to.email
-            } if task.assigned_to else None,
-            'created_by': {
-                'id': task.created_by.id,
-                'username': task.created_by.username,
-                'email': task.created_by.email
-            } if task.created_by else None
-        })
-
-    return Response(data)
+    try:
+        branches, sort = _filtered_task_branches(request)
+    except filters.InvalidFilter as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Answer polls that already have the current list without building it
+    etag = task_list_etag(request.user, request.GET.urlencode())
+    if is_not_modified(request, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+    rows = _task_values(branches)
+
+    # Keyset pagination is opt-in so existing clients keep getting the plain list
+    if 'cursor' in request.GET or 'page_size' in request.GET:
+        try:
+            page_size = get_page_size(request)
+            page, next_cursor = keyset_page(rows, request.GET.get('cursor'), page_size, sort)
+        except InvalidCursor as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'results': _task_rows_to_dicts(page, request),
+            'next_cursor': next_cursor,
+        }, headers={'ETag': etag})
+
+    # Only the full, default-ordered list is cached
+    if filters.is_filtered(request.GET):
+        return Response(_task_rows_to_dicts(union_ordered(rows, sort=sort), request), headers={'ETag': etag})
+
+    data = task_cache.get_task_list(request.user.id)
+    if data is None:
+        data = _task_rows_to_dicts(union_ordered(rows), request)
+        task_cache.set_task_list(request.user.id, data)
+    return Response(data, headers={'ETag': etag})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def sync_tasks(request):
+    """
+    Tasks created or changed, and ids of tasks deleted from the list, since
+    ?watermark= (omit it for a full sync). Store the returned watermark and
+    call again with it; while has_more is true there are more changes waiting.
+    """
+    try:
+        tasks, deleted, watermark, has_more = sync.changes_since(
+            _visible_task_branches(request.user), request.user.id,
+            request.GET.get('watermark'), settings.TASKS_SYNC_BATCH_SIZE,
+        )
+    except sync.WatermarkExpired as e:
+        return Response({'error': str(e)}, status=status.HTTP_410_GONE)
+    except sync.InvalidWatermark as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({
+        'changed': _tasks_to_dicts(tasks, request),
+        'deleted': deleted,
+        'watermark': watermark,
+        'has_more': has_more,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def task_summary(request):
+    # Dashboard counts (status, priority, overdue) without downloading the list
+    return Response(dashboard.task_summary(request.user.id))
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def task_cache_stats(request):
+    return Response(task_cache.cache_stats())
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def compression_stats(request):
+    return Response(compression.compression_stats())
+
+
+@require_GET
+def prometheus_metrics(request):
+    # A plain view: Prometheus sends METRICS_TOKEN as its bearer token, which
+    # the JWT authentication of the API views would reject
+    expected = settings.METRICS_TOKEN
+    if not expected:
+        raise Http404
+    header = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(header.encode(), f'Bearer {expected}'.encode()):
+        return HttpResponse(status=401, headers={'WWW-Authenticate': 'Bearer'})
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_tasks(request, export_format):
+    try:
+        branches, sort = _filtered_task_branches(request)
+    except filters.InvalidFilter as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    chunks = export.iter_task_chunks(branches, settings.TASKS_EXPORT_CHUNK_SIZE, sort)
+    # Avatars are resolved once per chunk, not per row
+    to_dicts = functools.partial(_tasks_to_dicts, request=request)
+    if export_format == 'ndjson':
+        response = StreamingHttpResponse(export.ndjson_lines(chunks, to_dicts), content_type='application/x-ndjson')
+    elif export_format == 'csv':
+        response = StreamingHttpResponse(export.csv_lines(chunks, to_dicts), content_type='text/csv')
+    else:
+        return Response({'error': 'Format must be ndjson or csv'}, status=status.HTTP_400_BAD_REQUEST)
+    response['Content-Disposition'] = f'attachment; filename="tasks.{export_format}"'
+    return response
 
 
 
@@ -152,39 +471,16 @@ def get_tasks(request):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def create_task(request):
-    # Extract fields from request
-    title = request.data.get('title')
-    description = request.data.get('description','')
-    status_value = request.data.get('status', 'pending')  # Default fallback
-    priority = request.data.get('priority', 'medium')     # Default fallback
-    deadline = request.data.get('deadline')               # Format: "YYYY-MM-DD"
-    assigned_to_id = request.data.get('assigned_to')               # Format: "YYYY-MM-DD"
-
-    assigned_user = None
-    if assigned_to_id:
-        try:
-            assigned_user = User.objects.get(id=assigned_to_id)
-        except User.DoesNotExist:
-            return Response({'error': 'Assigned user does not exist'}, status=status.HTTP_400_BAD_REQUEST)
-
-    # Validate required field
-    if not title:
-        return Response({'error': 'Title is required'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        fields = bulk.clean_task(request.data, partial=False)
+    except bulk.ItemError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
     # Create the task
-    task = Task.objects.create(
-        user=request.user,
-        title=title,
-        description=description,
-        status=status_value,
-        priority=priority,
-        deadline=deadline,
-        assigned_to=assigned_user,
-        created_by=request.user
-    )
+    task = Task.objects.create(user_id=request.user.id, created_by_id=request.user.id, **fields)
 
     # Manual Response — matching your TaskSerializer
-    return Response({
+    response = Response({
         "id": task.id,
         "user": {
             "id": request.user.id,
@@ -199,60 +495,147 @@ def create_task(request):
         "created_at": task.created_at,
         "updated_at": task.updated_at
     }, status=status.HTTP_201_CREATED)
+    response['ETag'] = task_etag(task)
+    return response
 
 
 
-@api_view(['PUT'])
+@api_view(['PUT', 'PATCH'])
 @permission_classes([IsAuthenticated])
 def update_task(request, pk):
+    """
+    PUT sets the fields it sends and requires title; PATCH takes any subset.
+    Only columns whose value actually changes are written. Sending the ETag
+    of the version being edited in If-Match turns a concurrent edit into a
+    412 instead of a lost update.
+    """
     try:
-        task = Task.objects.get(id=pk, user=request.user)
-    except Task.DoesNotExist:
-        return Response({'error': 'Task not found'}, status=404)
-    
-    serializer = TaskSerializer(task, data=request.data)
-    if serializer.is_valid():
-        serializer.save()
-        return Response(serializer.data)
-    return Response(serializer.errors)
+        if request.method == 'PUT' and 'title' not in request.data:
+            raise bulk.ItemError('Title is required')
+        fields = bulk.clean_task(request.data, partial=True)
+    except bulk.ItemError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    with transaction.atomic():
+        # Locked so the If-Match check and the counter/tombstone bookkeeping
+        # in post_save see the row as it is written
+        try:
+            task = Task.objects.select_for_update().get(id=pk, user_id=request.user.id)
+        except Task.DoesNotExist:
+            return Response({'error': 'Task not found'}, status=404)
+        # The owner is the requester, so TaskSerializer's nested user comes
+        # from the token claims rather than a join under the lock
+        if isinstance(request.user, User):
+            task.user = request.user
+        else:
+            task.user = User(id=request.user.id, username=request.user.username)
+        if precondition_failed(request, task_etag(task)):
+            response = Response({'error': 'Task was changed since it was loaded', 'task': TaskSerializer(task).data},
+                                status=status.HTTP_412_PRECONDITION_FAILED)
+            response['ETag'] = task_etag(task)
+            return response
+
+        changed = [name for name, value in fields.items() if getattr(task, name) != value]
+        if changed:
+            for name in changed:
+                setattr(task, name, fields[name])
+            task.save(update_fields=[*changed, 'updated_at'])
+
+    response = Response(TaskSerializer(task).data)
+    response['ETag'] = task_etag(task)
+    return response
 
 
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
 def delete_task(request, pk):
-    try:
-        task = Task.objects.get(id=pk, user=request.user)
-    except Task.DoesNotExist:
+    if not bulk.delete_tasks([pk], user_id=request.user.id):
         return Response({'error': 'Task not found'}, status=404)
-    task.delete()
     return Response({"message": "Task deleted"})
 
 
-
-@api_view(['get'])
+@api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
-def getUsers(request):
-    search = request.GET.get('search', '')
-    users = User.objects.filter(username__istartswith=search)
-    
-    # Manually build list of user dicts
-    user_list = [{
-        'id': user.id,
-        'username': user.username,
-        'email': user.email
-    } for user in users]
-    
-    return JsonResponse(user_list, safe=False)
+def delete_account(request):
+    # Deactivated right away; the tasks and the user go in the background
+    with transaction.atomic():
+        purge.schedule(request.user.id)
+    return Response({'message': 'Account scheduled for deletion'}, status=status.HTTP_202_ACCEPTED)
 
 
 
+def _bulk_items(request):
+    items = request.data
+    if not isinstance(items, list):
+        return None, Response({'error': 'Expected a list'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > settings.TASKS_BULK_MAX_ITEMS:
+        return None, Response(
+            {'error': f'At most {settings.TASKS_BULK_MAX_ITEMS} items per request'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    return items, None
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_create_tasks(request):
+    items, error = _bulk_items(request)
+    if error:
+        return error
+    return Response({'results': bulk.bulk_create_tasks(request.user, items)})
+
+
+@api_view(['PUT'])
+@permission_classes([IsAuthenticated])
+def bulk_update_tasks(request):
+    items, error = _bulk_items(request)
+    if error:
+        return error
+    return Response({'results': bulk.bulk_update_tasks(request.user, items)})
+
 
+@api_view(['DELETE'])
+@permission_classes([IsAuthenticated])
+def bulk_delete_tasks(request):
+    ids, error = _bulk_items(request)
+    if error:
+        return error
+    return Response({'results': bulk.bulk_delete_tasks(request.user, ids)})
 
 
 
+def _user_search_queryset(request):
+    """Return (queryset, error_response) for the getUsers typeahead."""
+    search = request.GET.get('search', '')
+    after = request.GET.get('after')
+    try:
+        limit = int(request.GET.get('limit', settings.USER_SEARCH_LIMIT))
+    except ValueError:
+        return None, JsonResponse({'error': 'limit must be an integer'}, status=400)
+    limit = max(1, min(limit, settings.USER_SEARCH_MAX_LIMIT))
+
+    # Prefix match walked in username order so the unique username index both
+    # finds and orders the rows and the scan stops after `limit`. An exact match
+    # is the shortest name with its prefix, so it always ranks first.
+    # Pass the last username back as ?after= to get the next page.
+    users = User.objects.filter(username__istartswith=search)
+    if after:
+        users = users.filter(username__gt=after)
+    return users.only('id', 'username', 'email').order_by('username')[:limit], None
 
 
+@api_view(['get'])
+@permission_classes([IsAuthenticated])
+def getUsers(request):
+    users, error = _user_search_queryset(request)
+    if error:
+        return error
 
+    # Manually build list of user dicts
+    user_list = [{
+        'id': user.id,
+        'username': user.username,
+        'email': user.email
+    } for user in users]
 
+    return json_response(user_list)